@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""Compare printing every Place with one list of their strings, as the
+all command used to, and with the streaming all command: the time until
+the first byte is written, the total time and the peak memory.
+
+Usage: ./benchmarks/all_stream.py [number of places]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from console import HBNBCommand  # noqa: E402
+from models import storage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+class Sink:
+    """Discard what is written, remembering when it was first written"""
+
+    def __init__(self):
+        self.first = None
+
+    def write(self, text):
+        if self.first is None:
+            self.first = time.perf_counter()
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def listed():
+    """Print the places the way all used to"""
+    print([str(obj) for obj in storage.all("Place").values()])
+
+
+def streamed():
+    """Print the places with the all command"""
+    HBNBCommand().onecmd("all Place")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for i in range(count):
+        storage.new(Place.from_dict({
+            "id": str(i), "created_at": "2023-10-10T12:38:12.144669",
+            "updated_at": "2023-10-10T12:38:12.144682",
+            "name": "Place {}".format(i), "description": "Nice " * 10}))
+    print("{} places".format(count))
+    stdout = sys.stdout
+    for label, run in (("list", listed), ("streamed", streamed)):
+        sys.stdout = sink = Sink()
+        tracemalloc.start()
+        start = time.perf_counter()
+        run()
+        end = time.perf_counter()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        sys.stdout = stdout
+        print("{:<8} first byte {:>8.2f} ms, total {:>8.2f} ms, "
+              "peak {:>7.1f} MiB".format(label, (sink.first - start) * 1000,
+                                         (end - start) * 1000, peak / 2 ** 20))
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""Compare finding the Place objects having several amenities (in some
+cities) with a loop over the objects and with the BitsetIndex of
+FileStorage.
+
+Usage: ./benchmarks/amenity_filter.py [number of places]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+AMENITIES = ["amenity-{}".format(i) for i in range(30)]
+CITIES = ["city-{}".format(i) for i in range(100)]
+WANTED = AMENITIES[:3]
+
+
+def scan(cities=None):
+    """Return the matching places the way a loop over the objects does"""
+    return {key: place for key, place in storage.all(Place).items()
+            if (cities is None or place.city_id in cities) and
+            all(amenity in place.amenity_ids for amenity in WANTED)}
+
+
+def bitsets(cities=None):
+    """Return the matching places using the BitsetIndex"""
+    if cities is None:
+        return storage.having(Place, "amenity_ids", WANTED)
+    return storage.having(Place, "amenity_ids", WANTED, city_id=cities)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    random.seed(0)
+    for i in range(count):
+        place = Place.from_dict({"id": str(i),
+                                 "created_at": "2023-10-10T12:38:12",
+                                 "updated_at": "2023-10-10T12:38:12"})
+        place.__dict__.update(city_id=random.choice(CITIES),
+                              amenity_ids=random.sample(
+                                  AMENITIES, random.randint(0, 12)))
+        storage.new(place)
+    cities = CITIES[:5]
+    assert scan() == bitsets() and scan(cities) == bitsets(cities)
+    print("{} places, {} with {} amenities, {} of them in {} cities".format(
+        count, len(scan()), len(WANTED), len(scan(cities)), len(cities)))
+    for label, function in (("object scan", scan), ("bitsets", bitsets)):
+        for where in (None, cities):
+            elapsed = min(timeit.repeat(lambda: function(where), number=5,
+                                        repeat=3)) / 5
+            print("{:<12} {:<10} {:>8.2f} ms per query".format(
+                label, "all" if where is None else "5 cities",
+                elapsed * 1000))
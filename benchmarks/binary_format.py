@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""Compare the size and the reload time of file.json with the same store
+in the binary format.
+
+Usage: ./benchmarks/binary_format.py [number of objects]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.engine.binary_format import json_to_binary  # noqa: E402
+
+MEASURE = """
+import time
+start = time.perf_counter()
+from models import storage
+print(storage.count(), time.perf_counter() - start)
+"""
+
+
+def write_store(path, count):
+    """Write a file.json of count Review objects to path"""
+    places = [str(uuid.uuid4()) for i in range(1000)]
+    users = [str(uuid.uuid4()) for i in range(5000)]
+    with open(path, "w") as f:
+        f.write("{")
+        for i in range(count):
+            value = {"id": str(uuid.uuid4()),
+                     "created_at": "2023-10-10T12:38:12.144669",
+                     "updated_at": "2023-10-10T12:38:12.144682",
+                     "place_id": places[i % 1000],
+                     "user_id": users[i % 5000],
+                     "text": "A lovely stay",
+                     "__class__": "Review"}
+            f.write("{}{}: {}".format(", " if i else "",
+                                      json.dumps("Review." + value["id"]),
+                                      json.dumps(value)))
+        f.write("}")
+
+
+def measure(directory, file_format):
+    """Reload the store in directory in a fresh process"""
+    env = dict(os.environ, PYTHONPATH=ROOT, HBNB_FILE_FORMAT=file_format)
+    out = subprocess.check_output([sys.executable, "-c", MEASURE],
+                                  cwd=directory, env=env)
+    count, elapsed = out.split()
+    return int(count), float(elapsed)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "file.json")
+        binary_path = os.path.join(directory, "file.bin")
+        write_store(json_path, count)
+        json_to_binary(json_path, binary_path)
+        for file_format, path in (("json", json_path),
+                                  ("binary", binary_path)):
+            loaded, elapsed = measure(directory, file_format)
+            print("{:<7} {:>7.1f} MiB {:>8} objects reloaded in {:.2f} s"
+                  .format(file_format, os.path.getsize(path) / 2 ** 20,
+                          loaded, elapsed))
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""Compare the memory held by reloaded objects with and without the
+compact classes of models.compact.
+
+Usage: ./benchmarks/compact_objects.py [number of objects]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from binary_format import write_store  # noqa: E402
+
+MEASURE = """
+import tracemalloc
+tracemalloc.start()
+from models import storage
+count = storage.count()
+print(count, tracemalloc.get_traced_memory()[0] / count)
+"""
+
+
+def measure(directory, compact):
+    """Reload the store in directory in a fresh process"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    if compact:
+        env["HBNB_COMPACT_OBJECTS"] = "1"
+    out = subprocess.check_output([sys.executable, "-c", MEASURE],
+                                  cwd=directory, env=env)
+    count, per_object = out.split()
+    return int(count), float(per_object)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as directory:
+        write_store(os.path.join(directory, "file.json"), count)
+        for compact, label in ((False, "model classes"),
+                               (True, "compact classes")):
+            loaded, per_object = measure(directory, compact)
+            print("{:<16} {:>8} objects {:>7.0f} bytes per object".format(
+                label, loaded, per_object))
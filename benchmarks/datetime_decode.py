@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+"""Compare decoding the created_at/updated_at strings written by to_dict()
+with strptime and with fromisoformat, alone and inside from_dict().
+
+Usage: ./benchmarks/datetime_decode.py [number of objects]
+"""
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models.review import Review  # noqa: E402
+
+
+def strptime_from_dict(obj_dict):
+    """Build a Review the way from_dict() did with strptime"""
+    obj = Review.__new__(Review)
+    setter = object.__setattr__
+    for key, value in obj_dict.items():
+        if key == 'created_at' or key == 'updated_at':
+            setter(obj, key,
+                   datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f'))
+        elif key != '__class__':
+            setter(obj, key, value)
+    return obj
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    start = datetime(2023, 10, 10, 12, 38, 12, 144669)
+    stamps = [(start + timedelta(microseconds=7919 * i)).isoformat()
+              for i in range(count)]
+    dicts = [{"id": str(i), "created_at": stamp, "updated_at": stamp,
+              "text": "Great", "__class__": "Review"}
+             for i, stamp in enumerate(stamps)]
+    results = [
+        ("strptime", lambda: [datetime.strptime(
+            s, '%Y-%m-%dT%H:%M:%S.%f') for s in stamps]),
+        ("fromisoformat", lambda: [datetime.fromisoformat(s)
+                                   for s in stamps]),
+        ("from_dict with strptime",
+         lambda: [strptime_from_dict(d) for d in dicts]),
+        ("from_dict", lambda: [Review.from_dict(d) for d in dicts]),
+    ]
+    print("{} timestamps / objects".format(count))
+    for label, run in results:
+        best = min(timeit.repeat(run, number=1, repeat=3))
+        print("{:<24} {:>7.3f} s  {:>6.2f} us each".format(
+            label, best, best / count * 1e6))
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""Compare filtering Place objects on their numeric attributes with a
+loop over the objects and with the ColumnIndex of FileStorage.
+
+Usage: ./benchmarks/place_filter.py [number of places]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.engine import indexes  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def scan():
+    """Return the matching places the way a loop over the objects does"""
+    return {key: place for key, place in storage.all(Place).items()
+            if 50 <= place.price_by_night <= 120 and place.max_guest >= 4
+            and 40.0 <= place.latitude <= 41.0 and
+            -74.5 <= place.longitude <= -73.5}
+
+
+def columns():
+    """Return the matching places using the ColumnIndex"""
+    return storage.in_ranges(Place, price_by_night=(50, 120),
+                             max_guest=(4, None), latitude=(40.0, 41.0),
+                             longitude=(-74.5, -73.5))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    random.seed(0)
+    for i in range(count):
+        place = Place.from_dict({"id": str(i),
+                                 "created_at": "2023-10-10T12:38:12",
+                                 "updated_at": "2023-10-10T12:38:12"})
+        place.__dict__.update(price_by_night=random.randint(20, 500),
+                              max_guest=random.randint(1, 10),
+                              latitude=random.uniform(39.0, 42.0),
+                              longitude=random.uniform(-75.0, -72.0))
+        storage.new(place)
+    assert scan() == columns()
+    print("{} places, {} matching, NumPy {}".format(
+        count, len(scan()), "used" if indexes.numpy else "not installed"))
+    for label, function in (("object scan", scan),
+                            ("column index", columns)):
+        elapsed = min(timeit.repeat(function, number=5, repeat=3)) / 5
+        print("{:<13} {:>8.2f} ms per query".format(label, elapsed * 1000))
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""Compare the bounding box, radius and nearest neighbour queries of the
+GridIndex of FileStorage with a loop over the Place objects.
+
+Usage: ./benchmarks/place_near.py [number of places]
+"""
+import heapq
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.engine.indexes import GridIndex  # noqa: E402
+from models.place import Place  # noqa: E402
+
+CENTER = (40.7128, -74.0060)
+
+
+def scan_within():
+    """Return the places of a bounding box by visiting every place"""
+    return {key: place for key, place in storage.all(Place).items()
+            if 40.70 <= place.latitude <= 40.72 and
+            -74.02 <= place.longitude <= -73.99}
+
+
+def scan_near():
+    """Return the places within 2 km by visiting every place"""
+    found = []
+    for key, place in storage.all(Place).items():
+        distance = GridIndex.distance(CENTER, (place.latitude,
+                                               place.longitude))
+        if distance <= 2:
+            found.append((distance, key, place))
+    return {key: place for distance, key, place in sorted(found)}
+
+
+def scan_nearest():
+    """Return the 10 nearest places by visiting every place"""
+    found = heapq.nsmallest(10, (
+        (GridIndex.distance(CENTER, (place.latitude, place.longitude)),
+         key, place) for key, place in storage.all(Place).items()))
+    return {key: place for distance, key, place in found}
+
+
+def grid_within():
+    """Return the places of a bounding box using the GridIndex"""
+    return storage.within(Place, 40.70, -74.02, 40.72, -73.99)
+
+
+def grid_near():
+    """Return the places within 2 km using the GridIndex"""
+    return storage.near(Place, *CENTER, 2)
+
+
+def grid_nearest():
+    """Return the 10 nearest places using the GridIndex"""
+    return storage.nearest(Place, *CENTER, 10)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    random.seed(0)
+    for i in range(count):
+        place = Place.from_dict({"id": str(i),
+                                 "created_at": "2023-10-10T12:38:12",
+                                 "updated_at": "2023-10-10T12:38:12"})
+        place.__dict__.update(latitude=random.uniform(25.0, 49.0),
+                              longitude=random.uniform(-125.0, -67.0))
+        storage.new(place)
+    print("{} places".format(count))
+    for label, scan, grid in (("bounding box", scan_within, grid_within),
+                              ("2 km radius", scan_near, grid_near),
+                              ("10 nearest", scan_nearest, grid_nearest)):
+        assert list(scan()) == list(grid()) or label == "bounding box"
+        assert set(scan()) == set(grid())
+        scanned = min(timeit.repeat(scan, number=1, repeat=3))
+        indexed = min(timeit.repeat(grid, number=100, repeat=3)) / 100
+        print("{:<12} {:>6} found, scan {:>8.2f} ms, grid {:>6.3f} ms".format(
+            label, len(grid()), scanned * 1000, indexed * 1000))
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""Compare queries run by the query engine, with the plan it picks, to
+the same queries written as loops over the objects.
+
+Usage: ./benchmarks/query_plans.py [number of places]
+"""
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+CITIES = ["city-{}".format(i) for i in range(1000)]
+START = datetime(2023, 1, 1)
+
+QUERIES = [
+    ("city, price, order by price",
+     lambda: storage.query(Place).filter(
+         city_id="city-7", price_by_night__lte=200).order_by(
+             "price_by_night"),
+     lambda: sorted((place for place in storage.all(Place).values()
+                     if place.city_id == "city-7" and
+                     place.price_by_night <= 200),
+                    key=lambda place: place.price_by_night)),
+    ("price and guests",
+     lambda: storage.query(Place).filter(
+         price_by_night__range=(100, 110), max_guest__gte=8),
+     lambda: [place for place in storage.all(Place).values()
+              if 100 <= place.price_by_night <= 110 and
+              place.max_guest >= 8]),
+    ("20 newest, name prefix",
+     lambda: storage.query(Place).filter(name__prefix="Loft").order_by(
+         "-created_at").limit(20),
+     lambda: sorted((place for place in storage.all(Place).values()
+                     if place.name.startswith("Loft")),
+                    key=lambda place: place.created_at, reverse=True)[:20]),
+]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    random.seed(0)
+    for i in range(count):
+        created = START + timedelta(seconds=random.randint(0, 365 * 86400))
+        place = Place.from_dict({"id": str(i),
+                                 "created_at": created.isoformat(),
+                                 "updated_at": created.isoformat()})
+        place.__dict__.update(city_id=random.choice(CITIES),
+                              name=random.choice(["Loft", "House",
+                                                  "Studio"]),
+                              price_by_night=random.randint(20, 500),
+                              max_guest=random.randint(1, 10))
+        storage.new(place)
+    print("{} places".format(count))
+    for label, query, loop in QUERIES:
+        assert set(map(id, query())) == set(map(id, loop()))
+        print("{}\n    {}".format(label, query().explain().replace(
+            "\n", "\n    ")))
+        looped = min(timeit.repeat(lambda: list(loop()), number=1,
+                                   repeat=3))
+        planned = min(timeit.repeat(lambda: list(query()), number=10,
+                                    repeat=3)) / 10
+        print("    loop {:.2f} ms, query {:.3f} ms".format(
+            looped * 1000, planned * 1000))
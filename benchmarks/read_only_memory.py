@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""Compare the startup time and peak memory of a process loading a binary
+store with one mapping it read-only, each then reading 1000 objects.
+
+Usage: ./benchmarks/read_only_memory.py [number of objects]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.engine.binary_format import json_to_binary  # noqa: E402
+from models.engine.json_stream import iter_items  # noqa: E402
+from binary_format import write_store  # noqa: E402
+
+MEASURE = """
+import resource
+import time
+start = time.perf_counter()
+from models import storage
+ready = time.perf_counter() - start
+with open("ids.txt") as f:
+    ids = f.read().split()
+for obj_id in ids:
+    assert storage.get("Review", obj_id) is not None
+print(storage.count(), ready,
+      resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def measure(directory, read_only):
+    """Open the store in directory in a fresh process"""
+    env = dict(os.environ, PYTHONPATH=ROOT, HBNB_FILE_FORMAT="binary")
+    if read_only:
+        env["HBNB_READ_ONLY"] = "1"
+    out = subprocess.check_output([sys.executable, "-c", MEASURE],
+                                  cwd=directory, env=env)
+    count, elapsed, maxrss = out.split()
+    return int(count), float(elapsed), int(maxrss)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "file.json")
+        write_store(json_path, count)
+        json_to_binary(json_path, os.path.join(directory, "file.bin"))
+        with open(json_path) as f:
+            ids = [value["id"] for i, (key, value)
+                   in zip(range(1000), iter_items(f))]
+        with open(os.path.join(directory, "ids.txt"), "w") as f:
+            f.write("\n".join(ids))
+        os.remove(json_path)
+        for read_only, label in ((False, "reload"),
+                                 (True, "read-only, new index"),
+                                 (True, "read-only, saved index")):
+            loaded, elapsed, maxrss = measure(directory, read_only)
+            print("{:<22} {:>8} objects {:>7.2f} s  peak RSS {:>7.1f} MiB"
+                  .format(label, loaded, elapsed, maxrss / 1024))
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""Compare the peak memory of reloading file.json in one piece with the
+streaming reload of FileStorage.
+
+Usage: ./benchmarks/reload_memory.py [number of objects]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEASURE = """
+import json
+import resource
+import sys
+import time
+mode = sys.argv[1]
+if mode == "whole":
+    import os
+    os.rename("file.json", "whole.json")
+start = time.perf_counter()
+from models import storage
+if mode == "whole":
+    with open("whole.json") as f:
+        objdict = json.load(f)
+    for value in objdict.values():
+        storage._load(value)
+    del objdict
+    os.rename("whole.json", "file.json")
+elapsed = time.perf_counter() - start
+print(storage.count(), elapsed,
+      resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def write_store(path, count):
+    """Write a file.json of count Review objects to path"""
+    with open(path, "w") as f:
+        f.write("{")
+        for i in range(count):
+            value = {"id": "{:036d}".format(i),
+                     "created_at": "2023-10-10T12:38:12.144669",
+                     "updated_at": "2023-10-10T12:38:12.144682",
+                     "place_id": "{:036d}".format(i % 1000),
+                     "user_id": "{:036d}".format(i % 5000),
+                     "text": "A lovely stay, " * 8,
+                     "__class__": "Review"}
+            f.write("{}{}: {}".format(", " if i else "",
+                                      json.dumps("Review." + value["id"]),
+                                      json.dumps(value)))
+        f.write("}")
+
+
+def measure(directory, mode):
+    """Reload the store in directory in a fresh process"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.check_output([sys.executable, "-c", MEASURE, mode],
+                                  cwd=directory, env=env)
+    count, elapsed, maxrss = out.split()
+    return int(count), float(elapsed), int(maxrss)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as directory:
+        write_store(os.path.join(directory, "file.json"), count)
+        size = os.path.getsize(os.path.join(directory, "file.json"))
+        print("file.json: {} objects, {:.1f} MiB".format(
+            count, size / 2 ** 20))
+        for mode, label in (("whole", "json.load then build"),
+                            ("stream", "streaming reload")):
+            loaded, elapsed, maxrss = measure(directory, mode)
+            print("{:<22} {:>8} objects {:>7.2f} s  peak RSS {:>7.1f} MiB"
+                  .format(label, loaded, elapsed, maxrss / 1024))
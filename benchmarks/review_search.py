@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+"""Compare keyword search over Review objects with a loop of substring
+checks and with the TextIndex of FileStorage.
+
+Usage: ./benchmarks/review_search.py [number of reviews]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.review import Review  # noqa: E402
+
+WORDS = ["word{}".format(i) for i in range(5000)]
+WEIGHTS = [1 / (i + 1) for i in range(len(WORDS))]
+QUERIES = ["word3 word900", "word4000", "word1 word2 word3"]
+
+
+def scan(query):
+    """Return the reviews holding a word of query, the way a loop of
+    substring checks does (unranked)
+    """
+    words = query.lower().split()
+    return {key: review for key, review in storage.all(Review).items()
+            if any(word in review.text.lower() for word in words)}
+
+
+def search(query):
+    """Return the 10 best reviews for query using the TextIndex"""
+    return storage.search(Review, query)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(0)
+    for i in range(count):
+        review = Review.from_dict({"id": str(i),
+                                   "created_at": "2023-10-10T12:38:12",
+                                   "updated_at": "2023-10-10T12:38:12"})
+        review.__dict__["text"] = " ".join(random.choices(
+            WORDS, WEIGHTS, k=random.randint(5, 40)))
+        storage.new(review)
+    print("{} reviews".format(count))
+    for query in QUERIES:
+        scanned = min(timeit.repeat(lambda: scan(query), number=1,
+                                    repeat=3))
+        indexed = min(timeit.repeat(lambda: search(query), number=10,
+                                    repeat=3)) / 10
+        print("{:<18} scan {:>8.2f} ms, index {:>7.3f} ms".format(
+            query, scanned * 1000, indexed * 1000))
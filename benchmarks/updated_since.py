@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""Compare finding the Review objects updated since a time, and paging
+through the most recent ones, with a loop over the objects and with the
+SortedIndex of FileStorage.
+
+Usage: ./benchmarks/updated_since.py [number of reviews]
+"""
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from models import storage  # noqa: E402
+from models.review import Review  # noqa: E402
+
+START = datetime(2023, 1, 1)
+SINCE = START + timedelta(days=364)
+
+
+def scan_since():
+    """Return the reviews updated since SINCE by visiting every review"""
+    return {key: review for key, review in storage.all(Review).items()
+            if review.updated_at >= SINCE}
+
+
+def index_since():
+    """Return the reviews updated since SINCE using the SortedIndex"""
+    return storage.between(Review, "updated_at", SINCE)
+
+
+def scan_recent():
+    """Return the second page of 20 most recent reviews by sorting them"""
+    ordered = sorted(storage.all(Review).items(), reverse=True,
+                     key=lambda item: (item[1].created_at, item[0]))
+    return dict(ordered[20:40])
+
+
+def index_recent():
+    """Return the second page of 20 most recent reviews, after the last
+    review of the first page, using the SortedIndex
+    """
+    first = storage.between(Review, "created_at", limit=20, reverse=True)
+    key, review = list(first.items())[-1]
+    return storage.between(Review, "created_at", limit=20, reverse=True,
+                           after=(review.created_at, key))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    random.seed(0)
+    for i in range(count):
+        created = START + timedelta(seconds=random.randint(0, 365 * 86400))
+        review = Review.from_dict({"id": str(i),
+                                   "created_at": created.isoformat(),
+                                   "updated_at": created.isoformat()})
+        storage.new(review)
+    assert scan_since() == index_since() and scan_recent() == index_recent()
+    print("{} reviews, {} updated in the last day".format(
+        count, len(index_since())))
+    for label, scan, index in (("updated since", scan_since, index_since),
+                               ("recent page 2", scan_recent, index_recent)):
+        scanned = min(timeit.repeat(scan, number=1, repeat=3))
+        indexed = min(timeit.repeat(index, number=100, repeat=3)) / 100
+        print("{:<14} scan {:>8.2f} ms, index {:>6.3f} ms".format(
+            label, scanned * 1000, indexed * 1000))
+    review = next(iter(index_since().values()))
+
+    def update():
+        """Change updated_at of a review and get the last updated one"""
+        review.updated_at = datetime.now()
+        return storage.between(Review, "updated_at", limit=1, reverse=True)
+
+    updated = min(timeit.repeat(update, number=100, repeat=3)) / 100
+    print("update, then query: {:.3f} ms".format(updated * 1000))
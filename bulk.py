@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+"""Bulk import and export of the objects of a class
+
+Usage:
+    ./bulk.py export <class name> [-f ndjson|csv] [-o <file>]
+    ./bulk.py import <class name> [-f ndjson|csv] [-i <file>] [-b <size>]
+
+Objects are read and written one row at a time. Imports are committed
+every <size> rows, and progress is reported on stderr. The store is
+reloaded lazily, exports write the stored dictionaries of the class
+without building its objects, and with the file storage engine imports
+append their rows to the journal without building them, so neither
+needs the objects to fit in memory.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from itertools import islice
+
+os.environ.setdefault("HBNB_LAZY_RELOAD", "1")
+
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+
+
+def columns(cls):
+    """Return the CSV columns of cls: the common attributes, then the
+    public class attributes declared by cls and its parents
+    """
+    names = ["id", "created_at", "updated_at"]
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if (not name.startswith("_") and not callable(value) and
+                    not isinstance(value, (classmethod, staticmethod)) and
+                    name not in names):
+                names.append(name)
+    return names
+
+
+def export_objects(cls, out, fmt="ndjson"):
+    """Write the objects of cls to out, one row per object
+
+    Args:
+        cls (type): The class whose objects (and subclass objects)
+            are written.
+        out (file): A text file opened for writing.
+        fmt (str): "ndjson" for one to_dict() per line, or "csv" for the
+            columns() of cls, with lists and dicts encoded as JSON.
+
+    Returns:
+        The number of objects written.
+    """
+    count = 0
+    if fmt == "csv":
+        names = columns(cls)
+        writer = csv.writer(out)
+        writer.writerow(names)
+    for obj_dict in storage.dicts(cls):
+        if fmt == "csv":
+            row = [obj_dict.get(name, getattr(cls, name, ""))
+                   for name in names]
+            writer.writerow([json.dumps(value)
+                             if isinstance(value, (list, dict)) else value
+                             for value in row])
+        else:
+            out.write(json.dumps(obj_dict) + "\n")
+        count += 1
+    return count
+
+
+def read_rows(cls, f, fmt="ndjson"):
+    """Yield the dictionaries of the rows of f, typed for cls
+
+    CSV values are converted to the type of the class attribute of the
+    same name. Rows without an id get a new id and timestamps.
+    """
+    if fmt == "csv":
+        rows = csv.DictReader(f)
+    else:
+        rows = (json.loads(line) for line in f if line.strip())
+    for row in rows:
+        if fmt == "csv":
+            row = {name: convert(cls, name, value)
+                   for name, value in row.items() if value != ""}
+        if "id" not in row:
+            now = datetime.now().isoformat()
+            row.update(id=str(uuid.uuid4()), created_at=now, updated_at=now)
+        row["__class__"] = cls.__name__
+        yield row
+
+
+def convert(cls, name, value):
+    """Convert the CSV text value to the type of cls.<name>"""
+    default = getattr(cls, name, None)
+    if isinstance(default, bool):
+        return value.lower() in ("1", "true")
+    if isinstance(default, (int, float)):
+        return type(default)(value)
+    if isinstance(default, (list, dict)):
+        return json.loads(value)
+    return value
+
+
+def import_objects(cls, f, fmt="ndjson", batch_size=10000, progress=None):
+    """Store the objects of the rows of f
+
+    With the file storage engine the rows are appended to the journal
+    without building their objects, and the objects are only stored in
+    memory by the next reload(). Otherwise they are built and saved.
+
+    Args:
+        cls (type): The class of the imported objects.
+        f (file): A text file opened for reading.
+        fmt (str): "ndjson" or "csv", as written by export_objects().
+        batch_size (int): The number of objects committed at a time.
+        progress (file): Where to report progress, if anywhere.
+
+    Returns:
+        The number of objects imported.
+    """
+    count = 0
+    start = time.monotonic()
+    rows = read_rows(cls, f, fmt)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if batch and type(storage) is FileStorage:
+            storage.append(batch)
+        elif batch:
+            with storage.batch():
+                for row in batch:
+                    storage.new(cls.from_dict(row))
+        count += len(batch)
+        if progress is not None and (batch or count == 0):
+            elapsed = time.monotonic() - start
+            progress.write("{} {} objects imported ({:.0f}/s)\n".format(
+                count, cls.__name__, count / elapsed if elapsed else 0))
+            progress.flush()
+        if len(batch) < batch_size:
+            return count
+
+
+def main(argv=None):
+    """Run the command line"""
+    parser = argparse.ArgumentParser(
+        description="Bulk import and export of stored objects")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("class_name", choices=list(storage.registry))
+    parser.add_argument("-f", "--format", default="ndjson",
+                        choices=["ndjson", "csv"])
+    parser.add_argument("-i", "--input", default="-")
+    parser.add_argument("-o", "--output", default="-")
+    parser.add_argument("-b", "--batch-size", type=int, default=10000)
+    args = parser.parse_args(argv)
+    cls = storage.registry[args.class_name]
+    if args.action == "export":
+        if args.output == "-":
+            export_objects(cls, sys.stdout, args.format)
+        else:
+            with open(args.output, "w", newline="") as out:
+                export_objects(cls, out, args.format)
+        return
+    if args.input == "-":
+        import_objects(cls, sys.stdin, args.format, args.batch_size,
+                       sys.stderr)
+    else:
+        with open(args.input, "r", newline="") as f:
+            import_objects(cls, f, args.format, args.batch_size,
+                           sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
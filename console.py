@@ -1,14 +1,10 @@
 #!/usr/bin/python3
 """The command interpreter"""
+import ast
 import cmd
+import re
 import shlex
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.amenity import Amenity
-from models.place import Place
-from models.review import Review
+from itertools import islice
 from models import storage
 
 
@@ -17,61 +13,47 @@ class HBNBCommand(cmd.Cmd):
 
     prompt = "(hbnb) "
 
-    l_classes = {
-        'BaseModel': BaseModel,
-        'User': User,
-        'State': State,
-        'City': City,
-        'Amenity': Amenity,
-        'Place': Place,
-        'Review': Review,
-        'count': None
-    }
+    l_classes = dict(storage.registry, count=None)
+
+    dotted_commands = ["all", "count", "show", "destroy", "update", "where"]
+
+    flush_every = 100
 
     def default(self, line):
-        """Handle unknown commands:
-        <class name>.all()
+        """Handle <class name>.<command>(<arguments>) for any class:
+        <class name>.all([limit=<n>, offset=<n>])
         <class name>.count()
         <class name>.show(<id>)
         <class name>.destroy(<id>)
         <class name>.update(<id>, <attribute name>, <attribute value>)
         <class name>.update(<id>, <dictionary representation>)
+        <class name>.where(<attribute>=<value>, ...)
         """
-        if line.endswith(".all()"):
-            class_name = line[:-6]
-            self.do_all(class_name)
-        elif line.endswith(".count()"):
-            class_name = line[:-7]
-            self.do_count(class_name)
-        elif line.startswith("User.show(") and line.endswith('")'):
-            class_name, id_part = line.split(".show(")
-            instance_id = id_part.strip(')"')
-            self.do_show(f"{class_name} {instance_id}")
-        elif line.startswith("User.destroy(\"") and line.endswith('")'):
-            class_name, id_part = line.split(".destroy(\"")
-            instance_id = id_part.strip('")')
-            self.do_destroy(f"{class_name} {instance_id}")
-        elif line.startswith("User.update(") and line.endswith(')'):
-            self.do_update(line)
-        else:
-            print(f"*** Unknown command: {line} ***")
+        match = re.fullmatch(r"(\w*)\.(\w+)\((.*)\)", line.strip())
+        if match is None or match.group(2) not in self.dotted_commands:
+            return super().default(line)
+        class_name, command, arguments = match.groups()
+        if command == "count":
+            return self.do_count(class_name)
+        getattr(self, "do_" + command)("{} {}".format(class_name,
+                                                      arguments))
 
     def lookup_instance(self, args):
         """Find and return an instance based on class name and ID."""
-        if len(args) < 2:
+        if len(args) < 1:
             raise ValueError("** class name missing **")
-
-        class_name, obj_id = args[0], args[1].strip('"')
-        cls = self.l_classes.get(class_name)
+        cls = self.l_classes.get(args[0])
         if cls is None:
-            raise ValueError(f"** class {class_name} doesn't exist **")
+            raise ValueError("** class doesn't exist **")
+        if len(args) < 2:
+            raise ValueError("** instance id missing **")
 
-        objects = storage.all()
-        for obj in objects.values():
-            if obj.id == obj_id and isinstance(obj, cls):
-                return obj
+        class_name, obj_id = args[0], args[1].strip('"')
 
-        raise ValueError("** no instance found **")
+        obj = storage.get(class_name, obj_id)
+        if obj is None:
+            raise ValueError("** no instance found **")
+        return obj
 
     def do_show(self, arg):
         """Shows string representation of an instance passed."""
@@ -95,17 +77,8 @@ class HBNBCommand(cmd.Cmd):
         try:
             args = arg.split()
             instance = self.lookup_instance(args)
-            key_to_delete = None
-            for key, obj in storage.all().items():
-                if obj is instance:
-                    key_to_delete = key
-                    break
-
-            if key_to_delete:
-                del storage.all()[key_to_delete]
-                storage.save()
-            else:
-                raise ValueError("** no instance found **")
+            storage.delete(instance)
+            storage.save()
         except ValueError as e:
             print(e)
 
@@ -126,56 +99,92 @@ class HBNBCommand(cmd.Cmd):
             print(e)
 
     def do_all(self, arg):
-        """Prints string representation of all instances of a given class"""
+        """Prints string representation of all instances, or of all
+        instances of a given class, as they are built:
+        all [<class name>] [limit=<n>, offset=<n>]
+        or <class name>.all([limit=<n>, offset=<n>])
+        limit=<n> and offset=<n> page the instances.
+        """
         try:
-            if not arg:
-                raise ValueError("** class name missing **")
-
-            args = arg.split()
-            class_name = args[0]
-
-            if class_name not in self.l_classes:
+            class_name, _, arguments = arg.strip().partition(" ")
+            if "=" in class_name:
+                class_name, arguments = "", arg
+            if class_name and class_name not in self.l_classes:
                 raise ValueError("** class doesn't exist **")
-
-            objects = storage.all()
-            instances = [str(obj) for obj in objects.values()
-                         if isinstance(obj, self.l_classes[class_name])]
-            print(instances)
+            paging = keyword_arguments(arguments)
+            limit = paging.pop("limit", None)
+            offset = paging.pop("offset", 0)
+            if (paging or not (limit is None or is_count(limit)) or
+                    not is_count(offset)):
+                raise ValueError("** invalid arguments **")
         except ValueError as e:
             print(e)
+            return
+        objects = storage.values(class_name or None)
+        stop = None if limit is None else offset + limit
+        # the same output as print([str(obj) for obj in objects]), written
+        # flush_every instances at a time instead of after building every
+        # string
+        separator = "["
+        chunk = []
+        for obj in islice(objects, offset, stop):
+            chunk.append(repr(str(obj)))
+            if len(chunk) == self.flush_every:
+                print(separator + ", ".join(chunk), end="", flush=True)
+                separator = ", "
+                chunk = []
+        if chunk:
+            print(separator + ", ".join(chunk), end="")
+        elif separator == "[":
+            print("[", end="")
+        print("]", flush=True)
 
     def do_update(self, arg):
         """Updates an instance based on the class name and id by adding or
-        updating attribute (save the change into the JSON file).
+        updating attribute (save the change into the JSON file):
+        update <class name> <id> <attribute name> "<attribute value>"
+        or update <class name> <id> <dictionary representation>
+        A value is converted to the type of the class attribute it sets,
+        and the values of a dictionary keep the types of their literals.
         """
         try:
-            if not arg:
-                raise ValueError("** class name missing **")
-
-            a = ""
-            for argv in arg.split(','):
-                a = a + argv
-
-            args = shlex.split(a)
-
-            if args[0] not in self.l_classes:
-                raise ValueError("** class doesn't exist **")
-            if len(args) == 1:
-                raise ValueError("** instance id missing **")
-
-            objects = storage.all()
-            for obj in objects.values():
-                if obj.id == args[1].strip('"') and isinstance(
-                        obj, self.l_classes[args[0]]):
-                    if len(args) == 2:
+            head, brace, tail = arg.partition("{")
+            if brace:
+                try:
+                    names = split_arguments(head)
+                except ValueError:
+                    names = []
+                if len(names) == 2:
+                    obj = self.lookup_instance(names)
+                    try:
+                        attributes = ast.literal_eval(brace + tail)
+                        if not isinstance(attributes, dict):
+                            raise ValueError
+                    except (SyntaxError, ValueError):
+                        raise ValueError("** invalid dictionary **")
+                    if not attributes:
                         raise ValueError("** attribute name missing **")
-                    elif len(args) == 3:
-                        raise ValueError("** value missing **")
-
-                    setattr(obj, args[2], args[3])
+                    for name, value in attributes.items():
+                        setattr(obj, str(name), value)
                     storage.save()
                     return
-            raise ValueError("** no instance found **")
+
+            args = split_arguments(arg)
+            obj = self.lookup_instance(args)
+            if len(args) == 2:
+                raise ValueError("** attribute name missing **")
+            elif len(args) == 3:
+                raise ValueError("** value missing **")
+
+            value = args[3]
+            default = getattr(self.l_classes[args[0]], args[2], None)
+            if type(default) in (int, float):
+                try:
+                    value = type(default)(value)
+                except ValueError:
+                    pass
+            setattr(obj, args[2], value)
+            storage.save()
         except ValueError as e:
             print(e)
 
@@ -192,10 +201,88 @@ class HBNBCommand(cmd.Cmd):
             if class_name not in self.l_classes:
                 raise ValueError(f"** class {class_name} doesn't exist **")
 
-            objects = storage.all()
-            count = len([obj for obj in objects.values()
-                         if isinstance(obj, self.l_classes[class_name])])
-            print(count)
+            print(storage.count(class_name))
+        except ValueError as e:
+            print(e)
+
+    def do_where(self, arg):
+        """Prints string representation of the instances of a given class
+        matching every predicate, one per line as they are found:
+        where <class name> <attribute>=<value>, ...
+        or <class name>.where(<attribute>=<value>, ...)
+        Values are Python literals. An attribute may end with __in, __gt,
+        __gte, __lt, __lte, __range or __prefix, and order_by=<attribute>
+        (-<attribute> for descending), limit=<n> and offset=<n> page the
+        instances.
+        """
+        try:
+            class_name, _, arguments = arg.strip().partition(" ")
+            if not class_name:
+                raise ValueError("** class name missing **")
+            if class_name not in storage.registry:
+                raise ValueError("** class doesn't exist **")
+            predicates = keyword_arguments(arguments)
+            order_by = predicates.pop("order_by", None)
+            limit = predicates.pop("limit", None)
+            offset = predicates.pop("offset", 0)
+            if not (isinstance(order_by, (str, type(None))) and
+                    (limit is None or is_count(limit)) and
+                    is_count(offset)):
+                raise ValueError("** invalid arguments **")
+            try:
+                query = storage.query(class_name).filter(**predicates)
+                if order_by:
+                    query.order_by(order_by)
+                for obj in query.offset(offset).limit(limit):
+                    print(obj)
+            except (TypeError, ValueError):
+                raise ValueError("** invalid arguments **")
+        except ValueError as e:
+            print(e)
+
+    def do_near(self, arg):
+        """Prints string representation of the instances of a given class
+        at most <radius> kilometers away from a location, nearest first:
+        near <class name> <latitude> <longitude> <radius>
+        """
+        try:
+            args = arg.split()
+            if not args:
+                raise ValueError("** class name missing **")
+            if args[0] not in self.l_classes:
+                raise ValueError("** class doesn't exist **")
+            if len(args) < 4:
+                raise ValueError("** location missing **")
+            try:
+                latitude, longitude, radius = map(float, args[1:4])
+            except ValueError:
+                raise ValueError("** invalid location **")
+            try:
+                objects = storage.near(args[0], latitude, longitude, radius)
+            except KeyError:
+                raise ValueError("** class has no location **")
+            print([str(obj) for obj in objects.values()])
+        except ValueError as e:
+            print(e)
+
+    def do_search(self, arg):
+        """Prints string representation of the 10 instances of a given
+        class best matching words, best first:
+        search <class name> <words>
+        """
+        try:
+            args = arg.split()
+            if not args:
+                raise ValueError("** class name missing **")
+            if args[0] not in self.l_classes:
+                raise ValueError("** class doesn't exist **")
+            if len(args) < 2:
+                raise ValueError("** words missing **")
+            try:
+                objects = storage.search(args[0], " ".join(args[1:]))
+            except KeyError:
+                raise ValueError("** class has no text **")
+            print([str(obj) for obj in objects.values()])
         except ValueError as e:
             print(e)
 
@@ -216,5 +303,39 @@ class HBNBCommand(cmd.Cmd):
         return True
 
 
+def split_arguments(text):
+    """Return the words of text separated by spaces or commas, quoted
+    words as a shell would split them
+    """
+    lexer = shlex.shlex(text, posix=True)
+    lexer.whitespace += ","
+    lexer.whitespace_split = True
+    return list(lexer)
+
+
+def keyword_arguments(text):
+    """Return the dictionary of the keyword arguments written in text, as
+    in a Python call, whose values are literals
+
+    Raises:
+        ValueError: If text holds anything else.
+    """
+    try:
+        call = ast.parse("f({})".format(text), mode="eval").body
+        if call.args or any(keyword.arg is None
+                            for keyword in call.keywords):
+            raise ValueError
+        return {keyword.arg: ast.literal_eval(keyword.value)
+                for keyword in call.keywords}
+    except (SyntaxError, ValueError):
+        raise ValueError("** invalid arguments **")
+
+
+def is_count(value):
+    """Tell whether value is an int of at least 0"""
+    return (isinstance(value, int) and not isinstance(value, bool) and
+            value >= 0)
+
+
 if __name__ == '__main__':
     HBNBCommand().cmdloop()
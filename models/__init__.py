@@ -1,6 +1,37 @@
 #!/usr/bin/python3
-"""Package Initialization"""
+"""Package Initialization
+
+The storage engine is selected with the HBNB_TYPE_STORAGE environment
+variable: "file" (the default) for FileStorage, "sqlite" for SQLiteStorage.
+Setting HBNB_JOURNAL makes FileStorage append saves to its journal,
+HBNB_SHARDED makes it store each class in its own shard file,
+HBNB_LAZY_RELOAD makes it build objects on first access,
+HBNB_FLUSH_INTERVAL (in seconds) makes it write saves in the background,
+HBNB_FILE_FORMAT=binary makes it use the compact binary format, and
+HBNB_READ_ONLY makes it map the binary files read-only instead of loading
+them. HBNB_COMPACT_OBJECTS makes either engine, and the model classes, build
+objects with the __slots__ classes of models.compact. HBNB_RELOAD_CLASSES, a
+comma-separated list of class names, makes reload() only load the tables
+or shards of those classes.
+"""
+import atexit
+from os import getenv
 from models.engine.file_storage import FileStorage
 
-storage = FileStorage()
-storage.reload()
+FileStorage.compact_objects = bool(getenv("HBNB_COMPACT_OBJECTS"))
+if getenv("HBNB_TYPE_STORAGE") == "sqlite":
+    from models.engine.sqlite_storage import SQLiteStorage
+    SQLiteStorage.path = getenv("HBNB_SQLITE_PATH", SQLiteStorage.path)
+    storage = SQLiteStorage()
+else:
+    FileStorage.journal = bool(getenv("HBNB_JOURNAL"))
+    FileStorage.sharded = bool(getenv("HBNB_SHARDED"))
+    FileStorage.lazy = bool(getenv("HBNB_LAZY_RELOAD"))
+    FileStorage.flush_interval = float(getenv("HBNB_FLUSH_INTERVAL", 0))
+    FileStorage.file_format = getenv("HBNB_FILE_FORMAT", "json")
+    FileStorage.read_only = bool(getenv("HBNB_READ_ONLY"))
+    storage = FileStorage()
+reload_classes = getenv("HBNB_RELOAD_CLASSES")
+storage.reload(classes=reload_classes.split(",") if reload_classes else None)
+# write a save still left to the background flusher before exiting
+atexit.register(storage.flush)
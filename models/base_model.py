@@ -1,21 +1,34 @@
 #!/usr/bin/python3
 """Class BaseModel"""
 import uuid
+from abc import ABCMeta
 from datetime import datetime
 import models
 
 
-class BaseModel:
-    """Base model for common attributes/methods"""
+class BaseModel(metaclass=ABCMeta):
+    """Base model for common attributes/methods
+
+    The ABCMeta metaclass lets the compact classes of models.compact be
+    registered as virtual subclasses of the model classes.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        """Create an instance, or an initialized instance of the compact
+        class standing in for cls when the storage builds compact objects
+        """
+        if getattr(getattr(models, "storage", None), "compact_objects",
+                   False):
+            from models.compact import compact_class
+            return compact_class(cls)(*args, **kwargs)
+        return super().__new__(cls)
 
     def __init__(self, *args, **kwargs):
         """Initialize BaseModel instance"""
         if kwargs:
             for key, value in kwargs.items():
                 if key == 'created_at' or key == 'updated_at':
-                    setattr(self,
-                            key,
-                            datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f'))
+                    setattr(self, key, datetime.fromisoformat(value))
                 elif key != '__class__':
                     setattr(self, key, value)
         else:
@@ -23,6 +36,49 @@ class BaseModel:
             self.created_at = self.updated_at = datetime.now()
             models.storage.new(self)
 
+    @classmethod
+    def from_dict(cls, obj_dict):
+        """Build an instance from a to_dict() dictionary
+
+        The attributes are set without going through __init__ and
+        __setattr__, since the instance is not stored yet. The timestamps
+        may already be datetime objects.
+        """
+        obj = object.__new__(cls)
+        setter = object.__setattr__
+        for key, value in obj_dict.items():
+            if key == 'created_at' or key == 'updated_at':
+                if type(value) is not datetime:
+                    value = datetime.fromisoformat(value)
+                setter(obj, key, value)
+            elif key != '__class__':
+                setter(obj, key, value)
+        return obj
+
+    def _restore(self, attrs):
+        """Replace every attribute with those of the dictionary attrs,
+        without flagging the instance as changed
+        """
+        self.__dict__.clear()
+        self.__dict__.update(attrs)
+
+    def __setattr__(self, name, value):
+        """Set an attribute and flag the instance as changed in storage"""
+        attrs = self.__dict__
+        if name in attrs:
+            previous = attrs[name]
+            super().__setattr__(name, value)
+            models.storage.mark_dirty(self, name, previous)
+        else:
+            super().__setattr__(name, value)
+            models.storage.mark_dirty(self, name)
+
+    def __delattr__(self, name):
+        """Delete an attribute and flag the instance as changed in storage"""
+        previous = self.__dict__.get(name)
+        super().__delattr__(name)
+        models.storage.mark_dirty(self, name, previous)
+
     def __str__(self):
         """Return a string representation of the instance"""
         class_name = self.__class__.__name__
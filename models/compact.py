@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+"""Compact representations of the model classes
+
+compact_class() returns a stand-in for a model class whose instances
+keep their attributes in __slots__ instead of a per-instance __dict__.
+Attributes that are not declared by the model class go to an overflow
+dictionary, and the order the attributes were set in is kept in a tuple
+shared by every instance with the same attributes, so __str__() and
+to_dict() output what the model class would.
+
+A compact class is registered as a virtual subclass of its model class:
+isinstance() and issubclass() checks against the model class hold, and
+instances have the same class name.
+"""
+import sys
+from copy import copy
+from datetime import datetime
+import models
+from models.base_model import BaseModel
+
+_SHAPES = {}
+_CLASSES = {}
+
+
+def compact_class(cls):
+    """Return the compact class standing in for the model class cls"""
+    compact = _CLASSES.get(cls)
+    if compact is not None:
+        return compact
+    fields = ["id", "created_at", "updated_at"]
+    namespace = {"__module__": cls.__module__,
+                 "__qualname__": cls.__qualname__, "__doc__": cls.__doc__,
+                 "model": cls}
+    for klass in reversed(cls.__mro__[:-1]):
+        for name, value in vars(klass).items():
+            if name.startswith("_") or name in vars(CompactModel):
+                continue
+            if callable(value) or isinstance(value, (classmethod,
+                                                     staticmethod)):
+                namespace[name] = value
+            elif name not in fields:
+                fields.append(name)
+    namespace["__slots__"] = tuple(fields)
+    namespace["fields"] = frozenset(fields)
+    namespace["mutable_fields"] = tuple(
+        name for name in fields
+        if isinstance(getattr(cls, name, None), (list, dict)))
+    compact = type(cls.__name__, (CompactModel,), namespace)
+    cls.register(compact)
+    _CLASSES[cls] = compact
+    return compact
+
+
+def _shape(names):
+    """Return the shared tuple equal to the tuple of attribute names"""
+    return _SHAPES.setdefault(names, names)
+
+
+class CompactModel:
+    """Represent the common behavior of the compact classes.
+
+    Attributes:
+        model (type): The model class the compact class stands in for.
+        fields (frozenset): The attributes kept in __slots__: the common
+            attributes and the class attributes of the model class.
+        mutable_fields (tuple): The fields whose default is a list or a
+            dictionary.
+        _order (tuple): The names of the attributes set on the instance,
+            in the order they were set.
+        _overflow (dict): The attributes that are not fields, or None.
+    """
+    __slots__ = ("_order", "_overflow")
+    model = BaseModel
+    fields = frozenset()
+    mutable_fields = ()
+    __init__ = BaseModel.__init__
+    __str__ = BaseModel.__str__
+
+    def __new__(cls, *args, **kwargs):
+        """Create an instance without attributes"""
+        obj = object.__new__(cls)
+        object.__setattr__(obj, "_order", ())
+        object.__setattr__(obj, "_overflow", None)
+        return obj
+
+    @classmethod
+    def from_dict(cls, obj_dict):
+        """Build an instance from a to_dict() dictionary
+
+        Equal timestamps share one datetime, and the values of the *_id
+        foreign keys are interned, so they are shared by every instance
+        referring to the same object. The timestamps may already be
+        datetime objects.
+        """
+        attrs = {}
+        dates = {}
+        for key, value in obj_dict.items():
+            if key == 'created_at' or key == 'updated_at':
+                if type(value) is not datetime:
+                    if value not in dates:
+                        dates[value] = datetime.fromisoformat(value)
+                    value = dates[value]
+                attrs[key] = value
+            elif key.endswith('_id') and type(value) is str:
+                attrs[key] = sys.intern(value)
+            elif key != '__class__':
+                attrs[key] = value
+        obj = cls.__new__(cls)
+        obj._restore(attrs)
+        return obj
+
+    @property
+    def __dict__(self):
+        """Return a dictionary of the attributes, in the order they were
+        set; changing it does not change the instance
+        """
+        return {name: getattr(self, name) for name in self._order}
+
+    def __getattr__(self, name):
+        """Return an overflow attribute, or the default of a field
+
+        A mutable default (like Place.amenity_ids) is copied into its
+        slot, so it is never shared between instances. Like a class
+        attribute read through an instance of the model class, the copy
+        is not an attribute set on the instance: it is left out of
+        __str__() and to_dict() and does not flag the instance as changed.
+        """
+        overflow = self._overflow
+        if overflow is not None and name in overflow:
+            return overflow[name]
+        if name in self.fields and hasattr(self.model, name):
+            default = getattr(self.model, name)
+            if isinstance(default, (list, dict)):
+                default = copy(default)
+                object.__setattr__(self, name, default)
+            return default
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+            type(self).__name__, name))
+
+    def __setattr__(self, name, value):
+        """Set an attribute and flag the instance as changed in storage"""
+        if name in self._order:
+            previous = getattr(self, name)
+            self.__store(name, value)
+            models.storage.mark_dirty(self, name, previous)
+        else:
+            self.__store(name, value)
+            models.storage.mark_dirty(self, name)
+
+    def __delattr__(self, name):
+        """Delete an attribute and flag the instance as changed in storage"""
+        if name not in self._order:
+            raise AttributeError(name)
+        previous = getattr(self, name)
+        object.__setattr__(self, "_order", _shape(
+            tuple(attr for attr in self._order if attr != name)))
+        if name in self.fields:
+            object.__delattr__(self, name)
+        else:
+            del self._overflow[name]
+        models.storage.mark_dirty(self, name, previous)
+
+    def __store(self, name, value):
+        """Set an attribute without flagging the instance as changed"""
+        if name not in self._order:
+            object.__setattr__(self, "_order", _shape(self._order + (name,)))
+        if name in self.fields:
+            object.__setattr__(self, name, value)
+        else:
+            if self._overflow is None:
+                object.__setattr__(self, "_overflow", {})
+            self._overflow[name] = value
+
+    def _restore(self, attrs):
+        """Replace every attribute with those of the dictionary attrs,
+        without flagging the instance as changed
+        """
+        fields = self.fields
+        setter = object.__setattr__
+        for name in self._order:
+            if name in fields:
+                object.__delattr__(self, name)
+        for name in self.mutable_fields:
+            if name not in self._order:
+                try:
+                    object.__delattr__(self, name)
+                except AttributeError:
+                    pass
+        overflow = None
+        for name, value in attrs.items():
+            if name in fields:
+                setter(self, name, value)
+            else:
+                if overflow is None:
+                    overflow = {}
+                overflow[name] = value
+        setter(self, "_overflow", overflow)
+        setter(self, "_order", _shape(tuple(attrs)))
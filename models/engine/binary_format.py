@@ -0,0 +1,334 @@
+#!/usr/bin/python3
+"""A compact binary alternative to the JSON object file
+
+A binary file starts with MAGIC and holds a sequence of records, each
+written as its length (a little-endian unsigned 32-bit integer) and its
+body, so records can be read one after the other or from their offset.
+The first byte of a body is its kind:
+
+    SCHEMA  The schema number, the class name, and the name and type tag
+            of each attribute shared by the objects that follow it.
+    OBJECT  The schema number, the fixed-size data of the attributes of
+            the schema packed together, then the text of its strings.
+
+Canonical UUID strings take 16 bytes and isoformat() timestamps an
+integer count of microseconds, so ids, foreign keys and dates are not
+stored as text. The "__class__" and storage key of an object come from
+its schema.
+"""
+import json
+import struct
+import uuid
+from datetime import datetime, timedelta
+from models.engine.json_stream import iter_items as iter_json
+
+MAGIC = b"HBNB\x01"
+SCHEMA = 0
+OBJECT = 1
+
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+_STR = ord("s")
+_UUID = ord("u")
+_DATE = ord("d")
+_INT = ord("i")
+_FLOAT = ord("f")
+_BOOL = ord("b")
+_NONE = ord("n")
+_JSON = ord("j")
+
+# the struct format of the fixed-size data of each type tag; the text of
+# strings follows the fixed-size data and is represented by its length
+_FORMATS = {_STR: "I", _UUID: "16s", _DATE: "q", _INT: "q", _FLOAT: "d",
+            _BOOL: "?", _NONE: "0s", _JSON: "I"}
+
+
+class Schema:
+    """Represent the attributes shared by objects of one class.
+
+    Attributes:
+        class_name (str): The name of the class of the objects.
+        fields (tuple): The (attribute name, type tag) pairs, in order.
+        layout (struct.Struct): The format of the fixed-size data.
+    """
+
+    def __init__(self, class_name, fields):
+        """Initialize the schema of class_name objects with fields"""
+        self.class_name = class_name
+        self.fields = tuple(fields)
+        self.layout = struct.Struct(
+            "<" + "".join(_FORMATS[tag] for name, tag in self.fields))
+        self.__names = [name for name, tag in self.fields]
+        self.__texts = [(i, tag == _JSON)
+                        for i, (name, tag) in enumerate(self.fields)
+                        if tag == _STR or tag == _JSON]
+        self.__uuids = self.__positions(_UUID)
+        self.__dates = self.__positions(_DATE)
+        self.__nones = self.__positions(_NONE)
+
+    def __positions(self, tag):
+        """Return the positions of the fields of type tag"""
+        return [i for i, field in enumerate(self.fields) if field[1] == tag]
+
+    def decode(self, data, pos, native=False):
+        """Return the to_dict() dictionary of the object data at pos
+
+        Args:
+            data (bytes): The content of a binary file, or a memory map.
+            pos (int): Where the fixed-size data of the object starts.
+            native (bool): Keep the timestamps as datetime objects, as
+                from_dict() accepts them, instead of isoformat() strings.
+        """
+        values = list(self.layout.unpack_from(data, pos))
+        pos += self.layout.size
+        for i, is_json in self.__texts:
+            size = values[i]
+            text = str(data[pos:pos + size], "utf-8")
+            pos += size
+            values[i] = json.loads(text) if is_json else text
+        for i in self.__uuids:
+            b = values[i]
+            values[i] = "%s-%s-%s" % (b[:4].hex(), b[4:10].hex("-", 2),
+                                      b[10:].hex())
+        if native:
+            dates = {}
+            for i in self.__dates:
+                micro = values[i]
+                date = dates.get(micro)
+                if date is None:
+                    date = dates[micro] = _EPOCH + micro * _MICROSECOND
+                values[i] = date
+        else:
+            for i in self.__dates:
+                values[i] = (_EPOCH + values[i] * _MICROSECOND).isoformat()
+        for i in self.__nones:
+            values[i] = None
+        value = dict(zip(self.__names, values))
+        value["__class__"] = self.class_name
+        return value
+
+
+class Writer:
+    """Represent a binary file being written one object at a time.
+
+    Attributes:
+        __f (file): The binary file written to.
+        __schemas (dict): The number and Schema of each schema written so
+            far, keyed by (class name, fields).
+    """
+
+    def __init__(self, f):
+        """Write MAGIC to the binary file f opened for writing"""
+        self.__f = f
+        self.__schemas = {}
+        f.write(MAGIC)
+
+    def write(self, value):
+        """Write the to_dict() dictionary value, preceded by its schema
+        if no object of its class had the same attributes before
+        """
+        class_name = value["__class__"]
+        fields = []
+        items = []
+        texts = []
+        for name, attr in value.items():
+            if name == "__class__":
+                continue
+            tag, item, text = _encode(attr)
+            fields.append((name, tag))
+            items.append(item)
+            if text is not None:
+                texts.append(text)
+        key = (class_name, tuple(fields))
+        entry = self.__schemas.get(key)
+        if entry is None:
+            entry = (len(self.__schemas), Schema(class_name, fields))
+            self.__schemas[key] = entry
+            body = bytearray((SCHEMA,))
+            body += _U32.pack(entry[0])
+            _put_name(body, class_name)
+            body += _U16.pack(len(fields))
+            for name, tag in fields:
+                _put_name(body, name)
+                body.append(tag)
+            self.__record(body)
+        body = bytearray((OBJECT,))
+        body += _U32.pack(entry[0])
+        body += entry[1].layout.pack(*items)
+        for text in texts:
+            body += text
+        self.__record(body)
+
+    def __record(self, body):
+        """Write body, prefixed with its length"""
+        self.__f.write(_U32.pack(len(body)))
+        self.__f.write(body)
+
+
+def dump(values, f):
+    """Write every to_dict() dictionary of values to the binary file f"""
+    writer = Writer(f)
+    for value in values:
+        writer.write(value)
+
+
+def iter_records(data, offset=len(MAGIC)):
+    """Yield the (offset, kind) of each record of data from offset.
+    Empty data holds no records.
+
+    Args:
+        data (bytes): The content of a binary file, or a memory map of it.
+        offset (int): Where the first record starts.
+
+    Raises:
+        ValueError: If data does not start with MAGIC.
+    """
+    if len(data) == 0:
+        return
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a binary storage file")
+    end = len(data)
+    while offset < end:
+        yield offset, data[offset + 4]
+        offset += 4 + _U32.unpack_from(data, offset)[0]
+
+
+def read_schema(data, offset):
+    """Return the (number, Schema) of the SCHEMA record at offset"""
+    pos = offset + 5
+    number = _U32.unpack_from(data, pos)[0]
+    class_name, pos = _get_name(data, pos + 4)
+    count = _U16.unpack_from(data, pos)[0]
+    pos += 2
+    fields = []
+    for _ in range(count):
+        name, pos = _get_name(data, pos)
+        fields.append((name, data[pos]))
+        pos += 1
+    return number, Schema(class_name, fields)
+
+
+def read_object(data, offset, schemas, native=False):
+    """Return the (key, to_dict() dictionary) of the OBJECT record at offset
+
+    Args:
+        data (bytes): The content of a binary file, or a memory map of it.
+        offset (int): Where the record starts.
+        schemas (dict): The Schema of each schema number read so far.
+        native (bool): Keep the timestamps as datetime objects.
+    """
+    value = schemas[_U32.unpack_from(data, offset + 5)[0]].decode(
+        data, offset + 9, native)
+    return "{}.{}".format(value["__class__"], value["id"]), value
+
+
+def iter_items(f, native=False, chunk_size=65536):
+    """Yield the (key, to_dict() dictionary) pairs stored in the binary
+    file f. An empty file holds no entries.
+
+    The file is read chunk_size bytes at a time, and the records in each
+    chunk are decoded in place, so only a chunk is held in memory.
+
+    Args:
+        f (file): A binary file opened for reading.
+        native (bool): Keep the timestamps as datetime objects.
+        chunk_size (int): The number of bytes read at a time.
+
+    Raises:
+        ValueError: If the file is not a binary storage file, or ends
+            within a record.
+    """
+    magic = f.read(len(MAGIC))
+    if not magic:
+        return
+    if magic != MAGIC:
+        raise ValueError("Not a binary storage file")
+    schemas = {}
+    data = b""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            if data:
+                raise ValueError("Truncated binary storage file")
+            return
+        data += chunk
+        pos = 0
+        end = len(data)
+        while pos + 4 <= end:
+            stop = pos + 4 + _U32.unpack_from(data, pos)[0]
+            if stop > end:
+                break
+            if data[pos + 4] == SCHEMA:
+                number, schema = read_schema(data, pos)
+                schemas[number] = schema
+            else:
+                yield read_object(data, pos, schemas, native)
+            pos = stop
+        data = data[pos:]
+
+
+def json_to_binary(json_path, binary_path):
+    """Convert the JSON object file json_path to the binary binary_path"""
+    with open(json_path, "r") as src, open(binary_path, "wb") as dst:
+        dump((value for key, value in iter_json(src)), dst)
+
+
+def binary_to_json(binary_path, json_path):
+    """Convert the binary file binary_path to the JSON object json_path"""
+    with open(binary_path, "rb") as src, open(json_path, "w") as dst:
+        dst.write("{")
+        for i, (key, value) in enumerate(iter_items(src)):
+            dst.write("{}{}: {}".format(", " if i else "", json.dumps(key),
+                                        json.dumps(value)))
+        dst.write("}")
+
+
+def _put_name(body, name):
+    """Append the UTF-8 name, prefixed with its length, to body"""
+    data = name.encode()
+    body += _U16.pack(len(data))
+    body += data
+
+
+def _get_name(data, pos):
+    """Return the name at pos and the position after it"""
+    size = _U16.unpack_from(data, pos)[0]
+    pos += 2
+    return str(data[pos:pos + size], "utf-8"), pos + size
+
+
+def _encode(value):
+    """Return the type tag of value, its fixed-size data and its encoded
+    text (or None)
+    """
+    if isinstance(value, str):
+        if len(value) == 36 and value[8] == "-":
+            try:
+                uid = uuid.UUID(value)
+            except ValueError:
+                uid = None
+            if uid is not None and str(uid) == value:
+                return _UUID, uid.bytes, None
+        elif len(value) in (19, 26) and value[10] == "T":
+            try:
+                date = datetime.fromisoformat(value)
+            except ValueError:
+                date = None
+            if (date is not None and date.tzinfo is None and
+                    date.isoformat() == value):
+                return _DATE, (date - _EPOCH) // _MICROSECOND, None
+        text = value.encode()
+        return _STR, len(text), text
+    if value is True or value is False:
+        return _BOOL, value, None
+    if value is None:
+        return _NONE, b"", None
+    if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+        return _INT, value, None
+    if type(value) is float:
+        return _FLOAT, value, None
+    text = json.dumps(value).encode()
+    return _JSON, len(text), text
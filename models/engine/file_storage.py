@@ -1,7 +1,12 @@
 #!/usr/bin/python3
 """The FileStorage class"""
+import io
 import json
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from itertools import product
 from models.base_model import BaseModel
 from models.user import User
 from models.state import State
@@ -9,6 +14,17 @@ from models.city import City
 from models.amenity import Amenity
 from models.place import Place
 from models.review import Review
+from models.compact import compact_class
+from models.engine import binary_format
+from models.engine.indexes import BitsetIndex, ColumnIndex, ForeignKeyIndex
+from models.engine.indexes import GridIndex, SortedIndex, TextIndex
+from models.engine.json_stream import iter_items
+from models.engine.mapped_store import MappedStore
+from models.engine.query import Query
+
+# the permission bits masked from new files, which mkstemp() ignores
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
 
 class FileStorage:
@@ -16,36 +32,995 @@ class FileStorage:
 
     Attributes:
         __file_path (str): The name of the file to save Objects to.
+        __journal_path (str): The name of the append-only journal file.
         __objects (dict): A dictionary of instantiated objects.
+        __dirty (set): Keys created, changed or deleted since the last save.
+        __fragments (dict): The cached JSON text of each clean object
+            without list or dictionary attributes,
+            stored as (object, text) pairs.
+        __journal_size (int): The number of records in the journal file.
+        __appended (bool): Whether append() wrote journal records of
+            objects that are not in __objects since the last reload().
+        __loaded (set): The classes whose shards were reloaded, or None
+            when every class was.
+        __by_class (dict): The objects of __objects grouped by class name.
+        __types (dict): The class of each class name in __by_class.
+        __indexed (dict): The __objects dictionary the indexes describe.
+        __indexes (dict): The secondary indexes, keyed by a descriptive tuple.
+        __raw (dict): The stored dictionaries of the objects not built yet
+            in lazy mode, grouped by class name and keyed like __objects.
+        registry (dict): The model classes that can be stored, by name.
+        classes (list): The names of the classes in registry.
+        foreign_keys (dict): The foreign key attributes of each class.
+        numeric_columns (dict): The numeric attributes of each class kept
+            in a ColumnIndex for in_ranges().
+        list_attributes (dict): The list attributes of each class kept in
+            a BitsetIndex for having().
+        locations (dict): The (latitude, longitude) attributes of each class
+            kept in a GridIndex for within(), near() and nearest().
+        text_attributes (dict): The text attributes of each class kept in
+            a TextIndex for search().
+        sorted_attributes (list): The datetime attributes of every class
+            kept in a SortedIndex for between().
+        journal (bool): Append changed objects to the journal on save
+            instead of rewriting the whole file.
+        compact_after (int): The minimum number of journal records before
+            the journal is folded back into __file_path.
+        sharded (bool): Store each class in its own <class name>.json
+            shard next to __file_path instead of a single file.
+        lazy (bool): Keep the dictionaries read by reload() and only build
+            an object the first time it is accessed.
+        flush_interval (float): When positive, save() only schedules a
+            write on a background thread this many seconds later, so the
+            saves made in the meantime are written together.
+        file_format (str): "json", or "binary" to store the snapshot and
+            shards in the format of binary_format, in .bin files named
+            like their JSON counterparts. The journal is always JSON.
+        read_only (bool): Map the binary files in memory on reload()
+            instead of reading them, and only decode an object the first
+            time it is accessed. Saving is not supported.
+        compact_objects (bool): Build the stored objects, and the new
+            instances of the model classes, as instances of the compact
+            classes of models.compact, which use __slots__.
+        __lock (threading.RLock): Serializes changes with the writes.
+        __flusher (threading.Timer): The scheduled background write.
+        __batch_depth (int): The number of batch() blocks being run.
+        __deferred (bool): Whether a background write was left to the end
+            of the running batch.
+        __undo (dict): The state before the running batch of each key it
+            changed, or None outside of a batch.
     """
     __file_path = "file.json"
+    __journal_path = "file.json.log"
     __objects = {}
-    classes = ["BaseModel", "User", "State",
-               "City", "Amenity", "Place", "Review"]
+    __dirty = set()
+    __fragments = {}
+    __journal_size = 0
+    __appended = False
+    __loaded = None
+    __by_class = {}
+    __types = {}
+    __indexed = None
+    __raw = {}
+    registry = {"BaseModel": BaseModel, "User": User, "State": State,
+                "City": City, "Amenity": Amenity, "Place": Place,
+                "Review": Review}
+    classes = list(registry)
+    foreign_keys = {"City": ["state_id"],
+                    "Place": ["city_id", "user_id"],
+                    "Review": ["place_id"]}
+    numeric_columns = {"Place": ["price_by_night", "max_guest",
+                                 "number_rooms", "number_bathrooms",
+                                 "latitude", "longitude"]}
+    __indexes = {("fk", name, attr): ForeignKeyIndex(name, attr)
+                 for name, attrs in foreign_keys.items() for attr in attrs}
+    __indexes.update({("columns", name): ColumnIndex(name, attrs)
+                      for name, attrs in numeric_columns.items()})
+    list_attributes = {"Place": ["amenity_ids"]}
+    __indexes.update({("bitset", name, attr): BitsetIndex(name, attr)
+                      for name, attrs in list_attributes.items()
+                      for attr in attrs})
+    locations = {"Place": ("latitude", "longitude")}
+    __indexes.update({("grid", name): GridIndex(name, *attrs)
+                      for name, attrs in locations.items()})
+    text_attributes = {"Place": ["name", "description"], "Review": ["text"]}
+    __indexes.update({("text", name): TextIndex(name, attrs)
+                      for name, attrs in text_attributes.items()})
+    sorted_attributes = ["created_at", "updated_at"]
+    __indexes.update({("sorted", name, attr): SortedIndex(name, attr)
+                      for name, attr in product(classes, sorted_attributes)})
+    journal = False
+    sharded = False
+    lazy = False
+    flush_interval = 0
+    file_format = "json"
+    read_only = False
+    compact_objects = False
+    __lock = threading.RLock()
+    __flusher = None
+    __batch_depth = 0
+    __deferred = False
+    __undo = None
+    compact_after = 1000
+
+    def all(self, cls=None):
+        """Returns the dictionary __objects, or only the objects of cls
+
+        Args:
+            cls (type or str): The class, or its name, whose instances
+                (including instances of its subclasses) are returned.
+        """
+        if cls is None:
+            for name in list(FileStorage.__raw):
+                self.__materialize(name)
+            return FileStorage.__objects
+        result = {}
+        for name in self.__family(cls):
+            self.__materialize(name)
+            result.update(FileStorage.__by_class.get(name, {}))
+        return result
+
+    def count(self, cls=None):
+        """Return the number of objects of cls, or of all objects
+
+        Args:
+            cls (type or str): The class, or its name, whose instances
+                (including instances of its subclasses) are counted.
+        """
+        if cls is None:
+            return len(FileStorage.__objects) + sum(
+                len(bucket) for bucket in FileStorage.__raw.values())
+        return sum(len(FileStorage.__by_class.get(name, {})) +
+                   len(FileStorage.__raw.get(name, {}))
+                   for name in self.__family(cls))
+
+    def get(self, cls, id):
+        """Return the object of class cls with the given id, or None
+
+        Args:
+            cls (type or str): The class of the object, or its name.
+            id (str): The id of the object.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        key = "{}.{}".format(name, id)
+        self.__materialize(name, key)
+        return FileStorage.__objects.get(key)
+
+    def __iter__(self):
+        """Iterate over every object, building lazily loaded ones on demand"""
+        return self.values()
+
+    def values(self, cls=None):
+        """Iterate over the objects of cls, or over every object,
+        building lazily loaded ones one at a time as they are reached
+
+        Args:
+            cls (type or str): The class, or its name, whose instances
+                (including instances of its subclasses) are returned.
+        """
+        if cls is None:
+            yield from list(FileStorage.__objects.values())
+            names = list(FileStorage.__raw)
+        else:
+            names = self.__family(cls)
+            for name in names:
+                yield from list(
+                    FileStorage.__by_class.get(name, {}).values())
+        for name in names:
+            bucket = FileStorage.__raw.get(name, {})
+            while bucket:
+                key = next(iter(bucket))
+                self.__materialize(name, key)
+                obj = FileStorage.__objects.get(key)
+                if obj is not None:
+                    yield obj
+
+    def dicts(self, cls):
+        """Yield the to_dict() dictionary of each object of cls (including
+        the objects of its subclasses), without building the lazily
+        loaded ones
+        """
+        for name in self.__family(cls):
+            for obj in list(FileStorage.__by_class.get(name, {}).values()):
+                yield obj.to_dict()
+            yield from FileStorage.__raw.get(name, {}).values()
 
-    def all(self):
-        """Returns the dictionary __objects"""
-        return FileStorage.__objects
+    def append(self, values):
+        """Append the to_dict() dictionaries of values to the journal as
+        they are read, without building their objects, so the objects of
+        an import larger than memory can be stored. They are not in
+        __objects until the next reload().
+
+        Returns:
+            The number of dictionaries appended.
+
+        Raises:
+            io.UnsupportedOperation: In read-only mode.
+        """
+        self.__check_writable()
+        count = 0
+        with FileStorage.__lock:
+            with open(FileStorage.__journal_path, "a") as f:
+                for value in values:
+                    key = "{}.{}".format(value["__class__"], value["id"])
+                    f.write('{{"op": "set", "key": {}, "value": {}}}\n'
+                            .format(json.dumps(key), json.dumps(value)))
+                    count += 1
+                f.flush()
+                os.fsync(f.fileno())
+            FileStorage.__journal_size += count
+            FileStorage.__appended = FileStorage.__appended or count > 0
+        return count
 
     def new(self, obj):
         """Set in __objects obj with key <obj class name>.id"""
         key = "{}.{}".format(obj.__class__.__name__, obj.id)
-        FileStorage.__objects[key] = obj
+        with FileStorage.__lock:
+            self.__sync()
+            self.__remember(key)
+            if key in FileStorage.__objects:
+                self.__unindex(key)
+            FileStorage.__raw.get(obj.__class__.__name__, {}).pop(key, None)
+            FileStorage.__objects[key] = obj
+            self.__index(key, obj)
+            FileStorage.__dirty.add(key)
+            FileStorage.__fragments.pop(key, None)
+
+    def related(self, cls, attr, value):
+        """Return the objects of cls whose foreign key attr equals value
+
+        Args:
+            cls (type or str): The class of the objects, or its name.
+            attr (str): A foreign key attribute listed in foreign_keys.
+            value (str): The id the foreign key refers to.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        index = FileStorage.__indexes.get(("fk", name, attr))
+        if index is None:
+            raise KeyError("{}.{} is not an indexed foreign key".format(
+                name, attr))
+        self.__sync()
+        self.__materialize(name)
+        return index.lookup(value)
+
+    def having(self, cls, attr, values, **foreign_keys):
+        """Return the objects of cls whose list attribute attr holds every
+        value of values, using the BitsetIndex of attr
+
+        Args:
+            cls (type or str): The class of the objects, or its name.
+            attr (str): A list attribute listed in list_attributes.
+            values (iterable): The values the objects must all hold.
+            **foreign_keys: For foreign keys listed in foreign_keys, the id
+                they must equal, or a list of ids they must equal one of.
+
+        Raises:
+            KeyError: If attr or one of the foreign keys is not indexed.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        index = FileStorage.__indexes.get(("bitset", name, attr))
+        if index is None:
+            raise KeyError("{}.{} is not an indexed list".format(name, attr))
+        among = None
+        for fk, ids in foreign_keys.items():
+            if isinstance(ids, str):
+                ids = [ids]
+            keys = set()
+            for value in ids:
+                keys.update(self.related(name, fk, value))
+            among = keys if among is None else among & keys
+        self.__sync()
+        self.__materialize(name)
+        with FileStorage.__lock:
+            keys = index.lookup(values, among)
+        return {key: FileStorage.__objects[key] for key in keys}
+
+    def in_ranges(self, cls, **bounds):
+        """Return the objects of cls whose numeric attributes are within
+        bounds, using the ColumnIndex of cls instead of visiting them
+
+        Args:
+            cls (type or str): The class of the objects, or its name.
+            **bounds: For each attribute listed in numeric_columns, the
+                (low, high) inclusive range of its values, where None
+                leaves a side open, or the value it must equal.
+
+        Raises:
+            KeyError: If cls or one of the attributes has no column.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        index = FileStorage.__indexes.get(("columns", name))
+        if index is None:
+            raise KeyError("{} has no numeric columns".format(name))
+        self.__sync()
+        self.__materialize(name)
+        with FileStorage.__lock:
+            keys = index.filter(bounds)
+        return {key: FileStorage.__objects[key] for key in keys}
+
+    def within(self, cls, south, west, north, east):
+        """Return the objects of cls located in a bounding box, which
+        crosses the antimeridian when west is greater than east
+
+        Raises:
+            KeyError: If cls has no location.
+        """
+        index = self.__grid(cls)
+        with FileStorage.__lock:
+            keys = index.within(south, west, north, east)
+        return {key: FileStorage.__objects[key] for key in keys}
+
+    def near(self, cls, latitude, longitude, radius):
+        """Return the objects of cls at most radius kilometers away from
+        (latitude, longitude), nearest first
+
+        Raises:
+            KeyError: If cls has no location.
+        """
+        index = self.__grid(cls)
+        with FileStorage.__lock:
+            found = index.near(latitude, longitude, radius)
+        return {key: FileStorage.__objects[key] for distance, key in found}
+
+    def nearest(self, cls, latitude, longitude, k=1):
+        """Return the k objects of cls nearest to (latitude, longitude),
+        nearest first
+
+        Raises:
+            KeyError: If cls has no location.
+        """
+        index = self.__grid(cls)
+        with FileStorage.__lock:
+            found = index.nearest(latitude, longitude, k)
+        return {key: FileStorage.__objects[key] for distance, key in found}
+
+    def search(self, cls, query, limit=10):
+        """Return the limit objects of cls whose text attributes best
+        match the words of query, best first, using the TextIndex of cls
+
+        Raises:
+            KeyError: If cls has no text attributes.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        index = FileStorage.__indexes.get(("text", name))
+        if index is None:
+            raise KeyError("{} has no text attributes".format(name))
+        self.__sync()
+        self.__materialize(name)
+        with FileStorage.__lock:
+            found = index.search(query, limit)
+        return {key: FileStorage.__objects[key] for score, key in found}
+
+    def between(self, cls, attr, low=None, high=None, *, after=None,
+                limit=None, reverse=False):
+        """Return the objects of cls whose datetime attr is at least low
+        and less than high, ordered by attr and key, using the SortedIndex
+        of attr
+
+        Args:
+            cls (type or str): The class of the objects, or its name.
+            attr (str): An attribute listed in sorted_attributes.
+            low (datetime): The least value, or None for no bound.
+            high (datetime): The value all objects are less than, or None.
+            after (tuple): The (value of attr, key) of the last object of
+                the previous page, to get the objects that come after it.
+            limit (int): The maximum number of objects, or None for all.
+            reverse (bool): Order the objects from the most recent.
+
+        Raises:
+            KeyError: If attr of cls is not indexed.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        index = FileStorage.__indexes.get(("sorted", name, attr))
+        if index is None:
+            raise KeyError("{}.{} is not a sorted attribute".format(
+                name, attr))
+        self.__sync()
+        self.__materialize(name)
+        with FileStorage.__lock:
+            keys = index.range(low, high, after, limit, reverse)
+        return {key: FileStorage.__objects[key] for key in keys}
+
+    def query(self, cls):
+        """Return a Query over the objects of cls (a class or its name),
+        which uses the indexes that answer its predicates
+        """
+        return Query(self, cls)
+
+    def __grid(self, cls):
+        """Return the up to date GridIndex of cls (a class or its name)"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        index = FileStorage.__indexes.get(("grid", name))
+        if index is None:
+            raise KeyError("{} has no location".format(name))
+        self.__sync()
+        self.__materialize(name)
+        return index
+
+    def mark_dirty(self, obj, name=None, *previous):
+        """Flag obj as changed so the next save re-serializes it
+
+        Args:
+            obj (BaseModel): The changed object.
+            name (str): The name of the changed attribute, if known.
+            previous: The value of the attribute before the change, if it
+                had one.
+        """
+        obj_id = getattr(obj, "id", None)
+        if obj_id is None:
+            return
+        key = "{}.{}".format(obj.__class__.__name__, obj_id)
+        if FileStorage.__objects.get(key) is not obj:
+            return
+        with FileStorage.__lock:
+            if (FileStorage.__undo is not None and
+                    key not in FileStorage.__undo):
+                attrs = dict(obj.__dict__)
+                if previous:
+                    attrs[name] = previous[0]
+                elif name is not None:
+                    attrs.pop(name, None)
+                FileStorage.__undo[key] = (obj, attrs)
+            FileStorage.__dirty.add(key)
+            FileStorage.__fragments.pop(key, None)
+            self.__sync()
+            for index in FileStorage.__indexes.values():
+                if (index.class_name == obj.__class__.__name__ and
+                        (name is None or name in index.attrs)):
+                    index.discard(key)
+                    index.add(key, obj)
+
+    def delete(self, obj=None):
+        """Delete obj from __objects if it is stored there"""
+        if obj is None:
+            return
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        if FileStorage.__objects.get(key) is obj:
+            self.__remove(key)
 
     def save(self):
-        """Serialize __objects to the JSON file __file_path."""
-        objdict = {key: obj.to_dict() for key, obj
-                   in FileStorage.__objects.items()}
-        with open(FileStorage.__file_path, "w") as f:
-            json.dump(objdict, f)
-
-    def reload(self):
-        """Deserialize the JSON file __file_path to __objects, if it exists."""
-        if os.path.exists(FileStorage.__file_path):
-            with open(FileStorage.__file_path, "r") as f:
-                objdict = json.load(f)
-                for key, value in objdict.items():
-                    class_name = value["__class__"]
-                    del value["__class__"]
-                    obj = eval(class_name)(**value)
-                    self.new(obj)
+        """Serialize __objects to the JSON file __file_path.
+
+        In journal mode only the objects changed since the last save are
+        appended to __journal_path, and the journal is compacted once it
+        outgrows the store. In sharded mode only the shards of the classes
+        with changed objects are rewritten. With a flush_interval the write
+        is left to a background thread, and inside batch() it is left to
+        the end of the batch.
+
+        Raises:
+            io.UnsupportedOperation: In read-only mode.
+        """
+        self.__check_writable()
+        if FileStorage.__batch_depth:
+            return
+        if FileStorage.flush_interval > 0:
+            with FileStorage.__lock:
+                if FileStorage.__flusher is None:
+                    flusher = threading.Timer(FileStorage.flush_interval,
+                                              self.flush)
+                    flusher.daemon = True
+                    FileStorage.__flusher = flusher
+                    flusher.start()
+            return
+        with FileStorage.__lock:
+            self._write()
+
+    def flush(self):
+        """Write the changes of a save() left to the background thread
+
+        Inside batch() the write is left to the end of the batch, which
+        saves again even if it is rolled back.
+        """
+        with FileStorage.__lock:
+            if FileStorage.__flusher is None:
+                return
+            FileStorage.__flusher.cancel()
+            FileStorage.__flusher = None
+            if FileStorage.__batch_depth:
+                FileStorage.__deferred = True
+                return
+            self._write()
+
+    @contextmanager
+    def batch(self):
+        """Group the changes made in a with block into a single save
+
+        Saves inside the block are skipped and one save is made when it
+        ends. If the block raises, every object it created, changed or
+        deleted is put back as it was and nothing is saved. A nested
+        batch joins the outermost one.
+        """
+        with FileStorage.__lock:
+            FileStorage.__batch_depth += 1
+            if FileStorage.__batch_depth == 1:
+                FileStorage.__undo = {}
+                dirty = set(FileStorage.__dirty)
+        try:
+            yield self
+        except BaseException:
+            with FileStorage.__lock:
+                FileStorage.__batch_depth -= 1
+                if FileStorage.__batch_depth == 0:
+                    self.__rollback(dirty)
+                    if FileStorage.__deferred:
+                        FileStorage.__deferred = False
+                        self.save()
+            raise
+        with FileStorage.__lock:
+            FileStorage.__batch_depth -= 1
+            if FileStorage.__batch_depth == 0:
+                FileStorage.__undo = None
+                FileStorage.__deferred = False
+                self.save()
+
+    def _write(self):
+        """Write the changes made since the last save"""
+        if FileStorage.journal:
+            self.__append_journal()
+        elif (FileStorage.sharded and
+              not os.path.exists(FileStorage.__journal_path)):
+            names = {key.split(".")[0] for key in FileStorage.__dirty}
+            for name in names:
+                self.__merge_shard(name)
+            self.__write_shards(names)
+            FileStorage.__dirty.clear()
+        else:
+            self.__compact()
+
+    def compact(self):
+        """Rewrite the whole snapshot from __objects and discard the journal.
+
+        When only some shards were reloaded, only those shards and the
+        shards of the classes with changed objects, merged with what is
+        stored first, are rewritten, and the journal records of the other
+        classes are kept.
+
+        Raises:
+            io.UnsupportedOperation: In read-only mode.
+        """
+        self.__check_writable()
+        with FileStorage.__lock:
+            self.__compact()
+
+    def __compact(self):
+        """Rewrite the snapshot and the journal; see compact()"""
+        if FileStorage.__appended:
+            self.__load_appended()
+        if FileStorage.sharded and FileStorage.__loaded is not None:
+            for key in FileStorage.__dirty:
+                self.__merge_shard(key.split(".")[0])
+        loaded = FileStorage.__loaded
+        if FileStorage.sharded:
+            self.__write_shards(loaded or FileStorage.classes)
+        else:
+            self.__write(self.snapshot_path(),
+                         FileStorage.__objects.items(),
+                         FileStorage.__raw.values())
+        FileStorage.__journal_size = 0
+        if os.path.exists(FileStorage.__journal_path):
+            kept = []
+            if loaded is not None:
+                with open(FileStorage.__journal_path, "r") as f:
+                    kept = [line for line in f if line.endswith("\n") and
+                            self.__class_of(line) not in loaded]
+            if kept:
+                self.__replace(FileStorage.__journal_path, "".join(kept))
+                FileStorage.__journal_size = len(kept)
+            else:
+                os.remove(FileStorage.__journal_path)
+        FileStorage.__dirty.clear()
+
+    def reload(self, *, classes=None):
+        """Deserialize the JSON file __file_path to __objects, if it exists,
+        then replay the journal on top of it.
+
+        In read-only mode the files are mapped in memory with their offset
+        index, and the objects stay unbuilt until they are accessed.
+
+        Args:
+            classes (list): In sharded mode, the names of the only classes
+                whose shards are loaded. All shards are loaded by default.
+
+        Raises:
+            ValueError: In read-only mode, if file_format is not "binary".
+        """
+        self.__sync()
+        if not FileStorage.sharded:
+            classes = None
+        FileStorage.__loaded = None if classes is None else set(classes)
+        FileStorage.__appended = False
+        if FileStorage.sharded:
+            paths = [self.shard_path(name)
+                     for name in classes or FileStorage.classes]
+        else:
+            paths = [self.snapshot_path()]
+        binary = FileStorage.file_format == "binary"
+        if FileStorage.read_only and not binary:
+            raise ValueError("Read-only mode needs the binary file format")
+        for path in paths:
+            if FileStorage.read_only and os.path.exists(path):
+                self.__map(MappedStore(path))
+            elif os.path.exists(path):
+                with open(path, "rb" if binary else "r") as f:
+                    # built objects take the decoded datetimes as they are,
+                    # unbuilt ones are kept as to_dict() dictionaries
+                    items = (binary_format.iter_items(
+                        f, native=not FileStorage.lazy) if binary
+                        else iter_items(f))
+                    for key, value in items:
+                        self.__store(key, value)
+        FileStorage.__journal_size = 0
+        if os.path.exists(FileStorage.__journal_path):
+            good = 0
+            with open(FileStorage.__journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError
+                        record = json.loads(line)
+                    except ValueError:
+                        # a torn final line from an interrupted append
+                        break
+                    good += len(line)
+                    FileStorage.__journal_size += 1
+                    key = record["key"]
+                    if (classes is not None and
+                            key.split(".")[0] not in FileStorage.__loaded):
+                        continue
+                    if record["op"] == "set":
+                        self.__store(key, record["value"])
+                    else:
+                        self.__remove(key)
+                        FileStorage.__dirty.discard(key)
+            if (not FileStorage.read_only and
+                    good < os.path.getsize(FileStorage.__journal_path)):
+                # drop the torn line so the next append starts a new line
+                os.truncate(FileStorage.__journal_path, good)
+
+    def __map(self, store):
+        """Add the objects of the mapped store as unbuilt objects"""
+        for name in store.class_names():
+            bucket = store.bucket(name)
+            if name not in FileStorage.__types:
+                FileStorage.__types[name] = self.__class_named(name)
+            FileStorage.__raw[name] = bucket
+            for key in list(FileStorage.__by_class.get(name, {})):
+                if key in bucket:
+                    self._load(bucket.pop(key))
+
+    def __check_writable(self):
+        """Raise io.UnsupportedOperation in read-only mode"""
+        if FileStorage.read_only:
+            raise io.UnsupportedOperation("The storage is read-only")
+
+    def shard_path(self, class_name):
+        """Return the path of the shard file holding class_name objects"""
+        return os.path.join(os.path.dirname(FileStorage.__file_path),
+                            class_name + self.__extension())
+
+    def snapshot_path(self):
+        """Return the path of the file holding every object"""
+        if FileStorage.file_format == "json":
+            return FileStorage.__file_path
+        root = os.path.splitext(FileStorage.__file_path)[0]
+        return root + self.__extension()
+
+    @staticmethod
+    def __extension():
+        """Return the file name extension of file_format"""
+        if FileStorage.file_format == "binary":
+            return ".bin"
+        return ".json"
+
+    def __append_journal(self):
+        """Append the objects changed since the last save to the journal"""
+        if not FileStorage.__dirty:
+            return
+        with open(FileStorage.__journal_path, "a") as f:
+            for key in FileStorage.__dirty:
+                obj = FileStorage.__objects.get(key)
+                if obj is None:
+                    record = json.dumps({"op": "delete", "key": key})
+                else:
+                    record = '{{"op": "set", "key": {}, "value": {}}}'.format(
+                        json.dumps(key), self.__encode(key, obj))
+                f.write(record + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        FileStorage.__journal_size += len(FileStorage.__dirty)
+        FileStorage.__dirty.clear()
+        if FileStorage.__journal_size >= max(FileStorage.compact_after,
+                                             self.count()):
+            self.__compact()
+
+    def __load_appended(self):
+        """Add the objects of the records written by append(), which are
+        not in __objects, before the journal is folded into the snapshot
+        """
+        stored = {}
+        with open(FileStorage.__journal_path, "r") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    continue
+                record = json.loads(line)
+                key = record["key"]
+                if (key in FileStorage.__objects or
+                        key in FileStorage.__dirty or
+                        key in FileStorage.__raw.get(key.split(".")[0], {})):
+                    continue
+                if record["op"] == "set":
+                    stored[key] = record["value"]
+                else:
+                    stored.pop(key, None)
+        for key, value in stored.items():
+            self.__store(key, value)
+        FileStorage.__appended = False
+
+    def __merge_shard(self, name):
+        """Add the stored objects of class name, from its shard and the
+        journal, when its shard was not reloaded, so rewriting the shard
+        keeps them. The objects in memory, and the deletions not saved
+        yet, win over the stored ones.
+        """
+        if FileStorage.__loaded is None or name in FileStorage.__loaded:
+            return
+        stored = {}
+        path = self.shard_path(name)
+        if os.path.exists(path):
+            binary = FileStorage.file_format == "binary"
+            with open(path, "rb" if binary else "r") as f:
+                items = (binary_format.iter_items(f) if binary
+                         else iter_items(f))
+                stored.update(items)
+        if os.path.exists(FileStorage.__journal_path):
+            with open(FileStorage.__journal_path, "r") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        continue
+                    record = json.loads(line)
+                    if record["key"].split(".")[0] != name:
+                        continue
+                    if record["op"] == "set":
+                        stored[record["key"]] = record["value"]
+                    else:
+                        stored.pop(record["key"], None)
+        raw = FileStorage.__raw.get(name, {})
+        for key, value in stored.items():
+            if (key not in FileStorage.__objects and key not in raw and
+                    key not in FileStorage.__dirty):
+                self.__store(key, value)
+        FileStorage.__loaded.add(name)
+
+    def __write_shards(self, class_names):
+        """Rewrite the shard file of each class in class_names"""
+        self.__sync()
+        for name in class_names:
+            self.__write(self.shard_path(name),
+                         FileStorage.__by_class.get(name, {}).items(),
+                         [FileStorage.__raw.get(name, {})])
+
+    def __write(self, path, items, raw_buckets):
+        """Write the (key, object) pairs of items and the stored
+        dictionaries of raw_buckets to path as a JSON object, or in the
+        binary format
+        """
+        if FileStorage.file_format == "binary":
+            data = io.BytesIO()
+            writer = binary_format.Writer(data)
+            for key, obj in items:
+                writer.write(obj.to_dict())
+            for bucket in raw_buckets:
+                for value in bucket.values():
+                    writer.write(value)
+            self.__replace(path, data.getvalue())
+            return
+        parts = ["{}: {}".format(json.dumps(key), self.__encode(key, obj))
+                 for key, obj in items]
+        parts += ["{}: {}".format(json.dumps(key), json.dumps(value))
+                  for bucket in raw_buckets for key, value in bucket.items()]
+        self.__replace(path, "{" + ", ".join(parts) + "}")
+
+    @staticmethod
+    def __replace(path, text):
+        """Atomically replace the content of path with text, or bytes
+
+        The text is written and synced to a temporary file of a unique
+        name, so concurrent writers do not share it, which is then renamed
+        over path and keeps its permissions. Readers and crashes never see
+        a partial file, and the directory is synced so the rename lasts.
+        """
+        directory = os.path.dirname(path) or "."
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=os.path.basename(path) + ".", suffix=".tmp",
+            dir=directory)
+        try:
+            with os.fdopen(fd, "wb" if isinstance(text, bytes) else "w") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        if os.name == "posix":
+            fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    @staticmethod
+    def __class_of(line):
+        """Return the class name of the key of a journal line"""
+        try:
+            return json.loads(line)["key"].split(".")[0]
+        except ValueError:
+            return None
+
+    def __remove(self, key):
+        """Delete key from __objects and the indexes"""
+        with FileStorage.__lock:
+            self.__sync()
+            self.__remember(key)
+            FileStorage.__raw.get(key.split(".")[0], {}).pop(key, None)
+            if FileStorage.__objects.pop(key, None) is None:
+                return
+            self.__unindex(key)
+            FileStorage.__dirty.add(key)
+            FileStorage.__fragments.pop(key, None)
+
+    def __remember(self, key):
+        """Record the state of key before the running batch changes it"""
+        undo = FileStorage.__undo
+        if undo is None or key in undo:
+            return
+        obj = FileStorage.__objects.get(key)
+        if obj is not None:
+            undo[key] = (obj, dict(obj.__dict__))
+        else:
+            name = key.split(".")[0]
+            undo[key] = (None, FileStorage.__raw.get(name, {}).get(key))
+
+    def __rollback(self, dirty):
+        """Put back the state recorded by the failed batch
+
+        Args:
+            dirty (set): The keys that were dirty when the batch began.
+        """
+        undo = FileStorage.__undo
+        FileStorage.__undo = None
+        for key, (obj, state) in undo.items():
+            self.__remove(key)
+            if obj is not None:
+                obj._restore(state)
+                self.new(obj)
+            elif state is not None:
+                bucket = FileStorage.__raw.setdefault(key.split(".")[0], {})
+                bucket[key] = state
+            FileStorage.__fragments.pop(key, None)
+        FileStorage.__dirty.clear()
+        FileStorage.__dirty.update(dirty)
+
+    def __index(self, key, obj):
+        """Add obj, stored under key, to the indexes"""
+        name = obj.__class__.__name__
+        FileStorage.__types[name] = obj.__class__
+        FileStorage.__by_class.setdefault(name, {})[key] = obj
+        for index in FileStorage.__indexes.values():
+            if index.class_name == name:
+                index.add(key, obj)
+
+    def __unindex(self, key):
+        """Remove key from the indexes"""
+        name = key.split(".")[0]
+        FileStorage.__by_class.get(name, {}).pop(key, None)
+        for index in FileStorage.__indexes.values():
+            if index.class_name == name:
+                index.discard(key)
+
+    def __sync(self):
+        """Rebuild the indexes if __objects was replaced"""
+        if FileStorage.__indexed is FileStorage.__objects:
+            return
+        FileStorage.__by_class = {}
+        FileStorage.__raw = {}
+        for index in FileStorage.__indexes.values():
+            index.clear()
+        FileStorage.__indexed = FileStorage.__objects
+        for key, obj in FileStorage.__objects.items():
+            self.__index(key, obj)
+
+    def __family(self, cls):
+        """Return the stored class names of cls and its subclasses"""
+        self.__sync()
+        if isinstance(cls, str):
+            cls = FileStorage.__types.get(cls)
+            if cls is None:
+                return []
+        return [name for name, t in FileStorage.__types.items()
+                if issubclass(t, cls) and (name in FileStorage.__by_class or
+                                           name in FileStorage.__raw)]
+
+    def __encode(self, key, obj):
+        """Return the JSON text of obj, re-serializing it only if dirty
+
+        The text of an object holding a list or a dictionary is not
+        cached, since changing them in place does not flag it as dirty.
+        """
+        fragment = FileStorage.__fragments.get(key)
+        if fragment is not None and fragment[0] is obj:
+            return fragment[1]
+        obj_dict = obj.to_dict()
+        text = json.dumps(obj_dict)
+        if not any(isinstance(value, (list, dict))
+                   for value in obj_dict.values()):
+            FileStorage.__fragments[key] = (obj, text)
+        return text
+
+    def __store(self, key, value):
+        """Add a stored dictionary to __objects, or keep it unbuilt until
+        its object is accessed in lazy mode
+        """
+        name = value["__class__"]
+        if (not FileStorage.lazy or FileStorage.read_only or
+                key in FileStorage.__objects):
+            self._load(value)
+            return
+        if name not in FileStorage.__types:
+            FileStorage.__types[name] = self.__class_named(name)
+        FileStorage.__raw.setdefault(name, {})[key] = value
+
+    def __materialize(self, name, key=None):
+        """Build the unbuilt object stored under key, or every unbuilt
+        object of class name
+        """
+        bucket = FileStorage.__raw.get(name)
+        if not bucket:
+            return
+        if key is None:
+            values = list(bucket.values())
+            bucket.clear()
+        else:
+            value = bucket.pop(key, None)
+            values = [] if value is None else [value]
+        if not bucket:
+            del FileStorage.__raw[name]
+        for value in values:
+            self._load(value)
+
+    def _load(self, value):
+        """Build an object from its stored dictionary and add it to __objects
+
+        The object matches what is stored, so it is not marked dirty.
+        """
+        class_name = value["__class__"]
+        obj = self.__class_named(class_name).from_dict(value)
+        self.new(obj)
+        FileStorage.__dirty.discard("{}.{}".format(class_name, obj.id))
+
+    def __class_named(self, name):
+        """Return the registered class called name, or its compact class
+        in compact_objects mode
+        """
+        cls = FileStorage.registry.get(name)
+        if cls is None:
+            raise ValueError("Unknown class {} in storage".format(name))
+        if FileStorage.compact_objects:
+            return compact_class(cls)
+        return cls
+
+    def _take_dirty(self):
+        """Return the keys changed since the last save and reset them"""
+        with FileStorage.__lock:
+            dirty = set(FileStorage.__dirty)
+            FileStorage.__dirty.clear()
+        return dirty
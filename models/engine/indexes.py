@@ -0,0 +1,861 @@
+#!/usr/bin/python3
+"""The secondary indexes maintained by the storage engine"""
+import bisect
+import heapq
+import math
+import re
+from abc import ABC, abstractmethod
+from array import array
+from datetime import datetime
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_WORD = re.compile(r"\w+")
+
+
+class Index(ABC):
+    """Represent a secondary index over the objects of one class.
+
+    The storage engine calls add() when an object is stored or one of the
+    attributes in attrs changes, and discard() before it changes or when
+    the object is deleted.
+
+    Attributes:
+        class_name (str): The name of the class whose objects are indexed.
+        attrs (tuple): The names of the attributes the index depends on.
+    """
+
+    def __init__(self, class_name, attrs):
+        """Initialize an empty index"""
+        self.class_name = class_name
+        self.attrs = tuple(attrs)
+
+    @abstractmethod
+    def add(self, key, obj):
+        """Index obj, stored under key"""
+
+    @abstractmethod
+    def discard(self, key):
+        """Remove key from the index, if it is indexed"""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every key from the index"""
+
+
+class ForeignKeyIndex(Index):
+    """Represent a reverse index from a foreign key value to its objects.
+
+    Attributes:
+        attr (str): The name of the foreign key attribute.
+        __buckets (dict): The objects of each foreign key value,
+            keyed by storage key.
+        __values (dict): The indexed foreign key value of each storage key.
+    """
+
+    def __init__(self, class_name, attr):
+        """Initialize an empty index on attr of class_name objects"""
+        super().__init__(class_name, (attr,))
+        self.attr = attr
+        self.__buckets = {}
+        self.__values = {}
+
+    def add(self, key, obj):
+        """Index obj under its foreign key value, unless it is empty"""
+        value = getattr(obj, self.attr, None)
+        if not value or not isinstance(value, str):
+            return
+        self.__buckets.setdefault(value, {})[key] = obj
+        self.__values[key] = value
+
+    def discard(self, key):
+        """Remove key from the bucket of its foreign key value"""
+        value = self.__values.pop(key, None)
+        if value is None:
+            return
+        bucket = self.__buckets[value]
+        del bucket[key]
+        if not bucket:
+            del self.__buckets[value]
+
+    def clear(self):
+        """Remove every key from the index"""
+        self.__buckets = {}
+        self.__values = {}
+
+    def lookup(self, value):
+        """Return a dictionary of the objects whose foreign key is value"""
+        return dict(self.__buckets.get(value, {}))
+
+
+class BitsetIndex(Index):
+    """Represent an inverted index from the values held by a list
+    attribute (like Place.amenity_ids) to the objects holding them.
+
+    Each indexed object has a row number, and each value the bitset of
+    the rows holding it, so the objects holding several values are found
+    by intersecting bitsets. A bitset is split in chunks of CHUNK rows,
+    each an int, so changing a row only rebuilds the int of its chunk.
+    Changing the list in place is not seen by the storage engine: assign
+    a new list, or call mark_dirty().
+
+    Attributes:
+        attr (str): The name of the list attribute.
+        CHUNK (int): The number of rows of a chunk.
+        __bits (dict): The bitset of the rows holding each value, as a
+            dictionary of the non-empty chunks by chunk number.
+        __keys (list): The storage key of each row, or None if it is free.
+        __rows (dict): The row of each storage key.
+        __values (dict): The indexed values of each storage key.
+        __free (list): The free rows, reused before new ones.
+    """
+    CHUNK = 4096
+
+    def __init__(self, class_name, attr):
+        """Initialize an empty index on the list attr of class_name"""
+        super().__init__(class_name, (attr,))
+        self.attr = attr
+        self.clear()
+
+    def add(self, key, obj):
+        """Index obj under each value of its list attribute"""
+        # the class default is an empty list, and reading it from a
+        # compact object would set a copy of it on the object
+        values = obj.__dict__.get(self.attr)
+        if not isinstance(values, (list, tuple, set, frozenset)):
+            values = ()
+        values = frozenset(value for value in values
+                           if isinstance(value, str))
+        row = self.__rows.get(key)
+        if row is None:
+            row = self.__free.pop() if self.__free else len(self.__keys)
+            if row == len(self.__keys):
+                self.__keys.append(key)
+            else:
+                self.__keys[row] = key
+            self.__rows[key] = row
+        chunk, bit = divmod(row, self.CHUNK)
+        bit = 1 << bit
+        previous = self.__values.get(key, frozenset())
+        for value in previous - values:
+            self.__unset(value, chunk, bit)
+        for value in values - previous:
+            chunks = self.__bits.get(value)
+            if chunks is None:
+                chunks = self.__bits[value] = {}
+            chunks[chunk] = chunks.get(chunk, 0) | bit
+        self.__values[key] = values
+
+    def discard(self, key):
+        """Remove key from the bitsets of its values and free its row"""
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        chunk, bit = divmod(row, self.CHUNK)
+        bit = 1 << bit
+        for value in self.__values.pop(key):
+            self.__unset(value, chunk, bit)
+        self.__keys[row] = None
+        self.__free.append(row)
+
+    def clear(self):
+        """Remove every key from the index"""
+        self.__bits = {}
+        self.__keys = []
+        self.__rows = {}
+        self.__values = {}
+        self.__free = []
+
+    def lookup(self, values, among=None):
+        """Return the keys of the objects holding every value of values
+
+        Args:
+            values (iterable): The values the objects must all hold. The
+                objects are not filtered when there are none.
+            among (iterable): The only keys that may be returned, such as
+                the keys of a foreign key index lookup.
+        """
+        values = frozenset(values)
+        held = self.__values
+        if among is not None:
+            among = set(among)
+            if not values or len(among) * 32 < len(self.__keys):
+                # a few keys are checked faster than every row
+                return [key for key in among
+                        if key in held and values <= held[key]]
+        if not values:
+            return list(self.__rows)
+        bitsets = []
+        for value in values:
+            chunks = self.__bits.get(value)
+            if not chunks:
+                return []
+            bitsets.append(chunks)
+        # only the chunks of the smallest bitset can hold matches
+        bitsets.sort(key=len)
+        first, others = bitsets[0], bitsets[1:]
+        keys = self.__keys
+        found = []
+        for chunk in sorted(first):
+            bits = first[chunk]
+            for chunks in others:
+                bits &= chunks.get(chunk, 0)
+                if not bits:
+                    break
+            else:
+                base = chunk * self.CHUNK
+                found.extend(keys[base + row] for row in _rows(bits))
+        if among is None:
+            return found
+        return [key for key in found if key in among]
+
+    def count(self, value):
+        """Return the number of objects holding value"""
+        return sum(bin(bits).count("1")
+                   for bits in self.__bits.get(value, {}).values())
+
+    def __unset(self, value, chunk, bit):
+        """Remove bit from the chunk of the bitset of value"""
+        chunks = self.__bits[value]
+        bits = chunks[chunk] & ~bit
+        if bits:
+            chunks[chunk] = bits
+        else:
+            del chunks[chunk]
+            if not chunks:
+                del self.__bits[value]
+
+
+class SortedIndex(Index):
+    """Represent the objects of a class sorted by a datetime attribute,
+    for time windows and keyset pagination.
+
+    The (value, key) pairs are kept in a sorted list, found by binary
+    search. Pairs added since the last query wait in __pending and are
+    merged on the next one, so a reload sorts them all at once. Values
+    that are not datetimes are not indexed.
+
+    Attributes:
+        attr (str): The name of the datetime attribute.
+        __sorted (list): The merged (value, key) pairs, in order.
+        __pending (dict): The value of each key added since the last merge.
+        __values (dict): The indexed value of each key.
+    """
+
+    def __init__(self, class_name, attr):
+        """Initialize an empty index on attr of class_name objects"""
+        super().__init__(class_name, (attr,))
+        self.attr = attr
+        self.clear()
+
+    def add(self, key, obj):
+        """Index obj under the value of its attribute"""
+        self.discard(key)
+        value = getattr(obj, self.attr, None)
+        if not isinstance(value, datetime):
+            return
+        self.__values[key] = value
+        self.__pending[key] = value
+
+    def discard(self, key):
+        """Remove key from the index"""
+        value = self.__values.pop(key, None)
+        if value is None:
+            return
+        if self.__pending.pop(key, None) is None:
+            i = bisect.bisect_left(self.__sorted, (value, key))
+            del self.__sorted[i]
+
+    def clear(self):
+        """Remove every key from the index"""
+        self.__sorted = []
+        self.__pending = {}
+        self.__values = {}
+
+    def range(self, low=None, high=None, after=None, limit=None,
+              reverse=False):
+        """Return the keys whose value is at least low and less than high,
+        ordered by value and key
+
+        Args:
+            low (datetime): The least value, or None for no bound.
+            high (datetime): The value all keys are less than, or None.
+            after (tuple): The (value, key) of the last key of the previous
+                page; only the keys coming after it are returned.
+            limit (int): The maximum number of keys, or None for all.
+            reverse (bool): Order the keys from the greatest value.
+        """
+        self.__merge()
+        pairs = self.__sorted
+        start = 0 if low is None else bisect.bisect_left(pairs, (low,))
+        end = len(pairs) if high is None else bisect.bisect_left(pairs,
+                                                                 (high,))
+        if after is not None:
+            if reverse:
+                end = min(end, bisect.bisect_left(pairs, tuple(after)))
+            else:
+                start = max(start, bisect.bisect_right(pairs, tuple(after)))
+        if end <= start:
+            return []
+        if reverse:
+            if limit is not None:
+                start = max(start, end - limit)
+            return [key for value, key in reversed(pairs[start:end])]
+        if limit is not None:
+            end = min(end, start + limit)
+        return [key for value, key in pairs[start:end]]
+
+    def __merge(self):
+        """Move the pending pairs into __sorted"""
+        pending = self.__pending
+        if not pending:
+            return
+        if len(pending) * 16 > len(self.__sorted):
+            self.__sorted.extend((value, key)
+                                 for key, value in pending.items())
+            self.__sorted.sort()
+        else:
+            for key, value in pending.items():
+                bisect.insort(self.__sorted, (value, key))
+        pending.clear()
+
+
+class ColumnIndex(Index):
+    """Represent numeric attributes of the objects of a class stored
+    column by column, so ranges of values are filtered without visiting
+    the objects.
+
+    Each attribute is a typed array of doubles with one row per object.
+    A value that is not a number (or a numeric string, as set by the
+    console) is stored as NaN and never matches. With NumPy, filters run
+    as vectorized comparisons over the arrays. Without it, the rows of
+    each attribute are also sorted by value on the first filter, so the
+    range of the most selective attribute is found by binary search and
+    only its rows are compared with the other ranges. Keys added or
+    changed since the last filter wait in __pending and are merged on the
+    next one, as in SortedIndex.
+
+    Attributes:
+        __keys (list): The storage key of each row.
+        __rows (dict): The row of each storage key.
+        __columns (dict): The array of values of each attribute.
+        __orders (dict): The sorted values of each attribute and their
+            rows, as two arrays ordered by (value, row), or None until
+            they are needed.
+        __pending (set): The keys to merge into __orders.
+    """
+
+    def __init__(self, class_name, attrs):
+        """Initialize an empty index on attrs of class_name objects"""
+        super().__init__(class_name, attrs)
+        self.clear()
+
+    def add(self, key, obj):
+        """Store the values of obj in its row, adding a row if needed"""
+        row = self.__rows.get(key)
+        if row is None:
+            self.__rows[key] = len(self.__keys)
+            self.__keys.append(key)
+            for attr in self.attrs:
+                self.__columns[attr].append(
+                    _number(getattr(obj, attr, None)))
+        else:
+            self.__unorder(key, row)
+            for attr in self.attrs:
+                self.__columns[attr][row] = _number(getattr(obj, attr, None))
+        if self.__orders is not None:
+            self.__pending.add(key)
+
+    def discard(self, key):
+        """Remove the row of key, moving the last row in its place"""
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        self.__unorder(key, row)
+        last = self.__keys.pop()
+        for column in self.__columns.values():
+            value = column.pop()
+            if row < len(column):
+                column[row] = value
+        if last != key:
+            self.__keys[row] = last
+            self.__rows[last] = row
+            self.__reorder(last, len(self.__keys), row)
+
+    def clear(self):
+        """Remove every row from the index"""
+        self.__keys = []
+        self.__rows = {}
+        self.__columns = {attr: array("d") for attr in self.attrs}
+        self.__orders = None
+        self.__pending = set()
+
+    def filter(self, bounds):
+        """Return the keys of the objects whose values are within bounds,
+        in the order of their rows
+
+        Args:
+            bounds (dict): The (low, high) inclusive range of each
+                attribute, where None leaves a side open, or the value it
+                must equal.
+
+        Raises:
+            KeyError: If an attribute is not one of attrs.
+        """
+        ranges = []
+        for attr, bound in bounds.items():
+            if attr not in self.__columns:
+                raise KeyError("{}.{} is not an indexed column".format(
+                    self.class_name, attr))
+            low, high = bound if isinstance(bound, tuple) else (bound, bound)
+            ranges.append((attr,
+                           float("-inf") if low is None else low,
+                           float("inf") if high is None else high))
+        keys = self.__keys
+        if not keys:
+            return []
+        if not ranges:
+            return list(keys)
+        if numpy is not None:
+            mask = numpy.ones(len(keys), dtype=bool)
+            for attr, low, high in ranges:
+                values = numpy.frombuffer(self.__columns[attr],
+                                          dtype=numpy.float64)
+                mask &= (values >= low) & (values <= high)
+            return [keys[row] for row in numpy.flatnonzero(mask).tolist()]
+        self.__merge()
+        spans = []
+        for attr, low, high in ranges:
+            values = self.__orders[attr][0]
+            start = bisect.bisect_left(values, low)
+            spans.append((bisect.bisect_right(values, high) - start, start,
+                          attr, low, high))
+        spans.sort(key=lambda span: span[0])
+        size, start, attr = spans[0][:3]
+        matched = self.__orders[attr][1][start:start + size].tolist()
+        for size, start, attr, low, high in spans[1:]:
+            column = self.__columns[attr]
+            matched = [row for row in matched if low <= column[row] <= high]
+        matched.sort()
+        return [keys[row] for row in matched]
+
+    def __unorder(self, key, row):
+        """Remove the values of key, stored in row, from __orders"""
+        if self.__orders is None:
+            return
+        if key in self.__pending:
+            self.__pending.discard(key)
+            return
+        for attr, (values, rows) in self.__orders.items():
+            value = self.__columns[attr][row]
+            if value == value:
+                i = _find(values, rows, value, row)
+                del values[i]
+                del rows[i]
+
+    def __reorder(self, key, old, new):
+        """Move the values of key in __orders from row old to row new"""
+        if self.__orders is None or key in self.__pending:
+            return
+        for attr, (values, rows) in self.__orders.items():
+            value = self.__columns[attr][new]
+            if value == value:
+                i = _find(values, rows, value, old)
+                del values[i]
+                del rows[i]
+                i = _find(values, rows, value, new)
+                values.insert(i, value)
+                rows.insert(i, new)
+
+    def __merge(self):
+        """Sort the rows of each attribute on the first call, then move
+        the pending keys into __orders
+        """
+        pending = self.__pending
+        if self.__orders is not None and not pending:
+            return
+        if (self.__orders is None or
+                len(pending) * 16 > len(self.__keys)):
+            self.__orders = {}
+            for attr, column in self.__columns.items():
+                pairs = sorted((value, row)
+                               for row, value in enumerate(column)
+                               if value == value)
+                self.__orders[attr] = (array("d", [p[0] for p in pairs]),
+                                       array("q", [p[1] for p in pairs]))
+        else:
+            for key in pending:
+                row = self.__rows[key]
+                for attr, (values, rows) in self.__orders.items():
+                    value = self.__columns[attr][row]
+                    if value == value:
+                        i = _find(values, rows, value, row)
+                        values.insert(i, value)
+                        rows.insert(i, row)
+        pending.clear()
+
+
+class GridIndex(Index):
+    """Represent the locations of the objects of a class in a grid of
+    square cells of cell_size degrees, for bounding box, radius and
+    nearest neighbour queries.
+
+    Locations that are not numbers, or out of range, are not indexed.
+    Distances are great-circle distances in kilometers.
+
+    Attributes:
+        lat_attr (str): The name of the latitude attribute.
+        lon_attr (str): The name of the longitude attribute.
+        cell_size (float): The size of the cells, in degrees.
+        __rows (int): The number of rows of cells, from south to north.
+        __columns (int): The number of columns of cells, from west to east.
+        __cells (dict): The (latitude, longitude) of each key in each
+            non-empty (row, column) cell.
+        __cell_of (dict): The cell of each key.
+    """
+    EARTH_RADIUS = 6371.0088
+
+    def __init__(self, class_name, lat_attr, lon_attr, cell_size=0.1):
+        """Initialize an empty index on the locations of class_name"""
+        super().__init__(class_name, (lat_attr, lon_attr))
+        self.lat_attr = lat_attr
+        self.lon_attr = lon_attr
+        self.cell_size = cell_size
+        self.__rows = math.ceil(180 / cell_size)
+        self.__columns = math.ceil(360 / cell_size)
+        self.clear()
+
+    def add(self, key, obj):
+        """Index obj at its location, moving it if it was indexed"""
+        self.discard(key)
+        lat = _number(getattr(obj, self.lat_attr, None))
+        lon = _number(getattr(obj, self.lon_attr, None))
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return
+        cell = self.__cell(lat, lon)
+        self.__cells.setdefault(cell, {})[key] = (lat, lon)
+        self.__cell_of[key] = cell
+
+    def discard(self, key):
+        """Remove key from its cell"""
+        cell = self.__cell_of.pop(key, None)
+        if cell is None:
+            return
+        bucket = self.__cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self.__cells[cell]
+
+    def clear(self):
+        """Remove every key from the index"""
+        self.__cells = {}
+        self.__cell_of = {}
+
+    def within(self, south, west, north, east):
+        """Return the keys located in a bounding box
+
+        The box crosses the antimeridian when west is greater than east.
+        """
+        keys = []
+        for key, (lat, lon) in self.__scan(south, west, north, east):
+            if (south <= lat <= north and
+                    (west <= lon <= east if west <= east
+                     else lon >= west or lon <= east)):
+                keys.append(key)
+        return keys
+
+    def near(self, lat, lon, radius):
+        """Return the (distance, key) pairs of the keys at most radius
+        kilometers away from (lat, lon), nearest first
+        """
+        angle = radius / self.EARTH_RADIUS
+        dlat = math.degrees(angle)
+        south, north = lat - dlat, lat + dlat
+        ratio = math.sin(angle) / max(math.cos(math.radians(lat)), 1e-12)
+        if south <= -90 or north >= 90 or angle >= math.pi / 2 or ratio >= 1:
+            west, east = -180, 180
+        else:
+            dlon = math.degrees(math.asin(ratio))
+            west = (lon - dlon + 180) % 360 - 180
+            east = (lon + dlon + 180) % 360 - 180
+        found = []
+        for key, point in self.__scan(max(south, -90), west,
+                                      min(north, 90), east):
+            distance = self.distance((lat, lon), point)
+            if distance <= radius:
+                found.append((distance, key))
+        found.sort()
+        return found
+
+    def nearest(self, lat, lon, k=1):
+        """Return the (distance, key) pairs of the k keys nearest to
+        (lat, lon), nearest first
+
+        The cells are visited in growing square rings around the cell of
+        (lat, lon), until no cell left can hold a nearer key.
+        """
+        if k <= 0:
+            return []
+        row, column = self.__cell(lat, lon)
+        best = []
+        visited = set()
+        ring = 0
+        while True:
+            cells = self.__ring(row, column, ring)
+            if len(cells) > len(self.__cells):
+                cells = [cell for cell in self.__cells
+                         if cell not in visited]
+                ring = None
+            for cell in cells:
+                visited.add(cell)
+                for key, point in self.__cells.get(cell, {}).items():
+                    item = (-self.distance((lat, lon), point), key)
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+            if ring is None:
+                break
+            bound = self.__bound(lat, lon, row, column, ring)
+            if bound is None or (len(best) == k and -best[0][0] <= bound):
+                break
+            ring += 1
+        return sorted((-distance, key) for distance, key in best)
+
+    @classmethod
+    def distance(cls, a, b):
+        """Return the great-circle distance between two (lat, lon) points"""
+        lat1, lon1 = math.radians(a[0]), math.radians(a[1])
+        lat2, lon2 = math.radians(b[0]), math.radians(b[1])
+        h = (math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) *
+             math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+        return 2 * cls.EARTH_RADIUS * math.asin(min(1, math.sqrt(h)))
+
+    def __cell(self, lat, lon):
+        """Return the (row, column) of the cell holding (lat, lon)"""
+        row = min(int((lat + 90) // self.cell_size), self.__rows - 1)
+        column = int((lon + 180) // self.cell_size) % self.__columns
+        return row, column
+
+    def __scan(self, south, west, north, east):
+        """Yield the (key, (lat, lon)) pairs of the cells overlapping a
+        bounding box, which may cross the antimeridian
+        """
+        first_row, first_column = self.__cell(south, west)
+        last_row, last_column = self.__cell(north, east)
+        if west > east or (west == east and first_column > last_column):
+            columns = (list(range(first_column, self.__columns)) +
+                       list(range(0, last_column + 1)))
+        elif east - west >= 360:
+            columns = range(self.__columns)
+        else:
+            columns = range(first_column, last_column + 1)
+        rows = range(first_row, last_row + 1)
+        if len(rows) * len(columns) > len(self.__cells):
+            rows, columns = set(rows), set(columns)
+            for (row, column), bucket in self.__cells.items():
+                if row in rows and column in columns:
+                    yield from bucket.items()
+            return
+        for row in rows:
+            for column in columns:
+                bucket = self.__cells.get((row, column))
+                if bucket:
+                    yield from bucket.items()
+
+    def __ring(self, row, column, ring):
+        """Return the cells at ring cells from (row, column)"""
+        if ring == 0:
+            return [(row, column)]
+        rows = range(max(row - ring, 0), min(row + ring, self.__rows - 1) + 1)
+        if 2 * ring + 1 >= self.__columns:
+            columns = range(self.__columns)
+        else:
+            columns = [(column + offset) % self.__columns
+                       for offset in range(-ring, ring + 1)]
+        cells = []
+        for r in rows:
+            if abs(r - row) == ring:
+                cells.extend((r, c) for c in columns)
+            elif 2 * ring + 1 < self.__columns:
+                cells.append((r, columns[0]))
+                cells.append((r, columns[-1]))
+        return cells
+
+    def __bound(self, lat, lon, row, column, ring):
+        """Return the least distance from (lat, lon) to a point outside of
+        the cells within ring cells of (row, column), or None if there is
+        no cell outside
+        """
+        size = self.cell_size
+        south = (row - ring) * size - 90
+        north = (row + ring + 1) * size - 90
+        west = (column - ring) * size - 180
+        east = (column + ring + 1) * size - 180
+        bounds = []
+        if south > -90:
+            bounds.append(math.radians(lat - south))
+        if north < 90:
+            bounds.append(math.radians(north - lat))
+        if east - west < 360:
+            cos_lat = math.cos(math.radians(lat))
+            for dlon in (lon - west, east - lon):
+                bounds.append(math.asin(min(1, cos_lat * math.sin(
+                    math.radians(min(dlon, 180))))))
+        if not bounds:
+            return None
+        return self.EARTH_RADIUS * min(bounds)
+
+
+class TextIndex(Index):
+    """Represent an inverted index of the words of text attributes, for
+    searches ranked with BM25.
+
+    Text is split into lowercase words. Each word has a postings
+    dictionary of the number of times each key holds it, and each key
+    the number of words it holds.
+
+    Attributes:
+        K1 (float): How fast repeating a word stops raising the score.
+        B (float): How much long texts are penalized.
+        __postings (dict): The word count of each key, for each word.
+        __lengths (dict): The number of words of each key.
+        __words (dict): The distinct words of each key.
+        __total (int): The sum of __lengths.
+    """
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, class_name, attrs):
+        """Initialize an empty index on the text attrs of class_name"""
+        super().__init__(class_name, attrs)
+        self.clear()
+
+    def add(self, key, obj):
+        """Index the words of the text attributes of obj"""
+        self.discard(key)
+        counts = {}
+        length = 0
+        for attr in self.attrs:
+            text = getattr(obj, attr, None)
+            if not isinstance(text, str):
+                continue
+            for word in tokenize(text):
+                counts[word] = counts.get(word, 0) + 1
+                length += 1
+        if not length:
+            return
+        postings = self.__postings
+        for word, count in counts.items():
+            postings.setdefault(word, {})[key] = count
+        self.__lengths[key] = length
+        self.__words[key] = tuple(counts)
+        self.__total += length
+
+    def discard(self, key):
+        """Remove key from the postings of its words"""
+        length = self.__lengths.pop(key, None)
+        if length is None:
+            return
+        self.__total -= length
+        for word in self.__words.pop(key):
+            posting = self.__postings[word]
+            del posting[key]
+            if not posting:
+                del self.__postings[word]
+
+    def clear(self):
+        """Remove every key from the index"""
+        self.__postings = {}
+        self.__lengths = {}
+        self.__words = {}
+        self.__total = 0
+
+    def search(self, query, limit=10):
+        """Return the (score, key) pairs of the limit keys best matching
+        any word of query, best first
+
+        The words are scored from the rarest; once no key left unseen can
+        reach the limit best scores, the commoner words only add to the
+        scores of the keys already found.
+        """
+        count = len(self.__lengths)
+        if not count or limit <= 0:
+            return []
+        average = self.__total / count
+        terms = []
+        for word in set(tokenize(query)):
+            posting = self.__postings.get(word)
+            if posting:
+                idf = math.log(1 + (count - len(posting) + 0.5) /
+                               (len(posting) + 0.5))
+                terms.append((idf, word, posting))
+        terms.sort(reverse=True)
+        left = [0.0] * (len(terms) + 1)
+        for i in range(len(terms) - 1, -1, -1):
+            left[i] = left[i + 1] + terms[i][0] * (self.K1 + 1)
+        lengths = self.__lengths
+        k1 = self.K1
+        norm = k1 * (1 - self.B)
+        scale = k1 * self.B / average
+        scores = {}
+        for i, (idf, word, posting) in enumerate(terms):
+            weight = idf * (k1 + 1)
+            if len(scores) < limit:
+                found = posting.items()
+            else:
+                least = heapq.nlargest(limit, scores.values())[-1]
+                if least < left[i]:
+                    found = posting.items()
+                else:
+                    # only the keys found so far can still be among the
+                    # best, and only if the words left can lift them
+                    scores = {key: score for key, score in scores.items()
+                              if score + left[i] >= least}
+                    found = ((key, posting[key]) for key in scores
+                             if key in posting)
+            for key, tf in found:
+                scores[key] = scores.get(key, 0.0) + weight * tf / (
+                    tf + norm + scale * lengths[key])
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, key) for key, score in best]
+
+
+def tokenize(text):
+    """Return the lowercase words of text"""
+    return _WORD.findall(text.lower())
+
+
+def _rows(bits):
+    """Yield the numbers of the bits set in the int bits, in order"""
+    digits = bin(bits)[:1:-1]
+    row = digits.find("1")
+    while row != -1:
+        yield row
+        row = digits.find("1", row + 1)
+
+
+def _find(values, rows, value, row):
+    """Return where (value, row) is, or belongs, in the sorted values and
+    their rows
+    """
+    low = bisect.bisect_left(values, value)
+    high = bisect.bisect_right(values, value, low)
+    return bisect.bisect_left(rows, row, low, high)
+
+
+def _number(value):
+    """Return value as a float, or NaN if it is not a number"""
+    if isinstance(value, bool):
+        return float("nan")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return float("nan")
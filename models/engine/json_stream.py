@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""Incremental reading of the entries of a JSON object file"""
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def iter_items(f, chunk_size=65536):
+    """Yield the (key, value) pairs of the JSON object stored in f
+
+    The file is read chunk_size characters at a time, and only the entry
+    being parsed is held in memory, so a large file is never decoded as a
+    whole. An empty file holds no entries.
+
+    Args:
+        f (file): A text file opened for reading.
+        chunk_size (int): The number of characters read at a time.
+
+    Raises:
+        ValueError: If the file does not hold a JSON object.
+    """
+    reader = _Reader(f, chunk_size)
+    if reader.peek() == "":
+        return
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.decode()
+        if not isinstance(key, str):
+            raise ValueError("Expecting a property name")
+        reader.expect(":")
+        yield key, reader.decode()
+        if reader.peek() == ",":
+            reader.expect(",")
+        else:
+            reader.expect("}")
+            return
+
+
+class _Reader:
+    """Represent a buffered cursor over a text file"""
+
+    def __init__(self, f, chunk_size):
+        """Initialize the cursor at the start of f"""
+        self.__f = f
+        self.__chunk_size = chunk_size
+        self.__buffer = ""
+        self.__pos = 0
+        self.__eof = False
+
+    def __fill(self):
+        """Read the next chunk, dropping what was consumed already"""
+        chunk = self.__f.read(self.__chunk_size)
+        if not chunk:
+            self.__eof = True
+        self.__buffer = self.__buffer[self.__pos:] + chunk
+        self.__pos = 0
+
+    def peek(self):
+        """Return the next non-whitespace character, or "" at the end"""
+        while True:
+            while (self.__pos < len(self.__buffer) and
+                   self.__buffer[self.__pos] in _WHITESPACE):
+                self.__pos += 1
+            if self.__pos < len(self.__buffer) or self.__eof:
+                return self.__buffer[self.__pos:self.__pos + 1]
+            self.__fill()
+
+    def expect(self, char):
+        """Consume char, which must be the next non-whitespace character"""
+        if self.peek() != char:
+            raise ValueError("Expecting '{}' at character {}".format(
+                char, self.__pos))
+        self.__pos += 1
+
+    def decode(self):
+        """Decode and consume the next JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.__buffer, self.__pos)
+            except ValueError:
+                if self.__eof:
+                    raise
+            else:
+                if end < len(self.__buffer) or self.__eof:
+                    self.__pos = end
+                    return value
+            self.__fill()
@@ -0,0 +1,309 @@
+#!/usr/bin/python3
+"""Read-only access to a binary storage file through mmap
+
+The objects of a binary file (see binary_format) are found through an
+offset index persisted beside it in <file>.idx, and are only decoded
+when accessed. Processes mapping the same file share one copy of it in
+the page cache.
+
+The index starts with INDEX_MAGIC, the size and modification time of the
+file it describes, the offsets of the SCHEMA records and, for each class,
+its name, its number of objects and where its entries start. An entry is
+the 16 bytes of the object id (or of a digest of the id when it is not a
+UUID) and the offset of its OBJECT record; the entries of a class are
+sorted by their 16 bytes so an id is found by binary search.
+"""
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import uuid
+from models.engine import binary_format
+
+INDEX_MAGIC = b"HBNI\x01"
+
+_HEADER = struct.Struct("<5sQqI")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_ENTRY = struct.Struct("<16sQ")
+_DIGEST = 1 << 63
+
+
+class MappedStore:
+    """Represent a binary storage file mapped in memory.
+
+    Attributes:
+        path (str): The path of the binary file.
+        index_path (str): The path of its offset index.
+        __data (mmap.mmap): The mapped binary file.
+        __index (mmap.mmap): The mapped offset index.
+        __schemas (dict): The Schema of each schema number.
+        __classes (dict): The (number of entries, position of the first
+            entry) of each class name in the index.
+    """
+
+    def __init__(self, path):
+        """Map the binary file path, building its index if it is missing
+        or describes another version of the file
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.__data = _map(f, stat.st_size)
+        if not self.__index_matches(stat):
+            self.__build_index(stat)
+        with open(self.index_path, "rb") as f:
+            self.__index = _map(f, os.fstat(f.fileno()).st_size)
+        self.__read_index()
+
+    def __index_matches(self, stat):
+        """Tell whether the index file describes the binary file of stat"""
+        try:
+            with open(self.index_path, "rb") as f:
+                header = f.read(_HEADER.size)
+        except OSError:
+            return False
+        return (len(header) == _HEADER.size and
+                _HEADER.unpack(header)[:3] ==
+                (INDEX_MAGIC, stat.st_size, stat.st_mtime_ns))
+
+    def __build_index(self, stat):
+        """Scan the binary file and write its index"""
+        data = self.__data
+        schemas = {}
+        schema_offsets = []
+        entries = {}
+        for offset, kind in binary_format.iter_records(data):
+            if kind == binary_format.SCHEMA:
+                number, schema = binary_format.read_schema(data, offset)
+                schemas[number] = schema
+                schema_offsets.append(offset)
+                continue
+            key, value = binary_format.read_object(data, offset, schemas)
+            probe, flag = _probe(value["id"])
+            entries.setdefault(value["__class__"], []).append(
+                (probe, offset | flag))
+        parts = [_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns,
+                              len(schema_offsets))]
+        parts += [_U64.pack(offset) for offset in schema_offsets]
+        parts.append(_U32.pack(len(entries)))
+        position = (sum(len(part) for part in parts) +
+                    sum(2 + len(name.encode()) + 16 for name in entries))
+        for name, class_entries in entries.items():
+            encoded = name.encode()
+            parts += [_U16.pack(len(encoded)), encoded,
+                      _U64.pack(len(class_entries)), _U64.pack(position)]
+            position += len(class_entries) * _ENTRY.size
+        for class_entries in entries.values():
+            class_entries.sort()
+            parts += [_ENTRY.pack(*entry) for entry in class_entries]
+        tmp_path = "{}.{}.tmp".format(self.index_path, os.getpid())
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(parts))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+    def __read_index(self):
+        """Read the schemas and the class table of the index"""
+        index = self.__index
+        count = _HEADER.unpack_from(index, 0)[3]
+        pos = _HEADER.size
+        self.__schemas = {}
+        for _ in range(count):
+            offset = _U64.unpack_from(index, pos)[0]
+            number, schema = binary_format.read_schema(self.__data, offset)
+            self.__schemas[number] = schema
+            pos += 8
+        self.__classes = {}
+        class_count = _U32.unpack_from(index, pos)[0]
+        pos += 4
+        for _ in range(class_count):
+            size = _U16.unpack_from(index, pos)[0]
+            name = str(index[pos + 2:pos + 2 + size], "utf-8")
+            pos += 2 + size
+            self.__classes[name] = (_U64.unpack_from(index, pos)[0],
+                                    _U64.unpack_from(index, pos + 8)[0])
+            pos += 16
+
+    def class_names(self):
+        """Return the names of the classes with objects in the file"""
+        return list(self.__classes)
+
+    def bucket(self, class_name):
+        """Return the MappedBucket of the objects of class_name"""
+        return MappedBucket(self, class_name,
+                            *self.__classes.get(class_name, (0, 0)))
+
+    def entry(self, position):
+        """Return the (16 bytes, offset) of the index entry at position"""
+        return _ENTRY.unpack_from(self.__index, position)
+
+    def read(self, offset):
+        """Return the (key, to_dict() dictionary) of the OBJECT at offset"""
+        return binary_format.read_object(self.__data, offset & ~_DIGEST,
+                                         self.__schemas)
+
+    def close(self):
+        """Unmap the binary file and its index"""
+        for mapped in (self.__data, self.__index):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+
+class MappedBucket:
+    """Represent the stored dictionaries of one class in a MappedStore.
+
+    The bucket behaves like the dictionary of stored dictionaries, keyed
+    by storage key, that FileStorage keeps for the objects it has not
+    built yet: popping a key hides it from the bucket, and setting it
+    back shows it again.
+
+    Attributes:
+        __store (MappedStore): The mapped file.
+        __class_name (str): The name of the class of the objects.
+        __count (int): The number of index entries of the class.
+        __start (int): The position of the first entry in the index.
+        __removed (set): The keys popped from the bucket.
+        __cleared (bool): Whether every key was removed by clear().
+        __first (int): The number of leading entries known to be popped.
+    """
+
+    def __init__(self, store, class_name, count, start):
+        """Initialize the bucket of the count entries at start"""
+        self.__store = store
+        self.__class_name = class_name
+        self.__count = count
+        self.__start = start
+        self.__removed = set()
+        self.__cleared = False
+        self.__first = 0
+
+    def __len__(self):
+        """Return the number of keys left in the bucket"""
+        if self.__cleared:
+            return 0
+        return self.__count - len(self.__removed)
+
+    def __iter__(self):
+        """Iterate over the keys left in the bucket, in index order"""
+        if self.__cleared:
+            return
+        i = self.__first
+        while i < self.__count:
+            key = self.__key(i)
+            if key not in self.__removed:
+                yield key
+            elif i == self.__first:
+                self.__first += 1
+            i += 1
+
+    def __contains__(self, key):
+        """Tell whether key is left in the bucket"""
+        return self.__find(key) is not None
+
+    def __setitem__(self, key, value):
+        """Show the popped key again; value must be its stored dictionary"""
+        if self.__find(key, True) is None:
+            raise KeyError(key)
+        self.__removed.discard(key)
+
+    def get(self, key, default=None):
+        """Return the stored dictionary of key, or default"""
+        offset = self.__find(key)
+        if offset is None:
+            return default
+        return self.__store.read(offset)[1]
+
+    def pop(self, key, default=None):
+        """Remove key from the bucket and return its stored dictionary"""
+        value = self.get(key)
+        if value is None:
+            return default
+        self.__removed.add(key)
+        return value
+
+    def values(self):
+        """Return the stored dictionaries left in the bucket"""
+        return [self.get(key) for key in list(self)]
+
+    def items(self):
+        """Return the (key, stored dictionary) pairs left in the bucket"""
+        return [(key, self.get(key)) for key in list(self)]
+
+    def clear(self):
+        """Remove every key from the bucket"""
+        self.__cleared = True
+
+    def __key(self, i):
+        """Return the storage key of the entry number i"""
+        raw, offset = self.__store.entry(self.__start + i * _ENTRY.size)
+        if offset & _DIGEST:
+            return self.__store.read(offset)[0]
+        return "{}.{}".format(self.__class_name, uuid.UUID(bytes=raw))
+
+    def __find(self, key, popped=False):
+        """Return the offset of the OBJECT record of key, or None if it is
+        not in the bucket (or popped, unless popped is True)
+        """
+        if self.__cleared or (key in self.__removed and not popped):
+            return None
+        class_name, _, obj_id = key.partition(".")
+        if class_name != self.__class_name:
+            return None
+        probe, flag = _probe(obj_id)
+        entries = _Entries(self.__store, self.__start, self.__count)
+        i = bisect.bisect_left(entries, probe)
+        while i < self.__count and entries[i] == probe:
+            offset = entries.offset(i)
+            if (offset & _DIGEST == flag and
+                    (not flag or self.__store.read(offset)[0] == key)):
+                return offset
+            i += 1
+        return None
+
+
+class _Entries:
+    """Represent the 16 bytes of the entries of a class as a sequence"""
+
+    def __init__(self, store, start, count):
+        """Initialize the sequence of the count entries at start"""
+        self.__store = store
+        self.__start = start
+        self.__count = count
+
+    def __len__(self):
+        """Return the number of entries"""
+        return self.__count
+
+    def __getitem__(self, i):
+        """Return the 16 bytes of the entry number i"""
+        return self.__store.entry(self.__start + i * _ENTRY.size)[0]
+
+    def offset(self, i):
+        """Return the record offset of the entry number i, with its flag"""
+        return self.__store.entry(self.__start + i * _ENTRY.size)[1]
+
+
+def _probe(obj_id):
+    """Return the 16 bytes an id is indexed under, and the flag telling
+    whether they are a digest of the id
+    """
+    if len(obj_id) == 36:
+        try:
+            uid = uuid.UUID(obj_id)
+        except ValueError:
+            uid = None
+        if uid is not None and str(uid) == obj_id:
+            return uid.bytes, 0
+    return hashlib.blake2b(obj_id.encode(), digest_size=16).digest(), _DIGEST
+
+
+def _map(f, size):
+    """Return a read-only memory map of the file f, or b"" if it is empty"""
+    if size == 0:
+        return b""
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
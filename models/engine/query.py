@@ -0,0 +1,329 @@
+#!/usr/bin/python3
+"""A query engine over the objects stored by a storage engine
+
+A Query selects the objects of one class with predicates passed as
+keyword arguments named <attribute>__<operator>:
+
+    eq              The attribute equals the value (the default operator).
+    in              The attribute equals one of the values.
+    gt, gte, lt,    The attribute is greater than, at least, less than or
+    lte             at most the value.
+    range           (low, high): the attribute is at least low and at most
+                    high, where None leaves a side open.
+    prefix          The attribute is a string starting with the value.
+    contains        The attribute is a list holding the value.
+
+Numbers compare with numeric strings (as set by the console), and
+datetimes with isoformat() strings. Objects can be ordered by an
+attribute, offset and limited; values of different types are ordered
+numbers (and numeric strings) first, then datetimes, strings and other
+values, with missing values last.
+
+A planner picks, in this order, the foreign key index, the list index,
+the numeric column index or the sorted datetime index of the storage
+engine that answers a predicate (or the ordering), and only checks the
+predicates on the objects it returns. Without one, every object of the
+class is checked. explain() describes the plan.
+"""
+from datetime import datetime, timedelta
+from itertools import islice
+
+OPERATORS = ("eq", "in", "gt", "gte", "lt", "lte", "range", "prefix",
+             "contains")
+
+
+class Query:
+    """Represent a query over the objects of a class.
+
+    Filtering, ordering, offsetting and limiting return the query itself,
+    so calls can be chained.
+
+    Attributes:
+        storage (FileStorage): The storage engine holding the objects.
+        cls (type): The model class of the objects.
+        __predicates (list): The (attribute, operator, value) predicates.
+        __order (tuple): The (attribute, descending) ordering, or None.
+        __offset (int): The number of objects skipped.
+        __limit (int): The maximum number of objects, or None.
+    """
+
+    def __init__(self, storage, cls):
+        """Initialize a query over every object of cls (a class or its
+        name) stored in storage
+
+        Raises:
+            KeyError: If cls is not a class of storage.registry.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        if name not in storage.registry:
+            raise KeyError("{} is not a stored class".format(name))
+        self.storage = storage
+        self.cls = storage.registry[name]
+        self.__predicates = []
+        self.__order = None
+        self.__offset = 0
+        self.__limit = None
+
+    def filter(self, **predicates):
+        """Keep the objects matching every predicate
+
+        Raises:
+            ValueError: If an operator is unknown, or its value does not
+                fit it: range takes a (low, high) pair, in a list, tuple
+                or set of values and prefix a string.
+        """
+        for name, value in predicates.items():
+            attr, _, op = name.partition("__")
+            op = op or "eq"
+            if op not in OPERATORS:
+                raise ValueError("Unknown operator: {}".format(op))
+            if ((op == "range" and not (isinstance(value, (list, tuple)) and
+                                        len(value) == 2)) or
+                    (op == "in" and not isinstance(
+                        value, (list, tuple, set, frozenset))) or
+                    (op == "prefix" and not isinstance(value, str))):
+                raise ValueError("Invalid value for {}: {!r}".format(
+                    name, value))
+            if op == "range":
+                low, high = value
+                if low is not None:
+                    self.__predicates.append((attr, "gte", low))
+                if high is not None:
+                    self.__predicates.append((attr, "lte", high))
+            elif op == "in":
+                self.__predicates.append((attr, op, tuple(value)))
+            else:
+                self.__predicates.append((attr, op, value))
+        return self
+
+    def order_by(self, attr):
+        """Order the objects by attr, or by decreasing attr if it starts
+        with "-"; objects with equal attributes are ordered by key
+        """
+        if attr.startswith("-"):
+            self.__order = (attr[1:], True)
+        else:
+            self.__order = (attr, False)
+        return self
+
+    def offset(self, offset):
+        """Skip the first offset objects"""
+        self.__offset = offset
+        return self
+
+    def limit(self, limit):
+        """Keep at most limit objects, or every object if limit is None"""
+        self.__limit = limit
+        return self
+
+    def items(self):
+        """Yield the (key, object) pairs of the query, in order"""
+        plan = self.__plan()
+        rows = ((key, obj) for key, obj in plan[1]()
+                if all(_matches(obj, *predicate)
+                       for predicate in self.__predicates))
+        if self.__order is not None and not plan[2]:
+            attr, descending = self.__order
+            rows = iter(sorted(rows, reverse=descending,
+                               key=lambda row: (_sort_value(row[1], attr),
+                                                row[0])))
+        stop = None if self.__limit is None else (self.__offset +
+                                                  self.__limit)
+        yield from islice(rows, self.__offset, stop)
+
+    def __iter__(self):
+        """Iterate over the objects of the query, in order"""
+        return (obj for key, obj in self.items())
+
+    def all(self):
+        """Return the dictionary of the objects of the query, by key"""
+        return dict(self.items())
+
+    def count(self):
+        """Return the number of objects of the query"""
+        return sum(1 for row in self.items())
+
+    def explain(self):
+        """Return a description of how the query is run"""
+        plan = self.__plan()
+        lines = ["{}: {}".format(self.cls.__name__, plan[0])]
+        if self.__predicates:
+            lines.append("filter: {}".format(", ".join(
+                "{} {} {!r}".format(*predicate)
+                for predicate in self.__predicates)))
+        if self.__order is not None:
+            attr, descending = self.__order
+            lines.append("order by: {}{} ({})".format(
+                attr, " descending" if descending else "",
+                "index order" if plan[2] else "sort"))
+        if self.__offset:
+            lines.append("offset: {}".format(self.__offset))
+        if self.__limit is not None:
+            lines.append("limit: {}".format(self.__limit))
+        return "\n".join(lines)
+
+    def __plan(self):
+        """Return the (description, function yielding the (key, object)
+        candidates, whether they are in order) of the best plan
+        """
+        storage = self.storage
+        name = self.cls.__name__
+        if any(issubclass(cls, self.cls) and cls is not self.cls
+               for cls in storage.registry.values()):
+            # the indexes only hold the objects of one class
+            return self.__scan()
+        predicates = self.__predicates
+        foreign_keys = storage.foreign_keys.get(name, [])
+        for wanted in ("eq", "in"):
+            for attr, op, value in predicates:
+                if op == wanted and attr in foreign_keys:
+                    values = [value] if op == "eq" else value
+                    return ("foreign key index on {}".format(attr),
+                            lambda: _related(storage, name, attr, values),
+                            False)
+        for attr in storage.list_attributes.get(name, []):
+            # the index only holds strings
+            values = [value for a, op, value in predicates
+                      if a == attr and op == "contains" and
+                      isinstance(value, str)]
+            if values:
+                return ("list index on {}".format(attr),
+                        lambda: storage.having(name, attr, values).items(),
+                        False)
+        bounds = {}
+        for attr in storage.numeric_columns.get(name, []):
+            low, high = _bounds(predicates, attr, _is_number)
+            if low is not None or high is not None:
+                bounds[attr] = (low, high)
+        if bounds:
+            return ("numeric column index on {}".format(", ".join(bounds)),
+                    lambda: storage.in_ranges(name, **bounds).items(),
+                    False)
+        order = self.__order
+        for attr in storage.sorted_attributes:
+            low, high = _bounds(predicates, attr,
+                                lambda value: isinstance(value, datetime))
+            ordered = order is not None and order[0] == attr
+            if low is None and high is None and not ordered:
+                continue
+            if high is not None:
+                high += timedelta(microseconds=1)
+            description = "sorted index on {}".format(attr)
+            if not ordered:
+                return (description,
+                        lambda: storage.between(name, attr, low,
+                                                high).items(),
+                        False)
+            return (description,
+                    lambda: self.__pages(attr, low, high, order[1]), True)
+        return self.__scan()
+
+    def __scan(self):
+        """Return the plan checking every object of the class"""
+        return ("scan of the class",
+                lambda: self.storage.all(self.cls).items(), False)
+
+    def __pages(self, attr, low, high, descending):
+        """Yield the (key, object) pairs of the sorted index of attr, in
+        order, a page at a time
+        """
+        size = 256
+        if self.__limit is not None and len(self.__predicates) == 0:
+            size = max(self.__offset + self.__limit, 1)
+        after = None
+        while True:
+            page = self.storage.between(self.cls.__name__, attr, low, high,
+                                        after=after, limit=size,
+                                        reverse=descending)
+            yield from page.items()
+            if len(page) < size:
+                return
+            key, obj = list(page.items())[-1]
+            after = (getattr(obj, attr), key)
+
+
+def _related(storage, name, attr, values):
+    """Return the (key, object) pairs whose foreign key is a value"""
+    objects = {}
+    for value in values:
+        if isinstance(value, str):
+            objects.update(storage.related(name, attr, value))
+    return objects.items()
+
+
+def _bounds(predicates, attr, usable):
+    """Return the tightest (low, high) inclusive bounds the predicates set
+    on attr with usable values, None where they set none
+    """
+    low = high = None
+    for a, op, value in predicates:
+        if a != attr or not usable(value):
+            continue
+        if op in ("eq", "gt", "gte") and (low is None or value > low):
+            low = value
+        if op in ("eq", "lt", "lte") and (high is None or value < high):
+            high = value
+    return low, high
+
+
+def _is_number(value):
+    """Tell whether value is an int or a float"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _coerce(actual, value):
+    """Return the attribute value actual in a form comparable to value"""
+    if _is_number(value) and isinstance(actual, str):
+        try:
+            return float(actual)
+        except ValueError:
+            return actual
+    if isinstance(value, str) and isinstance(actual, datetime):
+        return actual.isoformat()
+    return actual
+
+
+def _matches(obj, attr, op, value):
+    """Tell whether the attribute attr of obj matches a predicate"""
+    actual = getattr(obj, attr, None)
+    if op == "prefix":
+        return isinstance(actual, str) and actual.startswith(value)
+    if op == "contains":
+        return isinstance(actual, (list, tuple)) and value in actual
+    if op == "in":
+        return any(_coerce(actual, v) == v for v in value)
+    actual = _coerce(actual, value)
+    try:
+        if op == "eq":
+            return actual == value
+        if op == "gt":
+            return actual > value
+        if op == "gte":
+            return actual >= value
+        if op == "lt":
+            return actual < value
+        return actual <= value
+    except TypeError:
+        return False
+
+
+def _sort_value(obj, attr):
+    """Return the sort key of the attribute attr of obj
+
+    Values of different types are ordered as numbers (with the numeric
+    strings), then datetimes, then strings, then any other value by its
+    repr(), and None last.
+    """
+    value = getattr(obj, attr, None)
+    if value is None:
+        return (4, "")
+    if _is_number(value) and value == value:
+        return (0, value)
+    if isinstance(value, datetime):
+        return (1, value)
+    if isinstance(value, str):
+        number = _coerce(value, 0)
+        if isinstance(number, float) and number == number:
+            return (0, number)
+        return (2, value)
+    return (3, repr(value))
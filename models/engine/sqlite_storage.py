@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""The SQLiteStorage class"""
+import json
+import sqlite3
+from models.engine.file_storage import FileStorage
+
+
+class SQLiteStorage(FileStorage):
+    """Represent a storage engine backed by an SQLite database.
+
+    Objects are kept in memory and indexed exactly like FileStorage, but
+    each class is stored in its own table and save() only upserts or
+    deletes the rows of the objects changed since the last save.
+
+    Attributes:
+        path (str): The name of the SQLite database file.
+        __connection (sqlite3.Connection): The open database connection.
+    """
+    path = "file.db"
+    __connection = None
+
+    def _write(self):
+        """Upsert the changed objects and delete the removed ones"""
+        connection = self.__connect()
+        objects = self.all()
+        with connection:
+            for key in self._take_dirty():
+                class_name, obj_id = key.split(".", 1)
+                if class_name not in FileStorage.classes:
+                    continue
+                obj = objects.get(key)
+                if obj is None:
+                    connection.execute(
+                        'DELETE FROM "{}" WHERE id = ?'.format(class_name),
+                        (obj_id,))
+                else:
+                    self.__upsert(connection, class_name, obj)
+
+    def compact(self):
+        """Rebuild the database file to reclaim the space of deleted rows"""
+        self.save()
+        self.__connect().execute("VACUUM")
+
+    def reload(self, *, classes=None):
+        """Load the rows of every table into __objects
+
+        Args:
+            classes (list): The names of the only classes whose tables
+                are loaded. All tables are loaded by default.
+        """
+        connection = self.__connect()
+        for class_name in classes or FileStorage.classes:
+            rows = connection.execute(
+                'SELECT data FROM "{}"'.format(class_name))
+            for (data,) in rows:
+                self._load(json.loads(data))
+
+    def close(self):
+        """Close the database connection"""
+        if SQLiteStorage.__connection is not None:
+            SQLiteStorage.__connection.close()
+            SQLiteStorage.__connection = None
+
+    def __connect(self):
+        """Return the database connection, creating the tables if needed"""
+        if SQLiteStorage.__connection is None:
+            connection = sqlite3.connect(SQLiteStorage.path)
+            with connection:
+                for class_name in FileStorage.classes:
+                    self.__create_table(connection, class_name)
+            SQLiteStorage.__connection = connection
+        return SQLiteStorage.__connection
+
+    def __create_table(self, connection, class_name):
+        """Create the table of class_name
+
+        The objects are queried in memory, so the timestamp and foreign
+        key columns are not indexed; the indexes that databases written
+        by earlier versions have on them only slow down writes.
+        """
+        columns = ["id", "created_at", "updated_at"]
+        columns += FileStorage.foreign_keys.get(class_name, [])
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS "{}" ({}, data TEXT NOT NULL)'.format(
+                class_name,
+                ", ".join("{} TEXT{}".format(
+                    column, " PRIMARY KEY" if column == "id" else "")
+                    for column in columns)))
+        for column in columns[1:]:
+            connection.execute('DROP INDEX IF EXISTS "{}_{}"'.format(
+                class_name, column))
+
+    def __upsert(self, connection, class_name, obj):
+        """Insert the row of obj, or update it if it already exists"""
+        data = obj.to_dict()
+        columns = ["id", "created_at", "updated_at"]
+        columns += FileStorage.foreign_keys.get(class_name, [])
+        values = [data.get(column, getattr(obj, column, None))
+                  for column in columns]
+        connection.execute(
+            'INSERT INTO "{}" ({}, data) VALUES ({}) '
+            'ON CONFLICT(id) DO UPDATE SET {}'.format(
+                class_name, ", ".join(columns),
+                ", ".join("?" * (len(columns) + 1)),
+                ", ".join("{0} = excluded.{0}".format(column)
+                          for column in columns[1:] + ["data"])),
+            values + [json.dumps(data)])
@@ -0,0 +1,172 @@
+#!/usr/bin/python3
+"""Defines unittests for bulk.py.
+
+Unittest classes:
+    TestBulk_export
+    TestBulk_import
+"""
+import csv
+import json
+import os
+import unittest
+import bulk
+from io import StringIO
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+class TestBulk_export(unittest.TestCase):
+    """Unittests for testing export of objects with bulk.py."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_export_ndjson(self):
+        us = User()
+        us.email = "a@b.c"
+        Review()
+        out = StringIO()
+        self.assertEqual(1, bulk.export_objects(User, out))
+        self.assertEqual([us.to_dict()],
+                         [json.loads(line) for line in
+                          out.getvalue().splitlines()])
+
+    def test_export_csv(self):
+        pl = Place()
+        pl.number_rooms = 3
+        pl.amenity_ids = ["a", "b"]
+        out = StringIO()
+        self.assertEqual(1, bulk.export_objects(Place, out, "csv"))
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual(1, len(rows))
+        self.assertEqual(pl.id, rows[0]["id"])
+        self.assertEqual("3", rows[0]["number_rooms"])
+        self.assertEqual('["a", "b"]', rows[0]["amenity_ids"])
+
+    def test_export_without_building_objects(self):
+        us = User()
+        us.email = "a@b.c"
+        Review().save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage.lazy = True
+        try:
+            storage.reload()
+            out = StringIO()
+            self.assertEqual(1, bulk.export_objects(User, out))
+            self.assertEqual({}, FileStorage._FileStorage__objects)
+        finally:
+            FileStorage.lazy = False
+        self.assertEqual(us.to_dict(), json.loads(out.getvalue()))
+
+    def test_columns(self):
+        self.assertEqual(["id", "created_at", "updated_at", "email",
+                          "password", "first_name", "last_name"],
+                         bulk.columns(User))
+
+
+class TestBulk_import(unittest.TestCase):
+    """Unittests for testing import of objects with bulk.py."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        for path in ["file.json", "file.json.log"]:
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_import_ndjson(self):
+        rv = Review()
+        rv.text = "Great"
+        line = json.dumps(rv.to_dict()) + "\n"
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(1, bulk.import_objects(Review, StringIO(line)))
+        self.assertIsNone(storage.get(Review, rv.id))
+        storage.reload()
+        imported = storage.get(Review, rv.id)
+        self.assertEqual("Great", imported.text)
+        self.assertEqual(rv.created_at, imported.created_at)
+
+    def test_import_csv_round_trip(self):
+        pl = Place()
+        pl.number_rooms = 3
+        pl.latitude = 1.5
+        pl.amenity_ids = ["a"]
+        out = StringIO()
+        bulk.export_objects(Place, out, "csv")
+        FileStorage._FileStorage__objects = {}
+        bulk.import_objects(Place, StringIO(out.getvalue()), "csv")
+        storage.reload()
+        imported = storage.get(Place, pl.id)
+        self.assertEqual(3, imported.number_rooms)
+        self.assertEqual(1.5, imported.latitude)
+        self.assertEqual(["a"], imported.amenity_ids)
+
+    def test_import_without_id(self):
+        bulk.import_objects(User, StringIO('{"email": "a@b.c"}\n'))
+        storage.reload()
+        us = list(storage.all(User).values())[0]
+        self.assertEqual("a@b.c", us.email)
+        self.assertEqual(str, type(us.id))
+
+    def test_import_saves_each_batch(self):
+        lines = "".join('{{"text": "{}"}}\n'.format(i) for i in range(5))
+        progress = StringIO()
+        self.assertEqual(5, bulk.import_objects(
+            Review, StringIO(lines), batch_size=2, progress=progress))
+        self.assertEqual(3, len(progress.getvalue().splitlines()))
+        with open("file.json.log", "r") as f:
+            self.assertEqual(5, len(f.readlines()))
+        self.assertEqual({}, storage.all(Review))
+
+    def test_compact_after_import(self):
+        us = User()
+        us.save()
+        bulk.import_objects(User, StringIO('{"email": "a@b.c"}\n'))
+        storage.compact()
+        self.assertFalse(os.path.exists("file.json.log"))
+        with open("file.json", "r") as f:
+            self.assertEqual(2, len(json.load(f)))
+
+    def test_main_import_file(self):
+        with open("test_bulk.ndjson", "w") as f:
+            f.write('{"text": "a"}\n{"text": "b"}\n')
+        try:
+            bulk.main(["import", "Review", "-i", "test_bulk.ndjson"])
+        finally:
+            os.remove("test_bulk.ndjson")
+        storage.reload()
+        self.assertEqual(2, storage.count(Review))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,10 @@ Unittest classes:
     TestHBNBCommand_all
     TestHBNBCommand_destroy
     TestHBNBCommand_update
+    TestHBNBCommand_near
+    TestHBNBCommand_search
+    TestHBNBCommand_where
+    TestHBNBCommand_dotted
 """
 import os
 import sys
@@ -99,7 +103,8 @@ class TestHBNBCommand_help(unittest.TestCase):
     def test_help(self):
         h = ("Documented commands (type help <topic>):\n"
              "========================================\n"
-             "EOF  all  count  create  destroy  help  quit  show  update")
+             "EOF  all  count  create  destroy  help  near  quit  search  show"
+             "  update  where")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help"))
             self.assertEqual(h, output.getvalue().strip())
@@ -851,6 +856,74 @@ class TestHBNBCommand_all(unittest.TestCase):
             self.assertIn("Review", output.getvalue().strip())
             self.assertNotIn("BaseModel", output.getvalue().strip())
 
+    def test_all_same_as_list(self):
+        FileStorage._FileStorage__objects = {}
+        with patch("sys.stdout", new=StringIO()) as output:
+            for i in range(3):
+                self.assertFalse(HBNBCommand().onecmd("create Place"))
+        expected = str([str(obj) for obj in storage.all("Place").values()])
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all Place"))
+            self.assertEqual(expected + "\n", output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all User"))
+            self.assertEqual("[]\n", output.getvalue())
+
+    def test_all_limit_offset(self):
+        FileStorage._FileStorage__objects = {}
+        with patch("sys.stdout", new=StringIO()) as output:
+            for i in range(5):
+                self.assertFalse(HBNBCommand().onecmd("create City"))
+        cities = [str(obj) for obj in storage.all("City").values()]
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "all City limit=2, offset=1"))
+            self.assertEqual(str(cities[1:3]), output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("City.all(offset=3)"))
+            self.assertEqual(str(cities[3:]), output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all limit=1"))
+            self.assertEqual(str(cities[:1]), output.getvalue().strip())
+
+    def test_all_invalid_arguments(self):
+        correct = "** invalid arguments **"
+        for line in ["all City limit='2'", "all City page=2",
+                     "City.all(2)", "City.all(limit=-1)",
+                     "all City offset=-1"]:
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(line))
+                self.assertEqual(correct, output.getvalue().strip())
+
+    def test_all_flushes_as_it_goes(self):
+        FileStorage._FileStorage__objects = {}
+        with patch("sys.stdout", new=StringIO()) as output:
+            for i in range(5):
+                self.assertFalse(HBNBCommand().onecmd("create State"))
+        command = HBNBCommand()
+        command.flush_every = 2
+        with patch("sys.stdout", new=StringIO()) as output:
+            with patch.object(output, "flush") as flush:
+                self.assertFalse(command.onecmd("all State"))
+                self.assertEqual(3, flush.call_count)
+
+    def test_all_limit_builds_only_the_page(self):
+        FileStorage._FileStorage__objects = {}
+        with patch("sys.stdout", new=StringIO()):
+            for i in range(5):
+                self.assertFalse(HBNBCommand().onecmd("create City"))
+        FileStorage._FileStorage__objects = {}
+        FileStorage.lazy = True
+        try:
+            storage.reload()
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd("all City limit=1"))
+            built = list(FileStorage._FileStorage__objects.values())
+        finally:
+            FileStorage.lazy = False
+        self.assertEqual(1, len(built))
+        self.assertEqual(str([str(built[0])]), output.getvalue().strip())
+
 
 class TestHBNBCommand_update(unittest.TestCase):
     """Unittests for testing update from the HBNB command interpreter."""
@@ -1566,5 +1639,180 @@ class TestHBNBCommand_count(unittest.TestCase):
             self.assertEqual("1", output.getvalue().strip())
 
 
+class TestHBNBCommand_near(unittest.TestCase):
+    """Unittests for testing near of the HBNB command interpreter."""
+
+    def test_near_missing_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("near"))
+            self.assertEqual("** class name missing **",
+                             output.getvalue().strip())
+
+    def test_near_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("near MyModel 0 0 1"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_near_missing_or_invalid_location(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("near Place 0 0"))
+            self.assertEqual("** location missing **",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("near Place a b 1"))
+            self.assertEqual("** invalid location **",
+                             output.getvalue().strip())
+
+    def test_near_class_without_location(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("near User 0 0 1"))
+            self.assertEqual("** class has no location **",
+                             output.getvalue().strip())
+
+    def test_near_objects(self):
+        near, far = storage.registry["Place"](), storage.registry["Place"]()
+        near.latitude, near.longitude = 48.8566, 2.3522
+        far.latitude, far.longitude = 51.5074, -0.1278
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "near Place 48.86 2.35 10"))
+            self.assertIn(near.id, output.getvalue())
+            self.assertNotIn(far.id, output.getvalue())
+        storage.delete(near)
+        storage.delete(far)
+
+
+class TestHBNBCommand_search(unittest.TestCase):
+    """Unittests for testing search of the HBNB command interpreter."""
+
+    def test_search_missing_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search"))
+            self.assertEqual("** class name missing **",
+                             output.getvalue().strip())
+
+    def test_search_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search MyModel clean"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_search_missing_words(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search Review"))
+            self.assertEqual("** words missing **",
+                             output.getvalue().strip())
+
+    def test_search_class_without_text(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search User clean"))
+            self.assertEqual("** class has no text **",
+                             output.getvalue().strip())
+
+    def test_search_objects(self):
+        clean, noisy = storage.registry["Review"](), storage.registry[
+            "Review"]()
+        clean.text = "Spotless and quiet"
+        noisy.text = "Noisy street"
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search Review quiet"))
+            self.assertIn(clean.id, output.getvalue())
+            self.assertNotIn(noisy.id, output.getvalue())
+        storage.delete(clean)
+        storage.delete(noisy)
+
+
+class TestHBNBCommand_where(unittest.TestCase):
+    """Unittests for testing where of the HBNB command interpreter."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.places = []
+        for name, price in [("Loft", 80), ("House", 120), ("Cabin", 60)]:
+            pl = storage.registry["Place"]()
+            pl.name = name
+            pl.price_by_night = price
+            self.places.append(pl)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def lines(self, command):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(command))
+        return output.getvalue().splitlines()
+
+    def test_where_missing_class(self):
+        self.assertEqual(["** class name missing **"], self.lines("where"))
+        self.assertEqual(["** class name missing **"],
+                         self.lines(".where()"))
+
+    def test_where_invalid_class(self):
+        self.assertEqual(["** class doesn't exist **"],
+                         self.lines("MyModel.where()"))
+
+    def test_where_invalid_arguments(self):
+        self.assertEqual(["** invalid arguments **"],
+                         self.lines('Place.where("Loft")'))
+        self.assertEqual(["** invalid arguments **"],
+                         self.lines("Place.where(name=Loft)"))
+        self.assertEqual(["** invalid arguments **"],
+                         self.lines('Place.where(limit="2")'))
+        for arguments in ['name__like="L"', "price_by_night__range=5",
+                          "name__in=5", "name__prefix=5", "limit=-1",
+                          "offset=-1", "limit=True"]:
+            self.assertEqual(["** invalid arguments **"],
+                             self.lines("Place.where({})".format(arguments)))
+
+    def test_where_mixed_types(self):
+        self.places[1].price_by_night = "100"
+        self.assertEqual([str(self.places[i]) for i in (2, 0, 1)],
+                         self.lines('Place.where(order_by="price_by_night")'))
+
+    def test_where_one_line_per_instance(self):
+        self.assertEqual([str(self.places[0])],
+                         self.lines('Place.where(name="Loft")'))
+        self.assertEqual([str(pl) for pl in self.places[::2]],
+                         self.lines("where Place price_by_night__lt=100, "
+                                    "order_by='-price_by_night'"))
+
+    def test_where_order_by_limit_offset(self):
+        self.assertEqual([str(self.places[0]), str(self.places[1])],
+                         self.lines('Place.where(order_by="price_by_night",'
+                                    ' offset=1, limit=2)'))
+        self.assertEqual([], self.lines('Place.where(name="Tent")'))
+
+
+class TestHBNBCommand_dotted(unittest.TestCase):
+    """Unittests for testing the <class name>.<command>() notation."""
+
+    def test_unknown_syntax(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("Place.fly()"))
+            self.assertEqual("*** Unknown syntax: Place.fly()",
+                             output.getvalue().strip())
+
+    def test_update_dictionary(self):
+        pl = storage.registry["Place"]()
+        with patch("sys.stdout", new=StringIO()):
+            self.assertFalse(HBNBCommand().onecmd(
+                'Place.update("{}", {{"description": "big, bright", '
+                '"max_guest": 4}})'.format(pl.id)))
+        self.assertEqual("big, bright", pl.description)
+        self.assertEqual(4, pl.max_guest)
+        with patch("sys.stdout", new=StringIO()):
+            self.assertFalse(HBNBCommand().onecmd(
+                'Place.update("{}", "name", "Loft, top floor")'
+                .format(pl.id)))
+        self.assertEqual("Loft, top floor", pl.name)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                'Place.update("{}", {{"name": }})'.format(pl.id)))
+            self.assertEqual("** invalid dictionary **",
+                             output.getvalue().strip())
+        storage.delete(pl)
+
+
 if __name__ == "__main__":
     unittest.main()
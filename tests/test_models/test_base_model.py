@@ -5,6 +5,7 @@ Unittest classes:
     TestBaseModel_instantiation
     TestBaseModel_save
     TestBaseModel_to_dict
+    TestBaseModel_from_dict
 """
 import os
 import models
@@ -77,6 +78,13 @@ class TestBaseModel_instantiation(unittest.TestCase):
         with self.assertRaises(TypeError):
             BaseModel(id=None, created_at=None, updated_at=None)
 
+    def test_instantiation_with_kwargs_without_microseconds(self):
+        dt = datetime(2023, 10, 10, 12, 38, 12)
+        bm = BaseModel(id="345", created_at=dt.isoformat(),
+                       updated_at=dt.isoformat())
+        self.assertEqual(bm.created_at, dt)
+        self.assertEqual(bm.updated_at, dt)
+
     def test_instantiation_with_args_and_kwargs(self):
         dt = datetime.today()
         dt_iso = dt.isoformat()
@@ -188,5 +196,44 @@ class TestBaseModel_to_dict(unittest.TestCase):
             bm.to_dict(None)
 
 
+class TestBaseModel_from_dict(unittest.TestCase):
+    """Unittests for testing from_dict method of the BaseModel class."""
+
+    def test_round_trip(self):
+        bm = BaseModel()
+        bm.name = "Holberton"
+        copy = BaseModel.from_dict(bm.to_dict())
+        self.assertEqual(BaseModel, type(copy))
+        self.assertEqual(bm.__dict__, copy.__dict__)
+
+    def test_from_dict_matches_kwargs(self):
+        bm_dict = BaseModel().to_dict()
+        self.assertEqual(BaseModel(**bm_dict).__dict__,
+                         BaseModel.from_dict(bm_dict).__dict__)
+
+    def test_from_dict_not_stored(self):
+        bm_dict = BaseModel().to_dict()
+        bm_dict["id"] = "from_dict"
+        BaseModel.from_dict(bm_dict)
+        self.assertNotIn("BaseModel.from_dict", models.storage.all())
+
+    def test_from_dict_leaves_dict_unchanged(self):
+        bm_dict = BaseModel().to_dict()
+        copy = dict(bm_dict)
+        BaseModel.from_dict(bm_dict)
+        self.assertEqual(copy, bm_dict)
+
+    def test_from_dict_without_microseconds(self):
+        dt = datetime(2023, 10, 10, 12, 38, 12)
+        bm = BaseModel.from_dict({"id": "1", "created_at": dt.isoformat(),
+                                  "updated_at": dt.isoformat()})
+        self.assertEqual(dt, bm.created_at)
+        self.assertEqual(dt, bm.updated_at)
+
+    def test_from_dict_with_None_dates(self):
+        with self.assertRaises(TypeError):
+            BaseModel.from_dict({"id": "1", "created_at": None})
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""Defines unittests for models/compact.py.
+
+Unittest classes:
+    TestCompact_class
+    TestCompact_attributes
+    TestCompact_from_dict
+"""
+import models
+import unittest
+from datetime import datetime
+from models.base_model import BaseModel
+from models.compact import compact_class
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+class TestCompact_class(unittest.TestCase):
+    """Unittests for testing the classes made by compact_class."""
+
+    def test_same_class_returned(self):
+        self.assertIs(compact_class(User), compact_class(User))
+
+    def test_class_name(self):
+        self.assertEqual("User", compact_class(User).__name__)
+
+    def test_virtual_subclass(self):
+        us = compact_class(User)()
+        self.assertIsInstance(us, User)
+        self.assertIsInstance(us, BaseModel)
+        self.assertNotIsInstance(us, Place)
+        self.assertTrue(issubclass(compact_class(User), User))
+
+    def test_no_instance_dict(self):
+        self.assertEqual(0, compact_class(User).__dictoffset__)
+        self.assertIn("email", compact_class(User).__slots__)
+        self.assertIn("amenity_ids", compact_class(Place).fields)
+
+    def test_new_instance_stored(self):
+        us = compact_class(User)()
+        self.assertIs(us, models.storage.get(User, us.id))
+
+
+class TestCompact_attributes(unittest.TestCase):
+    """Unittests for testing the attributes of compact instances."""
+
+    def setUp(self):
+        self.pl = compact_class(Place)()
+
+    def test_str_like_model(self):
+        pl = Place()
+        pl.name = "Home"
+        self.pl.name = "Home"
+        self.assertEqual(str(pl).replace(pl.id, "x")
+                         .replace(repr(pl.created_at), "d")
+                         .replace(repr(pl.updated_at), "d"),
+                         str(self.pl).replace(self.pl.id, "x")
+                         .replace(repr(self.pl.created_at), "d")
+                         .replace(repr(self.pl.updated_at), "d"))
+
+    def test_defaults(self):
+        self.assertEqual(0, self.pl.number_rooms)
+        self.assertEqual("", self.pl.name)
+        self.assertNotIn("name", self.pl.to_dict())
+
+    def test_mutable_default_not_shared(self):
+        self.pl.amenity_ids.append("a1")
+        self.assertEqual([], Place.amenity_ids)
+        self.assertEqual(["a1"], self.pl.amenity_ids)
+        self.assertEqual([], compact_class(Place)().amenity_ids)
+
+    def test_mutable_default_read_like_model(self):
+        pl = Place()
+        FileStorage._FileStorage__dirty.clear()
+        self.assertEqual(pl.amenity_ids, self.pl.amenity_ids)
+        self.assertNotIn("amenity_ids", self.pl.to_dict())
+        self.assertNotIn("amenity_ids", str(self.pl))
+        self.assertEqual(list(pl.to_dict()), list(self.pl.to_dict()))
+        self.assertNotIn("Place." + self.pl.id,
+                         FileStorage._FileStorage__dirty)
+        self.pl.amenity_ids = ["a1"]
+        self.assertEqual(["a1"], self.pl.to_dict()["amenity_ids"])
+
+    def test_restore_drops_mutable_default_copy(self):
+        self.pl.amenity_ids.append("a1")
+        self.pl._restore({"id": "1"})
+        self.assertEqual([], self.pl.amenity_ids)
+
+    def test_overflow_attribute(self):
+        self.pl.nickname = "cosy"
+        self.assertEqual("cosy", self.pl.nickname)
+        self.assertEqual("cosy", self.pl.to_dict()["nickname"])
+
+    def test_attribute_order_kept(self):
+        self.pl.nickname = "cosy"
+        self.pl.name = "Home"
+        self.assertEqual(["id", "created_at", "updated_at", "nickname",
+                          "name", "__class__"], list(self.pl.to_dict()))
+
+    def test_missing_attribute(self):
+        with self.assertRaises(AttributeError):
+            self.pl.nickname
+
+    def test_delete_attribute(self):
+        self.pl.name = "Home"
+        self.pl.nickname = "cosy"
+        del self.pl.name
+        del self.pl.nickname
+        self.assertEqual("", self.pl.name)
+        self.assertNotIn("nickname", self.pl.to_dict())
+        with self.assertRaises(AttributeError):
+            del self.pl.nickname
+
+    def test_change_marks_dirty(self):
+        FileStorage._FileStorage__dirty.clear()
+        self.pl.name = "Home"
+        self.assertIn("Place." + self.pl.id,
+                      FileStorage._FileStorage__dirty)
+
+
+class TestCompact_from_dict(unittest.TestCase):
+    """Unittests for testing building compact instances from dicts."""
+
+    def test_to_dict_round_trip(self):
+        rv = Review()
+        rv.text = "Great"
+        rv.extra = [1]
+        compact = compact_class(Review).from_dict(rv.to_dict())
+        self.assertEqual(rv.to_dict(), compact.to_dict())
+        self.assertEqual(datetime, type(compact.created_at))
+
+    def test_equal_dates_shared(self):
+        value = {"id": "1", "created_at": "2023-10-10T12:38:12.144669",
+                 "updated_at": "2023-10-10T12:38:12.144669",
+                 "__class__": "Review"}
+        rv = compact_class(Review).from_dict(value)
+        self.assertIs(rv.created_at, rv.updated_at)
+
+    def test_foreign_keys_shared(self):
+        cls = compact_class(Review)
+        rv1 = cls.from_dict({"id": "1", "place_id": "".join(["p", "1"])})
+        rv2 = cls.from_dict({"id": "2", "place_id": "".join(["p", "1"])})
+        self.assertIs(rv1.place_id, rv2.place_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
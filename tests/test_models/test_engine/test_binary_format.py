@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/binary_format.py.
+
+Unittest classes:
+    TestBinaryFormat_round_trip
+    TestBinaryFormat_records
+    TestBinaryFormat_convert
+"""
+import json
+import os
+import unittest
+from io import BytesIO
+from models.engine import binary_format
+from models.review import Review
+
+
+def dumps(values):
+    f = BytesIO()
+    binary_format.dump(values, f)
+    return f.getvalue()
+
+
+class TestBinaryFormat_round_trip(unittest.TestCase):
+    """Unittests for testing writing and reading back objects."""
+
+    def items(self, data):
+        return list(binary_format.iter_items(BytesIO(data)))
+
+    def test_empty_file(self):
+        self.assertEqual([], self.items(b""))
+        self.assertEqual([], self.items(dumps([])))
+
+    def test_not_binary(self):
+        with self.assertRaises(ValueError):
+            self.items(b'{"User.1": {}}')
+
+    def test_to_dict_round_trip(self):
+        rv = Review()
+        rv.text = "Great"
+        value = rv.to_dict()
+        self.assertEqual([("Review." + rv.id, value)],
+                         self.items(dumps([value])))
+
+    def test_value_types(self):
+        value = {"id": "not-a-uuid", "name": "café", "n": 3,
+                 "big": 2 ** 70, "x": -1.5, "ok": True, "no": False,
+                 "none": None, "ids": ["a", "b"], "nested": {"a": 1},
+                 "when": "2023-10-10T12:38:12", "upper":
+                 "F81D4FAE-7DEC-11D0-A765-00A0C91E6BF6",
+                 "__class__": "Place"}
+        self.assertEqual([("Place.not-a-uuid", value)],
+                         self.items(dumps([value])))
+
+    def test_key_order_kept(self):
+        value = {"text": "a", "id": "1", "__class__": "Review"}
+        self.assertEqual(["text", "id", "__class__"],
+                         list(self.items(dumps([value]))[0][1]))
+
+    def test_native_dates(self):
+        rv = Review()
+        rv.updated_at = rv.created_at
+        key, value = next(binary_format.iter_items(
+            BytesIO(dumps([rv.to_dict()])), native=True))
+        self.assertEqual(rv.created_at, value["created_at"])
+        self.assertIs(value["created_at"], value["updated_at"])
+        self.assertEqual(rv.id, value["id"])
+        self.assertEqual(rv.to_dict(), Review.from_dict(value).to_dict())
+
+    def test_records_across_chunks(self):
+        values = [{"id": str(i), "text": "a" * i, "__class__": "Review"}
+                  for i in range(20)]
+        items = binary_format.iter_items(BytesIO(dumps(values)),
+                                         chunk_size=7)
+        self.assertEqual(values, [value for key, value in items])
+
+    def test_truncated_file(self):
+        data = dumps([{"id": "1", "text": "a", "__class__": "Review"}])
+        with self.assertRaises(ValueError):
+            self.items(data[:-1])
+
+    def test_uuids_and_dates_are_packed(self):
+        rv = Review()
+        value = rv.to_dict()
+        text = json.dumps(value).encode()
+        data = dumps([value, value])
+        self.assertLess(len(data), len(text))
+        self.assertNotIn(rv.id.encode(), data)
+
+
+class TestBinaryFormat_records(unittest.TestCase):
+    """Unittests for testing reading records by offset."""
+
+    def test_schema_written_once_per_layout(self):
+        values = [{"id": str(i), "text": "a", "__class__": "Review"}
+                  for i in range(3)]
+        values.append({"id": "4", "__class__": "Review"})
+        kinds = [kind for offset, kind
+                 in binary_format.iter_records(dumps(values))]
+        self.assertEqual([binary_format.SCHEMA] + [binary_format.OBJECT] * 3 +
+                         [binary_format.SCHEMA, binary_format.OBJECT], kinds)
+
+    def test_read_by_offset(self):
+        values = [{"id": str(i), "n": i, "__class__": "Place"}
+                  for i in range(3)]
+        data = dumps(values)
+        schemas = {}
+        objects = []
+        for offset, kind in binary_format.iter_records(data):
+            if kind == binary_format.SCHEMA:
+                number, schema = binary_format.read_schema(data, offset)
+                schemas[number] = schema
+            else:
+                objects.append(offset)
+        self.assertEqual("Place", schemas[0].class_name)
+        self.assertEqual(("Place.2", values[2]),
+                         binary_format.read_object(data, objects[2], schemas))
+
+    def test_iter_records_not_binary(self):
+        with self.assertRaises(ValueError):
+            list(binary_format.iter_records(b"{}"))
+
+
+class TestBinaryFormat_convert(unittest.TestCase):
+    """Unittests for testing conversion to and from JSON files."""
+
+    def tearDown(self):
+        for path in ("test.json", "test.bin", "back.json"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def test_json_to_binary_and_back(self):
+        rv = Review()
+        objdict = {"Review." + rv.id: rv.to_dict(),
+                   "User.1": {"id": "1", "email": "a@b.c",
+                              "__class__": "User"}}
+        with open("test.json", "w") as f:
+            json.dump(objdict, f)
+        binary_format.json_to_binary("test.json", "test.bin")
+        self.assertLess(os.path.getsize("test.bin"),
+                        os.path.getsize("test.json"))
+        binary_format.binary_to_json("test.bin", "back.json")
+        with open("back.json", "r") as f:
+            self.assertEqual(objdict, json.load(f))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,13 +4,30 @@
 Unittest classes:
     TestFileStorage_instantiation
     TestFileStorage_methods
+    TestFileStorage_journal
+    TestFileStorage_dirty
+    TestFileStorage_sharded
+    TestFileStorage_lazy
+    TestFileStorage_atomic
+    TestFileStorage_flusher
+    TestFileStorage_batch
+    TestFileStorage_binary
+    TestFileStorage_read_only
+    TestFileStorage_compact_objects
 """
+import io
 import os
 import json
 import models
+import subprocess
+import sys
+import tempfile
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta
+from time import sleep
+from unittest.mock import patch
 from models.base_model import BaseModel
+from models.engine import binary_format
 from models.engine.file_storage import FileStorage
 from models.user import User
 from models.state import State
@@ -65,9 +82,34 @@ class TestFileStorage_methods(unittest.TestCase):
     def test_all(self):
         self.assertEqual(dict, type(models.storage.all()))
 
-    def test_all_with_arg(self):
-        with self.assertRaises(TypeError):
-            models.storage.all(None)
+    def test_all_with_None(self):
+        self.assertIs(models.storage.all(), models.storage.all(None))
+
+    def test_all_with_class(self):
+        us = User()
+        st = State()
+        self.assertEqual({"User." + us.id: us}, models.storage.all(User))
+        self.assertEqual({"User." + us.id: us}, models.storage.all("User"))
+        self.assertIn("State." + st.id, models.storage.all(BaseModel))
+        self.assertIn("User." + us.id, models.storage.all(BaseModel))
+
+    def test_all_with_class_after_delete(self):
+        us = User()
+        models.storage.delete(us)
+        self.assertNotIn("User." + us.id, models.storage.all(User))
+
+    def test_all_unknown_class(self):
+        self.assertEqual({}, models.storage.all("MyModel"))
+
+    def test_count(self):
+        FileStorage._FileStorage__objects = {}
+        User()
+        User()
+        State()
+        self.assertEqual(2, models.storage.count(User))
+        self.assertEqual(1, models.storage.count("State"))
+        self.assertEqual(3, models.storage.count(BaseModel))
+        self.assertEqual(3, models.storage.count())
 
     def test_new(self):
         bm = BaseModel()
@@ -103,6 +145,197 @@ class TestFileStorage_methods(unittest.TestCase):
         with self.assertRaises(TypeError):
             models.storage.new(BaseModel(), 1)
 
+    def test_get(self):
+        us = User()
+        self.assertIs(us, models.storage.get(User, us.id))
+        self.assertIs(us, models.storage.get("User", us.id))
+
+    def test_get_missing(self):
+        us = User()
+        self.assertIsNone(models.storage.get(User, "1"))
+        self.assertIsNone(models.storage.get(State, us.id))
+
+    def test_delete(self):
+        us = User()
+        models.storage.delete(us)
+        self.assertNotIn("User." + us.id, models.storage.all())
+
+    def test_delete_none(self):
+        count = len(models.storage.all())
+        models.storage.delete(None)
+        self.assertEqual(count, len(models.storage.all()))
+
+    def test_related(self):
+        st = State()
+        cy = City()
+        cy.state_id = st.id
+        pl = Place()
+        pl.city_id = cy.id
+        pl.user_id = "u1"
+        rv = Review()
+        rv.place_id = pl.id
+        self.assertEqual({"City." + cy.id: cy},
+                         models.storage.related(City, "state_id", st.id))
+        self.assertEqual({"Place." + pl.id: pl},
+                         models.storage.related("Place", "city_id", cy.id))
+        self.assertEqual({"Place." + pl.id: pl},
+                         models.storage.related(Place, "user_id", "u1"))
+        self.assertEqual({"Review." + rv.id: rv},
+                         models.storage.related(Review, "place_id", pl.id))
+
+    def test_related_follows_updates_and_deletes(self):
+        cy = City()
+        cy.state_id = "s1"
+        cy.state_id = "s2"
+        self.assertEqual({}, models.storage.related(City, "state_id", "s1"))
+        self.assertIn("City." + cy.id,
+                      models.storage.related(City, "state_id", "s2"))
+        models.storage.delete(cy)
+        self.assertEqual({}, models.storage.related(City, "state_id", "s2"))
+
+    def test_related_after_console_update(self):
+        from console import HBNBCommand
+        cy = City()
+        with patch("sys.stdout"):
+            HBNBCommand().onecmd('update City {} state_id "s3"'.format(
+                cy.id))
+        self.assertIn("City." + cy.id,
+                      models.storage.related(City, "state_id", "s3"))
+
+    def test_related_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.related(User, "email", "a@b.c")
+
+    def test_in_ranges(self):
+        pl1 = Place()
+        pl1.price_by_night = 80
+        pl1.max_guest = 4
+        pl2 = Place()
+        pl2.price_by_night = 200
+        pl2.max_guest = 4
+        self.assertEqual({"Place." + pl1.id: pl1},
+                         models.storage.in_ranges(
+                             Place, price_by_night=(50, 100), max_guest=4))
+        pl2.price_by_night = 90
+        self.assertIn("Place." + pl2.id, models.storage.in_ranges(
+            "Place", price_by_night=(50, 100)))
+        models.storage.delete(pl1)
+        self.assertEqual({"Place." + pl2.id: pl2},
+                         models.storage.in_ranges(
+                             Place, price_by_night=(50, 100)))
+
+    def test_in_ranges_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.in_ranges(User, age=(1, 2))
+        with self.assertRaises(KeyError):
+            models.storage.in_ranges(Place, name=(1, 2))
+
+    def test_having(self):
+        pl1 = Place()
+        pl1.city_id = "c1"
+        pl1.amenity_ids = ["wifi", "tv"]
+        pl2 = Place()
+        pl2.city_id = "c2"
+        pl2.amenity_ids = ["wifi"]
+        key1, key2 = "Place." + pl1.id, "Place." + pl2.id
+        self.assertEqual({key1, key2}, set(models.storage.having(
+            Place, "amenity_ids", ["wifi"])))
+        self.assertEqual({key1: pl1}, models.storage.having(
+            "Place", "amenity_ids", ["wifi", "tv"]))
+        self.assertEqual({key2: pl2}, models.storage.having(
+            Place, "amenity_ids", ["wifi"], city_id="c2"))
+        self.assertEqual({key1, key2}, set(models.storage.having(
+            Place, "amenity_ids", [], city_id=["c1", "c2"])))
+        pl2.amenity_ids = pl2.amenity_ids + ["tv"]
+        self.assertEqual({key1, key2}, set(models.storage.having(
+            Place, "amenity_ids", ["tv"])))
+        models.storage.delete(pl1)
+        self.assertEqual({key2: pl2}, models.storage.having(
+            Place, "amenity_ids", ["wifi", "tv"]))
+
+    def test_having_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.having(User, "amenity_ids", ["wifi"])
+        with self.assertRaises(KeyError):
+            models.storage.having(Place, "amenity_ids", [], name="x")
+
+    def test_search(self):
+        rv1 = Review()
+        rv1.text = "Great view, great host"
+        rv2 = Review()
+        rv2.text = "Great location"
+        key1, key2 = "Review." + rv1.id, "Review." + rv2.id
+        self.assertEqual([key1, key2],
+                         list(models.storage.search(Review, "great")))
+        self.assertEqual({key2: rv2},
+                         models.storage.search("Review", "location", 5))
+        rv2.text = "Nice view"
+        self.assertEqual({key1: rv1},
+                         models.storage.search(Review, "great"))
+        models.storage.delete(rv1)
+        self.assertEqual({key2: rv2}, models.storage.search(Review, "view"))
+
+    def test_search_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.search(User, "great")
+
+    def test_between(self):
+        rv1 = Review()
+        rv2 = Review()
+        rv3 = Review()
+        for i, rv in enumerate((rv1, rv2, rv3)):
+            rv.created_at = datetime(2023, 10, 10 + i)
+        keys = ["Review." + rv.id for rv in (rv1, rv2, rv3)]
+        self.assertEqual(keys, list(models.storage.between(
+            Review, "created_at")))
+        self.assertEqual(keys[1:], list(models.storage.between(
+            "Review", "created_at", rv2.created_at)))
+        self.assertEqual(keys[:1], list(models.storage.between(
+            Review, "created_at", high=rv2.created_at)))
+        self.assertEqual(keys[::-1][:2], list(models.storage.between(
+            Review, "created_at", limit=2, reverse=True)))
+        self.assertEqual(keys[2:], list(models.storage.between(
+            Review, "created_at", after=(rv2.created_at, keys[1]))))
+        since = rv3.updated_at + timedelta(microseconds=1)
+        sleep(0.01)
+        rv1.save()
+        self.assertEqual({keys[0]: rv1}, models.storage.between(
+            Review, "updated_at", since))
+        models.storage.delete(rv1)
+        self.assertEqual(set(keys[1:]), set(models.storage.between(
+            Review, "updated_at")))
+
+    def test_between_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.between(Review, "text")
+
+    def test_within_near_nearest(self):
+        pl1 = Place()
+        pl1.latitude = 48.8566
+        pl1.longitude = 2.3522
+        pl2 = Place()
+        pl2.latitude = 50.8503
+        pl2.longitude = 4.3517
+        key1, key2 = "Place." + pl1.id, "Place." + pl2.id
+        self.assertEqual({key1: pl1},
+                         models.storage.within(Place, 48, 2, 49, 3))
+        self.assertEqual([key1, key2], list(models.storage.near(
+            "Place", 48.86, 2.35, 300)))
+        self.assertEqual([key2], list(models.storage.nearest(
+            Place, 51, 4.5)))
+        pl2.latitude = 48.8
+        self.assertEqual([key2, key1], list(models.storage.nearest(
+            Place, 48.8, 4.3, 2)))
+        models.storage.delete(pl2)
+        self.assertEqual({key1: pl1},
+                         models.storage.near(Place, 48.86, 2.35, 300))
+
+    def test_locations_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.near(User, 0, 0, 1)
+        with self.assertRaises(KeyError):
+            models.storage.nearest("City", 0, 0)
+
     def test_save(self):
         bm = BaseModel()
         us = User()
@@ -160,10 +393,921 @@ class TestFileStorage_methods(unittest.TestCase):
         self.assertIn("Amenity." + am.id, objs)
         self.assertIn("Review." + rv.id, objs)
 
+    def test_reload_unknown_class(self):
+        with open("file.json", "w") as f:
+            json.dump({"Evil.1": {"id": "1", "__class__": "__import__"}}, f)
+        with self.assertRaises(ValueError):
+            models.storage.reload()
+
+    def test_registry(self):
+        from console import HBNBCommand
+        self.assertIs(User, FileStorage.registry["User"])
+        self.assertEqual(list(FileStorage.registry), FileStorage.classes)
+        for name, cls in FileStorage.registry.items():
+            self.assertIs(cls, HBNBCommand.l_classes[name])
+
     def test_reload_with_arg(self):
         with self.assertRaises(TypeError):
             models.storage.reload(None)
 
 
+class TestFileStorage_journal(unittest.TestCase):
+    """Unittests for testing the journal mode of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        models.storage.save()
+        FileStorage.journal = True
+
+    def tearDown(self):
+        FileStorage.journal = False
+        FileStorage.compact_after = 1000
+        for path in ("file.json", "file.json.log"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_environment(self):
+        root = os.path.dirname(os.path.abspath(models.__path__[0]))
+        script = ("from models.user import User\n"
+                  "User().save()\n")
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PYTHONPATH=root, HBNB_JOURNAL="1")
+            subprocess.run([sys.executable, "-c", script], cwd=directory,
+                           env=env, check=True)
+            with open(os.path.join(directory, "file.json.log"), "r") as f:
+                self.assertEqual("set", json.loads(f.readline())["op"])
+
+    def test_save_appends_to_journal(self):
+        us = User()
+        us.save()
+        with open("file.json", "r") as f:
+            self.assertNotIn("User." + us.id, f.read())
+        with open("file.json.log", "r") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(1, len(records))
+        self.assertEqual("set", records[0]["op"])
+        self.assertEqual("User." + us.id, records[0]["key"])
+
+    def test_save_without_changes_appends_nothing(self):
+        User().save()
+        models.storage.save()
+        with open("file.json.log", "r") as f:
+            self.assertEqual(1, len(f.readlines()))
+
+    def test_delete_is_journaled(self):
+        us = User()
+        us.save()
+        models.storage.delete(us)
+        models.storage.save()
+        with open("file.json.log", "r") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual("delete", records[-1]["op"])
+        self.assertNotIn("User." + us.id, models.storage.all())
+
+    def test_reload_replays_journal(self):
+        us = User()
+        us.first_name = "Betty"
+        us.save()
+        st = State()
+        st.save()
+        models.storage.delete(st)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertIn("User." + us.id, objs)
+        self.assertEqual("Betty", objs["User." + us.id].first_name)
+        self.assertNotIn("State." + st.id, objs)
+
+    def test_reload_ignores_torn_record(self):
+        us = User()
+        us.save()
+        with open("file.json.log", "a") as f:
+            f.write('{"op": "set", "key": "User.1", "val')
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("User." + us.id, models.storage.all())
+        self.assertNotIn("User.1", models.storage.all())
+        other = User()
+        other.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("User." + us.id, models.storage.all())
+        self.assertIn("User." + other.id, models.storage.all())
+
+    def test_append(self):
+        us = User()
+        us.save()
+        value = {"id": "1", "created_at": "2023-10-10T12:38:12.144669",
+                 "updated_at": "2023-10-10T12:38:12.144669",
+                 "first_name": "Betty", "__class__": "User"}
+        self.assertEqual(1, models.storage.append(iter([value])))
+        self.assertIsNone(models.storage.get(User, "1"))
+        FileStorage.compact_after = 2
+        State().save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual("Betty", models.storage.get(User, "1").first_name)
+        self.assertEqual(3, models.storage.count())
+
+    def test_compact(self):
+        us = User()
+        us.save()
+        models.storage.compact()
+        self.assertFalse(os.path.exists("file.json.log"))
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, f.read())
+
+    def test_journal_compacts_when_full(self):
+        FileStorage.compact_after = 3
+        for _ in range(3):
+            BaseModel().save()
+        self.assertFalse(os.path.exists("file.json.log"))
+        with open("file.json", "r") as f:
+            self.assertEqual(3, len(json.load(f)))
+
+
+class TestFileStorage_dirty(unittest.TestCase):
+    """Unittests for testing dirty tracking in the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        models.storage.save()
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_attribute_write_marks_dirty(self):
+        us = User()
+        models.storage.save()
+        self.assertNotIn("User." + us.id, FileStorage._FileStorage__dirty)
+        us.first_name = "Betty"
+        self.assertIn("User." + us.id, FileStorage._FileStorage__dirty)
+
+    def test_attribute_delete_marks_dirty(self):
+        us = User()
+        us.first_name = "Betty"
+        models.storage.save()
+        del us.first_name
+        self.assertIn("User." + us.id, FileStorage._FileStorage__dirty)
+
+    def test_unstored_instance_not_marked(self):
+        us = User(id="345", first_name="Betty")
+        self.assertNotIn("User.345", FileStorage._FileStorage__dirty)
+
+    def test_save_reencodes_only_dirty(self):
+        us = User()
+        st = State()
+        models.storage.save()
+        us.first_name = "Betty"
+        with patch.object(State, "to_dict") as st_to_dict:
+            models.storage.save()
+            st_to_dict.assert_not_called()
+        with open("file.json", "r") as f:
+            objs = json.load(f)
+        self.assertEqual("Betty", objs["User." + us.id]["first_name"])
+        self.assertIn("State." + st.id, objs)
+
+    def test_save_list_changed_in_place(self):
+        pl = Place()
+        pl.amenity_ids = ["a"]
+        models.storage.save()
+        pl.amenity_ids.append("c")
+        models.storage.save()
+        with open("file.json", "r") as f:
+            objs = json.load(f)
+        self.assertEqual(["a", "c"], objs["Place." + pl.id]["amenity_ids"])
+
+    def test_console_update_marks_dirty(self):
+        from console import HBNBCommand
+        us = User()
+        models.storage.save()
+        with patch("sys.stdout"):
+            HBNBCommand().onecmd("update User {} first_name Betty".format(
+                us.id))
+        with open("file.json", "r") as f:
+            objs = json.load(f)
+        self.assertEqual("Betty", objs["User." + us.id]["first_name"])
+
+
+class TestFileStorage_sharded(unittest.TestCase):
+    """Unittests for testing the sharded layout of the FileStorage class."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage.sharded = True
+
+    def tearDown(self):
+        FileStorage.sharded = False
+        FileStorage.journal = False
+        FileStorage._FileStorage__loaded = None
+        for name in FileStorage.classes:
+            try:
+                os.remove("{}.json".format(name))
+            except IOError:
+                pass
+        try:
+            os.remove("file.json.log")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_environment(self):
+        root = os.path.dirname(os.path.abspath(models.__path__[0]))
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PYTHONPATH=root, HBNB_SHARDED="1")
+            subprocess.run([sys.executable, "-c",
+                            "from models.user import User\n"
+                            "from models.state import State\n"
+                            "User().save()\n"
+                            "State().save()\n"], cwd=directory, env=env,
+                           check=True)
+            self.assertEqual(["State.json", "User.json"],
+                             sorted(os.listdir(directory)))
+            env["HBNB_RELOAD_CLASSES"] = "User"
+            out = subprocess.run([sys.executable, "-c",
+                                  "from models import storage\n"
+                                  "print(storage.count())\n"],
+                                 cwd=directory, env=env, check=True,
+                                 capture_output=True, text=True).stdout
+            self.assertEqual("1\n", out)
+
+    def test_shard_path(self):
+        self.assertEqual("Review.json", models.storage.shard_path("Review"))
+
+    def test_save_writes_one_file_per_class(self):
+        us = User()
+        rv = Review()
+        models.storage.save()
+        with open("User.json", "r") as f:
+            self.assertEqual(["User." + us.id], list(json.load(f)))
+        with open("Review.json", "r") as f:
+            self.assertEqual(["Review." + rv.id], list(json.load(f)))
+
+    def test_save_rewrites_only_dirty_shards(self):
+        User()
+        Review()
+        models.storage.save()
+        os.remove("User.json")
+        Review().save()
+        self.assertFalse(os.path.exists("User.json"))
+        with open("Review.json", "r") as f:
+            self.assertEqual(2, len(json.load(f)))
+
+    def test_delete_rewrites_shard(self):
+        rv = Review()
+        models.storage.save()
+        models.storage.delete(rv)
+        models.storage.save()
+        with open("Review.json", "r") as f:
+            self.assertEqual({}, json.load(f))
+
+    def test_reload_all_shards(self):
+        us = User()
+        rv = Review()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("User." + us.id, models.storage.all())
+        self.assertIn("Review." + rv.id, models.storage.all())
+
+    def test_reload_selected_shards(self):
+        us = User()
+        rv = Review()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload(classes=["User"])
+        self.assertIn("User." + us.id, models.storage.all())
+        self.assertNotIn("Review." + rv.id, models.storage.all())
+
+    def test_compact_keeps_unloaded_shards(self):
+        FileStorage.journal = True
+        User()
+        rv = Review()
+        models.storage.compact()
+        rv.text = "Great"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload(classes=["User"])
+        User()
+        models.storage.compact()
+        with open("Review.json", "r") as f:
+            self.assertIn("Review." + rv.id, json.load(f))
+        with open("User.json", "r") as f:
+            self.assertEqual(2, len(json.load(f)))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual("Great",
+                         models.storage.all()["Review." + rv.id].text)
+
+    def test_save_after_partial_reload(self):
+        users = [User() for _ in range(3)]
+        Review()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload(classes=["Review"])
+        us = User()
+        us.save()
+        with open("User.json", "r") as f:
+            self.assertEqual({"User." + obj.id for obj in users + [us]},
+                             set(json.load(f)))
+
+    def test_compact_after_partial_reload(self):
+        FileStorage.journal = True
+        us = User()
+        models.storage.compact()
+        us.first_name = "Betty"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload(classes=["Review"])
+        User()
+        models.storage.compact()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(2, models.storage.count("User"))
+        self.assertEqual("Betty",
+                         models.storage.all()["User." + us.id].first_name)
+
+
+class TestFileStorage_lazy(unittest.TestCase):
+    """Unittests for testing the lazy mode of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.us = User()
+        self.us.first_name = "Betty"
+        self.st = State()
+        self.cy = City()
+        self.cy.state_id = self.st.id
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage.lazy = True
+        models.storage.reload()
+
+    def tearDown(self):
+        FileStorage.lazy = False
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_reload_builds_nothing(self):
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+
+    def test_count_builds_nothing(self):
+        self.assertEqual(1, models.storage.count(User))
+        self.assertEqual(3, models.storage.count(BaseModel))
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+
+    def test_get_builds_one_object(self):
+        us = models.storage.get(User, self.us.id)
+        self.assertEqual("Betty", us.first_name)
+        self.assertEqual(["User." + self.us.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertIs(us, models.storage.get(User, self.us.id))
+        self.assertEqual(3, models.storage.count())
+
+    def test_all_with_class_builds_class(self):
+        self.assertIn("State." + self.st.id, models.storage.all(State))
+        self.assertEqual(["State." + self.st.id],
+                         list(FileStorage._FileStorage__objects))
+
+    def test_all_builds_everything(self):
+        self.assertEqual(3, len(models.storage.all()))
+
+    def test_related_builds_class(self):
+        self.assertIn("City." + self.cy.id,
+                      models.storage.related(City, "state_id", self.st.id))
+
+    def test_iteration(self):
+        models.storage.get(User, self.us.id)
+        ids = {obj.id for obj in models.storage}
+        self.assertEqual({self.us.id, self.st.id, self.cy.id}, ids)
+
+    def test_values_of_class_builds_as_it_goes(self):
+        values = models.storage.values(State)
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(self.st.id, next(values).id)
+        self.assertEqual(["State." + self.st.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertEqual([], list(values))
+        self.assertEqual(3, len(list(models.storage.values(BaseModel))))
+
+    def test_dicts_builds_nothing(self):
+        self.assertEqual([self.cy.to_dict()],
+                         list(models.storage.dicts(City)))
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+
+    def test_save_keeps_unbuilt_objects(self):
+        models.storage.get(User, self.us.id).last_name = "Holberton"
+        models.storage.save()
+        with open("file.json", "r") as f:
+            objs = json.load(f)
+        self.assertEqual(3, len(objs))
+        self.assertEqual("Holberton", objs["User." + self.us.id]["last_name"])
+        self.assertEqual(self.st.id, objs["City." + self.cy.id]["state_id"])
+
+    def test_delete_unbuilt_object(self):
+        models.storage.delete(models.storage.get(State, self.st.id))
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertNotIn("State." + self.st.id, json.load(f))
+
+
+class TestFileStorage_atomic(unittest.TestCase):
+    """Unittests for testing atomic saves of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        for path in ["file.json"] + self.temporary_files():
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def temporary_files(self):
+        return [name for name in os.listdir(".")
+                if name.startswith("file.json.") and name.endswith(".tmp")]
+
+    def test_save_leaves_no_temporary_file(self):
+        User().save()
+        self.assertTrue(os.path.exists("file.json"))
+        self.assertEqual([], self.temporary_files())
+
+    def test_failed_save_keeps_previous_file(self):
+        us = User()
+        us.save()
+        with open("file.json", "r") as f:
+            before = f.read()
+        State()
+        with patch("os.replace", side_effect=OSError):
+            with self.assertRaises(OSError):
+                models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(before, f.read())
+        self.assertEqual([], self.temporary_files())
+
+    def test_save_syncs_file_and_directory(self):
+        with patch("os.fsync") as fsync:
+            User().save()
+        self.assertEqual(2, fsync.call_count)
+
+    def test_temporary_files_are_unique(self):
+        with patch("os.replace", wraps=os.replace) as replace:
+            User().save()
+            User().save()
+        paths = {call.args[0] for call in replace.call_args_list}
+        self.assertEqual(2, len(paths))
+
+    def test_save_keeps_permissions(self):
+        User().save()
+        os.chmod("file.json", 0o640)
+        User().save()
+        self.assertEqual(0o640, os.stat("file.json").st_mode & 0o777)
+
+
+class TestFileStorage_flusher(unittest.TestCase):
+    """Unittests for testing the background flusher of FileStorage."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage.flush_interval = 0.1
+
+    def tearDown(self):
+        models.storage.flush()
+        FileStorage.flush_interval = 0
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_is_deferred(self):
+        User().save()
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_saves_are_coalesced(self):
+        with patch.object(FileStorage, "_write") as write:
+            for _ in range(5):
+                User().save()
+            models.storage.flush()
+            models.storage.flush()
+        self.assertEqual(1, write.call_count)
+
+    def test_flush(self):
+        us = User()
+        us.save()
+        models.storage.flush()
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, f.read())
+
+    def test_background_write(self):
+        us = User()
+        us.save()
+        sleep(0.3)
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, f.read())
+
+    def test_flush_without_pending_save(self):
+        models.storage.flush()
+        self.assertFalse(os.path.exists("file.json"))
+
+
+class TestFileStorage_batch(unittest.TestCase):
+    """Unittests for testing batches of changes in FileStorage."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.us = User()
+        self.us.first_name = "Betty"
+        self.cy = City()
+        self.cy.state_id = "s1"
+        models.storage.save()
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_saves_are_committed_once(self):
+        with patch.object(FileStorage, "_write") as write:
+            with models.storage.batch():
+                for _ in range(10):
+                    User().save()
+            self.assertEqual(1, write.call_count)
+
+    def test_batch_is_saved(self):
+        with models.storage.batch() as storage:
+            us = User()
+            us.save()
+            self.assertIs(models.storage, storage)
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, f.read())
+
+    def test_nested_batches_commit_once(self):
+        with patch.object(FileStorage, "_write") as write:
+            with models.storage.batch():
+                with models.storage.batch():
+                    User().save()
+                User().save()
+            self.assertEqual(1, write.call_count)
+
+    def test_rollback(self):
+        with open("file.json", "r") as f:
+            before = f.read()
+        with self.assertRaises(RuntimeError):
+            with models.storage.batch():
+                st = State()
+                st.save()
+                self.us.first_name = "Holberton"
+                self.us.last_name = "School"
+                self.cy.state_id = "s2"
+                models.storage.delete(self.cy)
+                models.storage.save()
+                raise RuntimeError
+        with open("file.json", "r") as f:
+            self.assertEqual(before, f.read())
+        self.assertNotIn("State." + st.id, models.storage.all())
+        self.assertIs(self.us, models.storage.get(User, self.us.id))
+        self.assertEqual("Betty", self.us.first_name)
+        self.assertNotIn("last_name", self.us.__dict__)
+        self.assertIs(self.cy, models.storage.get(City, self.cy.id))
+        self.assertEqual("s1", self.cy.state_id)
+        self.assertIn("City." + self.cy.id,
+                      models.storage.related(City, "state_id", "s1"))
+        self.assertEqual({}, models.storage.related(City, "state_id", "s2"))
+        self.assertEqual(set(), FileStorage._FileStorage__dirty)
+
+    def test_rollback_keeps_earlier_changes_dirty(self):
+        self.us.last_name = "School"
+        with self.assertRaises(RuntimeError):
+            with models.storage.batch():
+                self.us.first_name = "Holberton"
+                raise RuntimeError
+        self.assertEqual("School", self.us.last_name)
+        self.assertIn("User." + self.us.id, FileStorage._FileStorage__dirty)
+
+    def test_background_write_waits_for_batch(self):
+        FileStorage.flush_interval = 60
+        try:
+            st = State()
+            st.save()
+            with self.assertRaises(RuntimeError):
+                with models.storage.batch():
+                    us = User()
+                    us.save()
+                    models.storage.flush()
+                    with open("file.json", "r") as f:
+                        self.assertNotIn("State." + st.id, f.read())
+                    raise RuntimeError
+            models.storage.flush()
+            with open("file.json", "r") as f:
+                stored = json.load(f)
+            self.assertIn("State." + st.id, stored)
+            self.assertNotIn("User." + us.id, stored)
+            with models.storage.batch():
+                us = User()
+                us.save()
+                models.storage.flush()
+            models.storage.flush()
+            with open("file.json", "r") as f:
+                self.assertIn("User." + us.id, json.load(f))
+        finally:
+            FileStorage.flush_interval = 0
+
+
+class TestFileStorage_binary(unittest.TestCase):
+    """Unittests for testing the binary file format of FileStorage."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage.file_format = "binary"
+
+    def tearDown(self):
+        FileStorage.file_format = "json"
+        FileStorage.sharded = False
+        FileStorage.lazy = False
+        for path in ["file.bin"] + ["{}.bin".format(name)
+                                    for name in FileStorage.classes]:
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_paths(self):
+        self.assertEqual("file.bin", models.storage.snapshot_path())
+        self.assertEqual("User.bin", models.storage.shard_path("User"))
+
+    def test_save_writes_binary_file(self):
+        us = User()
+        models.storage.save()
+        self.assertFalse([name for name in os.listdir(".")
+                          if name.endswith(".tmp")])
+        with open("file.bin", "rb") as f:
+            self.assertEqual([("User." + us.id, us.to_dict())],
+                             list(binary_format.iter_items(f)))
+
+    def test_reload(self):
+        us = User()
+        us.first_name = "Betty"
+        pl = Place()
+        pl.amenity_ids = ["a", "b"]
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(us.to_dict(),
+                         models.storage.get(User, us.id).to_dict())
+        self.assertEqual(pl.to_dict(),
+                         models.storage.get(Place, pl.id).to_dict())
+
+    def test_lazy_reload(self):
+        us = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage.lazy = True
+        models.storage.reload()
+        self.assertEqual(1, models.storage.count(User))
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage.lazy = False
+        models.storage.reload()
+        self.assertEqual(us.created_at,
+                         models.storage.get(User, us.id).created_at)
+
+    def test_sharded(self):
+        FileStorage.sharded = True
+        us = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertTrue(os.path.exists("User.bin"))
+        self.assertIn("User." + us.id, models.storage.all())
+
+
+class TestFileStorage_read_only(unittest.TestCase):
+    """Unittests for testing the read-only mode of FileStorage."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage.file_format = "binary"
+        self.us = User()
+        self.us.first_name = "Betty"
+        self.rv = Review()
+        self.rv.place_id = "p1"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage.read_only = True
+        models.storage.reload()
+
+    def tearDown(self):
+        FileStorage.read_only = False
+        FileStorage.file_format = "json"
+        FileStorage._FileStorage__objects = {}
+        for path in ("file.bin", "file.bin.idx", "file.json.log"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def test_nothing_built_on_reload(self):
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(2, models.storage.count())
+        self.assertEqual(1, models.storage.count(User))
+        self.assertTrue(os.path.exists("file.bin.idx"))
+
+    def test_get_builds_one_object(self):
+        us = models.storage.get(User, self.us.id)
+        self.assertEqual(self.us.to_dict(), us.to_dict())
+        self.assertIs(us, models.storage.get("User", self.us.id))
+        self.assertEqual(["User." + self.us.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertIsNone(models.storage.get(User, "missing"))
+
+    def test_all_and_related(self):
+        self.assertEqual({"User." + self.us.id, "Review." + self.rv.id},
+                         set(models.storage.all()))
+        self.assertIn("Review." + self.rv.id,
+                      models.storage.related(Review, "place_id", "p1"))
+
+    def test_iterate(self):
+        self.assertEqual({self.us.id, self.rv.id},
+                         {obj.id for obj in models.storage})
+
+    def test_delete_in_memory(self):
+        models.storage.delete(models.storage.get(User, self.us.id))
+        self.assertIsNone(models.storage.get(User, self.us.id))
+        self.assertEqual(1, models.storage.count())
+
+    def test_save_not_supported(self):
+        with self.assertRaises(io.UnsupportedOperation):
+            models.storage.save()
+        with self.assertRaises(io.UnsupportedOperation):
+            models.storage.compact()
+
+    def test_needs_binary_format(self):
+        FileStorage.file_format = "json"
+        with self.assertRaises(ValueError):
+            models.storage.reload()
+
+    def test_journal_replayed(self):
+        FileStorage.read_only = False
+        FileStorage.journal = True
+        try:
+            us = models.storage.get(User, self.us.id)
+            us.first_name = "Holberton"
+            models.storage.save()
+        finally:
+            FileStorage.journal = False
+        FileStorage._FileStorage__objects = {}
+        FileStorage.read_only = True
+        models.storage.reload()
+        self.assertEqual("Holberton",
+                         models.storage.get(User, self.us.id).first_name)
+        self.assertEqual(2, models.storage.count())
+
+
+class TestFileStorage_compact_objects(unittest.TestCase):
+    """Unittests for testing FileStorage with compact objects."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.us = User()
+        self.us.first_name = "Betty"
+        self.cy = City()
+        self.cy.state_id = "s1"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage.compact_objects = True
+        models.storage.reload()
+
+    def tearDown(self):
+        FileStorage.compact_objects = False
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_reload_builds_compact_objects(self):
+        us = models.storage.get(User, self.us.id)
+        self.assertIsNot(User, type(us))
+        self.assertIsInstance(us, User)
+        self.assertEqual(self.us.to_dict(), us.to_dict())
+        self.assertEqual(str(self.us), str(us))
+        self.assertIn("User." + us.id, models.storage.all(User))
+
+    def test_new_objects_are_compact(self):
+        from console import HBNBCommand
+        pl = Place()
+        self.assertIsNot(Place, type(pl))
+        self.assertIsInstance(pl, Place)
+        self.assertIn("Place." + pl.id, models.storage.all(Place))
+        st = State(id="1", name="Texas")
+        self.assertIsNot(State, type(st))
+        self.assertEqual("Texas", st.name)
+        with patch("sys.stdout", new=io.StringIO()) as output:
+            HBNBCommand().onecmd("create Amenity")
+        am = models.storage.get(Amenity, output.getvalue().strip())
+        self.assertIsNot(Amenity, type(am))
+
+    def test_from_dict_builds_model_class(self):
+        self.assertEqual(User, type(User.from_dict(self.us.to_dict())))
+
+    def test_update_and_save(self):
+        cy = models.storage.get(City, self.cy.id)
+        cy.state_id = "s2"
+        cy.nickname = "Town"
+        cy.save()
+        self.assertEqual({}, models.storage.related(City, "state_id", "s1"))
+        FileStorage._FileStorage__objects = {}
+        FileStorage.compact_objects = False
+        models.storage.reload()
+        cy = models.storage.get(City, self.cy.id)
+        self.assertEqual(City, type(cy))
+        self.assertEqual("s2", cy.state_id)
+        self.assertEqual("Town", cy.nickname)
+
+    def test_rollback(self):
+        us = models.storage.get(User, self.us.id)
+        with self.assertRaises(RuntimeError):
+            with models.storage.batch():
+                us.first_name = "Holberton"
+                us.last_name = "School"
+                raise RuntimeError
+        self.assertEqual("Betty", us.first_name)
+        self.assertNotIn("last_name", us.to_dict())
+
+
 if __name__ == "__main__":
     unittest.main()
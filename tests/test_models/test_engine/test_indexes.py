@@ -0,0 +1,515 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/indexes.py.
+
+Unittest classes:
+    TestIndex
+    TestForeignKeyIndex
+    TestBitsetIndex
+    TestSortedIndex
+    TestColumnIndex
+    TestGridIndex
+    TestTextIndex
+"""
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from models.city import City
+from models.engine import indexes
+from models.engine.indexes import Index, ColumnIndex, ForeignKeyIndex
+from models.engine.indexes import BitsetIndex, GridIndex, TextIndex
+from models.engine.indexes import SortedIndex, tokenize
+from models.place import Place
+from models.review import Review
+
+
+class Keys(Index):
+    """An index of the keys of the objects"""
+
+    def __init__(self, class_name, attrs):
+        super().__init__(class_name, attrs)
+        self.keys = set()
+
+    def add(self, key, obj):
+        self.keys.add(key)
+
+    def discard(self, key):
+        self.keys.discard(key)
+
+    def clear(self):
+        self.keys.clear()
+
+
+class TestIndex(unittest.TestCase):
+    """Unittests for testing the Index base class."""
+
+    def test_attributes(self):
+        index = Keys("City", ["state_id"])
+        self.assertEqual("City", index.class_name)
+        self.assertEqual(("state_id",), index.attrs)
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            Index("City", [])
+
+        class NoClear(Index):
+            def add(self, key, obj):
+                pass
+
+            def discard(self, key):
+                pass
+
+        with self.assertRaises(TypeError):
+            NoClear("City", [])
+
+
+class TestForeignKeyIndex(unittest.TestCase):
+    """Unittests for testing the ForeignKeyIndex class."""
+
+    def setUp(self):
+        self.index = ForeignKeyIndex("City", "state_id")
+        self.cy = City()
+        self.cy.state_id = "1"
+
+    def test_add_and_lookup(self):
+        self.index.add("City.a", self.cy)
+        self.assertEqual({"City.a": self.cy}, self.index.lookup("1"))
+        self.assertEqual({}, self.index.lookup("2"))
+
+    def test_empty_value_not_indexed(self):
+        self.index.add("City.b", City())
+        self.assertEqual({}, self.index.lookup(""))
+
+    def test_discard(self):
+        self.index.add("City.a", self.cy)
+        self.index.discard("City.a")
+        self.assertEqual({}, self.index.lookup("1"))
+        self.index.discard("City.a")
+
+    def test_lookup_returns_copy(self):
+        self.index.add("City.a", self.cy)
+        self.index.lookup("1").clear()
+        self.assertEqual({"City.a": self.cy}, self.index.lookup("1"))
+
+    def test_clear(self):
+        self.index.add("City.a", self.cy)
+        self.index.clear()
+        self.assertEqual({}, self.index.lookup("1"))
+
+
+class TestBitsetIndex(unittest.TestCase):
+    """Unittests for testing the BitsetIndex class."""
+
+    def setUp(self):
+        self.index = BitsetIndex("Place", "amenity_ids")
+        self.places = {}
+        for i, amenities in enumerate([["wifi", "tv"], ["wifi"],
+                                       ["wifi", "tv", "pets"], []]):
+            pl = Place()
+            pl.amenity_ids = amenities
+            self.places["Place.{}".format(i)] = pl
+            self.index.add("Place.{}".format(i), pl)
+
+    def test_attributes(self):
+        self.assertEqual("amenity_ids", self.index.attr)
+        self.assertEqual(("amenity_ids",), self.index.attrs)
+
+    def test_lookup(self):
+        self.assertEqual(["Place.0", "Place.1", "Place.2"],
+                         self.index.lookup(["wifi"]))
+        self.assertEqual(["Place.0", "Place.2"],
+                         self.index.lookup(["wifi", "tv"]))
+        self.assertEqual(["Place.2"],
+                         self.index.lookup(["tv", "pets", "wifi"]))
+        self.assertEqual([], self.index.lookup(["wifi", "pool"]))
+
+    def test_lookup_no_values(self):
+        self.assertEqual(sorted(self.places), sorted(self.index.lookup([])))
+
+    def test_lookup_among(self):
+        self.assertEqual(["Place.2"], self.index.lookup(
+            ["tv"], among={"Place.1", "Place.2", "Place.9"}))
+        self.assertEqual(["Place.3"], self.index.lookup([], ["Place.3"]))
+
+    def test_count(self):
+        self.assertEqual(3, self.index.count("wifi"))
+        self.assertEqual(0, self.index.count("pool"))
+
+    def test_update(self):
+        self.places["Place.1"].amenity_ids = ["tv", "pool"]
+        self.index.add("Place.1", self.places["Place.1"])
+        self.assertEqual(["Place.0", "Place.2"], self.index.lookup(["wifi",
+                                                                    "tv"]))
+        self.assertEqual(["Place.1"], self.index.lookup(["pool"]))
+
+    def test_discard_reuses_row(self):
+        self.index.discard("Place.0")
+        self.index.discard("Place.0")
+        self.assertEqual(["Place.2"], self.index.lookup(["tv"]))
+        pl = Place()
+        pl.amenity_ids = ["tv"]
+        self.index.add("Place.4", pl)
+        self.assertEqual(["Place.4", "Place.2"], self.index.lookup(["tv"]))
+
+    def test_invalid_values(self):
+        self.places["Place.3"].amenity_ids = "wifi"
+        self.index.add("Place.3", self.places["Place.3"])
+        self.assertEqual(3, self.index.count("wifi"))
+        self.assertIn("Place.3", self.index.lookup([]))
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertEqual([], self.index.lookup(["wifi"]))
+        self.assertEqual([], self.index.lookup([]))
+
+    def test_chunks(self):
+        with patch.object(BitsetIndex, "CHUNK", 2):
+            index = BitsetIndex("Place", "amenity_ids")
+            for key, pl in self.places.items():
+                index.add(key, pl)
+            self.assertEqual(["Place.0", "Place.2"],
+                             index.lookup(["wifi", "tv"]))
+            self.assertEqual(3, index.count("wifi"))
+            index.discard("Place.0")
+            index.discard("Place.1")
+            self.assertEqual(["Place.2"], index.lookup(["wifi"]))
+            index.discard("Place.2")
+            self.assertEqual([], index.lookup(["wifi"]))
+            self.assertEqual(0, index.count("wifi"))
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Unittests for testing the SortedIndex class."""
+
+    def setUp(self):
+        self.index = SortedIndex("Place", "updated_at")
+        self.start = datetime(2023, 10, 10)
+        self.places = {}
+        for i, days in enumerate([3, 0, 2, 2, 5]):
+            pl = Place()
+            pl.updated_at = self.start + timedelta(days=days)
+            self.places["Place.{}".format(i)] = pl
+            self.index.add("Place.{}".format(i), pl)
+
+    def day(self, days):
+        return self.start + timedelta(days=days)
+
+    def test_attributes(self):
+        self.assertEqual("updated_at", self.index.attr)
+        self.assertEqual(("updated_at",), self.index.attrs)
+
+    def test_range(self):
+        self.assertEqual(["Place.1", "Place.2", "Place.3", "Place.0",
+                          "Place.4"], self.index.range())
+        self.assertEqual(["Place.2", "Place.3", "Place.0"],
+                         self.index.range(self.day(2), self.day(5)))
+        self.assertEqual(["Place.0", "Place.4"],
+                         self.index.range(low=self.day(2) +
+                                          timedelta(hours=1)))
+        self.assertEqual([], self.index.range(self.day(6)))
+
+    def test_limit_and_reverse(self):
+        self.assertEqual(["Place.1", "Place.2"], self.index.range(limit=2))
+        self.assertEqual(["Place.4", "Place.0"],
+                         self.index.range(limit=2, reverse=True))
+        self.assertEqual(["Place.3", "Place.2"], self.index.range(
+            high=self.day(3), limit=2, reverse=True))
+
+    def test_keyset_pagination(self):
+        pages = []
+        after = None
+        while True:
+            page = self.index.range(after=after, limit=2)
+            if not page:
+                break
+            pages.append(page)
+            after = (self.places[page[-1]].updated_at, page[-1])
+        self.assertEqual([["Place.1", "Place.2"], ["Place.3", "Place.0"],
+                          ["Place.4"]], pages)
+        self.assertEqual(["Place.2", "Place.1"], self.index.range(
+            after=(self.day(2), "Place.3"), reverse=True))
+
+    def test_update_and_discard(self):
+        self.index.range()
+        self.places["Place.1"].updated_at = self.day(9)
+        self.index.add("Place.1", self.places["Place.1"])
+        self.index.discard("Place.0")
+        self.index.discard("Place.0")
+        self.assertEqual(["Place.2", "Place.3", "Place.4", "Place.1"],
+                         self.index.range())
+        self.places["Place.2"].updated_at = self.day(1)
+        self.index.add("Place.2", self.places["Place.2"])
+        self.index.discard("Place.2")
+        self.assertEqual(["Place.3", "Place.4", "Place.1"],
+                         self.index.range())
+
+    def test_not_datetime_not_indexed(self):
+        self.places["Place.0"].updated_at = "yesterday"
+        self.index.add("Place.0", self.places["Place.0"])
+        self.assertNotIn("Place.0", self.index.range())
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertEqual([], self.index.range())
+
+
+class TestColumnIndex(unittest.TestCase):
+    """Unittests for testing the ColumnIndex class."""
+
+    def setUp(self):
+        self.index = ColumnIndex("Place", ["price_by_night", "max_guest"])
+        self.places = {}
+        for i, (price, guests) in enumerate([(50, 2), (80, 4), (120, 6),
+                                             (80, 8)]):
+            pl = Place()
+            pl.price_by_night = price
+            pl.max_guest = guests
+            self.places["Place.{}".format(i)] = pl
+            self.index.add("Place.{}".format(i), pl)
+
+    def filter(self, **bounds):
+        keys = self.index.filter(bounds)
+        with patch.object(indexes, "numpy", None):
+            self.assertEqual(keys, self.index.filter(bounds))
+        return sorted(keys)
+
+    def test_range(self):
+        self.assertEqual(["Place.1", "Place.2", "Place.3"],
+                         self.filter(price_by_night=(60, 120)))
+
+    def test_open_range(self):
+        self.assertEqual(["Place.2", "Place.3"],
+                         self.filter(max_guest=(5, None)))
+        self.assertEqual(["Place.0"], self.filter(max_guest=(None, 3)))
+
+    def test_equality(self):
+        self.assertEqual(["Place.1", "Place.3"],
+                         self.filter(price_by_night=80))
+
+    def test_conjunction(self):
+        self.assertEqual(["Place.3"],
+                         self.filter(price_by_night=80, max_guest=(5, 10)))
+
+    def test_no_bounds(self):
+        self.assertEqual(sorted(self.places), self.filter())
+
+    def test_unknown_column(self):
+        with self.assertRaises(KeyError):
+            self.index.filter({"latitude": (0, 1)})
+
+    def test_update(self):
+        self.places["Place.0"].price_by_night = 100
+        self.index.add("Place.0", self.places["Place.0"])
+        self.assertEqual(["Place.0"], self.filter(price_by_night=100))
+
+    def test_numeric_strings_and_invalid_values(self):
+        self.places["Place.0"].price_by_night = "90"
+        self.index.add("Place.0", self.places["Place.0"])
+        self.places["Place.1"].price_by_night = "cheap"
+        self.index.add("Place.1", self.places["Place.1"])
+        self.assertEqual(["Place.0"], self.filter(price_by_night=(85, 95)))
+        self.assertEqual(["Place.0", "Place.2", "Place.3"],
+                         self.filter(price_by_night=(None, None)))
+
+    def test_discard_moves_last_row(self):
+        self.index.discard("Place.1")
+        self.index.discard("Place.1")
+        self.assertEqual(["Place.3"], self.filter(price_by_night=80))
+        self.index.discard("Place.3")
+        self.assertEqual([], self.filter(price_by_night=80))
+        self.assertEqual(["Place.0", "Place.2"], self.filter())
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertEqual([], self.filter())
+
+    def test_changes_after_sorting(self):
+        index = ColumnIndex("Place", ["price_by_night", "max_guest"])
+        places = {}
+        for i in range(40):
+            pl = Place()
+            pl.price_by_night = i * 10
+            pl.max_guest = i % 5
+            places["Place.{}".format(i)] = pl
+            index.add("Place.{}".format(i), pl)
+        bounds = {"price_by_night": (95, 205), "max_guest": (2, None)}
+
+        def expected():
+            return [key for key, pl in places.items()
+                    if 95 <= pl.price_by_night <= 205 and
+                    isinstance(pl.max_guest, int) and pl.max_guest >= 2]
+
+        with patch.object(indexes, "numpy", None):
+            self.assertEqual(expected(), index.filter(bounds))
+            places["Place.5"].price_by_night = 150
+            index.add("Place.5", places["Place.5"])
+            places["Place.12"].max_guest = "none"
+            index.add("Place.12", places["Place.12"])
+            for key in ("Place.13", "Place.0", "Place.39"):
+                index.discard(key)
+                del places[key]
+            self.assertEqual(sorted(expected()),
+                             sorted(index.filter(bounds)))
+            places["Place.13"] = Place()
+            places["Place.13"].price_by_night = 101
+            places["Place.13"].max_guest = 3
+            index.add("Place.13", places["Place.13"])
+            index.discard("Place.5")
+            del places["Place.5"]
+            self.assertEqual(sorted(expected()),
+                             sorted(index.filter(bounds)))
+            self.assertEqual(["Place.13"],
+                             index.filter({"price_by_night": 101}))
+            self.assertEqual(sorted(places), sorted(index.filter(
+                {"price_by_night": (None, None)})))
+
+
+class TestGridIndex(unittest.TestCase):
+    """Unittests for testing the GridIndex class."""
+
+    def setUp(self):
+        self.index = GridIndex("Place", "latitude", "longitude", 1)
+        self.places = {}
+        for name, lat, lon in [("paris", 48.8566, 2.3522),
+                               ("london", 51.5074, -0.1278),
+                               ("brussels", 50.8503, 4.3517),
+                               ("suva", -18.1248, 178.4501),
+                               ("apia", -13.8507, -171.7514),
+                               ("pole", 89.99, 10)]:
+            pl = Place()
+            pl.latitude = lat
+            pl.longitude = lon
+            self.places[name] = pl
+            self.index.add(name, pl)
+
+    def test_attributes(self):
+        self.assertEqual(("latitude", "longitude"), self.index.attrs)
+        self.assertEqual(1, self.index.cell_size)
+
+    def test_distance(self):
+        self.assertAlmostEqual(343.5, GridIndex.distance(
+            (48.8566, 2.3522), (51.5074, -0.1278)), delta=1)
+
+    def test_within(self):
+        self.assertEqual(["brussels", "london", "paris"],
+                         sorted(self.index.within(45, -5, 55, 5)))
+        self.assertEqual(["paris"], self.index.within(48, 0, 49, 3))
+        self.assertEqual([], self.index.within(0, 0, 1, 1))
+
+    def test_within_antimeridian(self):
+        self.assertEqual(["apia", "suva"],
+                         sorted(self.index.within(-20, 170, -10, -170)))
+
+    def test_near(self):
+        self.assertEqual(["paris", "brussels"], [
+            key for distance, key in self.index.near(48.86, 2.35, 300)])
+        distance, key = self.index.near(48.86, 2.35, 300)[0]
+        self.assertLess(distance, 1)
+        self.assertEqual([], self.index.near(0, 0, 100))
+
+    def test_near_antimeridian_and_pole(self):
+        self.assertEqual(["suva", "apia"], [
+            key for distance, key in self.index.near(-18, 179.9, 1500)])
+        self.assertEqual(["pole"], [
+            key for distance, key in self.index.near(89.9, -170, 50)])
+
+    def test_nearest(self):
+        self.assertEqual(["london", "paris"], [
+            key for distance, key in self.index.nearest(51, -1, 2)])
+        self.assertEqual(["apia"], [
+            key for distance, key in self.index.nearest(-14, -172)])
+        self.assertEqual(6, len(self.index.nearest(0, 0, 10)))
+        self.assertEqual([], self.index.nearest(0, 0, 0))
+
+    def test_update_and_discard(self):
+        self.places["paris"].latitude = 0
+        self.places["paris"].longitude = 0
+        self.index.add("paris", self.places["paris"])
+        self.assertEqual(["paris"], self.index.within(-1, -1, 1, 1))
+        self.index.discard("paris")
+        self.index.discard("paris")
+        self.assertEqual([], self.index.within(-1, -1, 1, 1))
+
+    def test_invalid_locations(self):
+        self.places["paris"].latitude = "north"
+        self.index.add("paris", self.places["paris"])
+        self.places["london"].latitude = 95
+        self.index.add("london", self.places["london"])
+        self.assertEqual(4, len(self.index.nearest(0, 0, 10)))
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertEqual([], self.index.within(-90, -180, 90, 180))
+        self.assertEqual([], self.index.nearest(0, 0))
+
+
+class TestTextIndex(unittest.TestCase):
+    """Unittests for testing the TextIndex class."""
+
+    def setUp(self):
+        self.index = TextIndex("Place", ["name", "description"])
+        self.places = {}
+        for i, (name, description) in enumerate([
+                ("Cosy loft", "A quiet loft near the park"),
+                ("Beach house", "Wake up to the sea. Quiet, quiet, quiet!"),
+                ("City studio", "Close to bars, not quiet at all, but "
+                 "right in the middle of everything the city offers"),
+                ("Loft", 42)]):
+            pl = Place()
+            pl.name = name
+            pl.description = description
+            self.places["Place.{}".format(i)] = pl
+            self.index.add("Place.{}".format(i), pl)
+
+    def keys(self, query, limit=10):
+        return [key for score, key in self.index.search(query, limit)]
+
+    def test_tokenize(self):
+        self.assertEqual(["wake", "up", "to", "the", "sea", "café"],
+                         tokenize("Wake up, to the SEA! Café"))
+
+    def test_search_ranks(self):
+        self.assertEqual(["Place.1", "Place.0", "Place.2"],
+                         self.keys("quiet"))
+        scores = [score for score, key in self.index.search("quiet")]
+        self.assertEqual(sorted(scores, reverse=True), scores)
+
+    def test_search_any_word(self):
+        self.assertEqual(["Place.0", "Place.3"],
+                         sorted(self.keys("LOFT")))
+        self.assertEqual(["Place.0", "Place.1"],
+                         sorted(self.keys("park sea")))
+        self.assertEqual([], self.keys("pool"))
+        self.assertEqual([], self.keys(""))
+
+    def test_rare_words_score_higher(self):
+        self.assertEqual("Place.0", self.keys("quiet park")[0])
+
+    def test_limit(self):
+        self.assertEqual(["Place.1"], self.keys("quiet", 1))
+        self.assertEqual([], self.keys("quiet", 0))
+
+    def test_update(self):
+        self.places["Place.0"].description = "By the sea"
+        self.index.add("Place.0", self.places["Place.0"])
+        self.assertEqual(["Place.0", "Place.1"], sorted(self.keys("sea")))
+        self.assertEqual([], self.keys("park"))
+
+    def test_discard(self):
+        self.index.discard("Place.1")
+        self.index.discard("Place.1")
+        self.assertEqual(["Place.0", "Place.2"], sorted(self.keys("quiet")))
+
+    def test_non_text_not_indexed(self):
+        rv = Review()
+        rv.text = None
+        index = TextIndex("Review", ["text"])
+        index.add("Review.1", rv)
+        self.assertEqual([], index.search("none"))
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertEqual([], self.keys("quiet"))
+
+
+if __name__ == "__main__":
+    unittest.main()
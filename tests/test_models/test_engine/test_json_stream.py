@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/json_stream.py.
+
+Unittest classes:
+    TestJsonStream_iter_items
+"""
+import json
+import unittest
+from io import StringIO
+from models.engine.json_stream import iter_items
+
+
+class TestJsonStream_iter_items(unittest.TestCase):
+    """Unittests for testing the iter_items function."""
+
+    def items(self, text, chunk_size=3):
+        return list(iter_items(StringIO(text), chunk_size))
+
+    def test_empty_file(self):
+        self.assertEqual([], self.items(""))
+        self.assertEqual([], self.items("  \n"))
+
+    def test_empty_object(self):
+        self.assertEqual([], self.items("{}"))
+        self.assertEqual([], self.items(" { \n } "))
+
+    def test_entries_in_order(self):
+        objdict = {"User.1": {"id": "1", "name": "a\\\"}"},
+                   "City.2": {"id": "2", "n": [1, 2.5, None, True]},
+                   "Place.3": {"id": "3", "nested": {"x": {}}}}
+        for chunk_size in (1, 2, 7, 65536):
+            self.assertEqual(list(objdict.items()),
+                             self.items(json.dumps(objdict), chunk_size))
+
+    def test_number_across_chunks(self):
+        self.assertEqual([("a", 12345)], self.items('{"a": 12345}', 8))
+
+    def test_yields_one_entry_at_a_time(self):
+        entries = iter_items(StringIO('{"a": {}, "b": oops}'), 4)
+        self.assertEqual(("a", {}), next(entries))
+        with self.assertRaises(ValueError):
+            next(entries)
+
+    def test_not_an_object(self):
+        with self.assertRaises(ValueError):
+            self.items("[1, 2]")
+
+    def test_truncated(self):
+        with self.assertRaises(ValueError):
+            self.items('{"a": {"id": "1"}, "b": {"id"')
+        with self.assertRaises(ValueError):
+            self.items('{"a": {"id": "1"}')
+
+    def test_non_string_key(self):
+        with self.assertRaises(ValueError):
+            self.items('{1: {}}')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/mapped_store.py.
+
+Unittest classes:
+    TestMappedStore_index
+    TestMappedStore_bucket
+"""
+import os
+import time
+import unittest
+import uuid
+from models.engine import binary_format
+from models.engine.mapped_store import MappedStore
+
+
+def write_store(values):
+    with open("test.bin", "wb") as f:
+        binary_format.dump(values, f)
+
+
+def review(obj_id, text="Great"):
+    return {"id": obj_id, "created_at": "2023-10-10T12:38:12.144669",
+            "updated_at": "2023-10-10T12:38:12.144682", "text": text,
+            "__class__": "Review"}
+
+
+class TestMappedStore_index(unittest.TestCase):
+    """Unittests for testing the offset index of MappedStore."""
+
+    def tearDown(self):
+        for path in ("test.bin", "test.bin.idx"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def test_index_written_beside_file(self):
+        write_store([review(str(uuid.uuid4()))])
+        store = MappedStore("test.bin")
+        self.assertEqual("test.bin.idx", store.index_path)
+        self.assertTrue(os.path.exists("test.bin.idx"))
+        store.close()
+
+    def test_index_reused(self):
+        write_store([review(str(uuid.uuid4()))])
+        MappedStore("test.bin").close()
+        mtime = os.stat("test.bin.idx").st_mtime_ns
+        MappedStore("test.bin").close()
+        self.assertEqual(mtime, os.stat("test.bin.idx").st_mtime_ns)
+
+    def test_stale_index_rebuilt(self):
+        first = str(uuid.uuid4())
+        write_store([review(first)])
+        MappedStore("test.bin").close()
+        time.sleep(0.01)
+        second = str(uuid.uuid4())
+        write_store([review(first), review(second)])
+        store = MappedStore("test.bin")
+        self.assertIn("Review." + second, store.bucket("Review"))
+        store.close()
+
+    def test_class_names(self):
+        write_store([review("1"), {"id": "2", "__class__": "User"}])
+        store = MappedStore("test.bin")
+        self.assertEqual({"Review", "User"}, set(store.class_names()))
+        self.assertEqual(0, len(store.bucket("City")))
+        store.close()
+
+    def test_empty_file(self):
+        open("test.bin", "wb").close()
+        store = MappedStore("test.bin")
+        self.assertEqual([], store.class_names())
+        store.close()
+
+
+class TestMappedStore_bucket(unittest.TestCase):
+    """Unittests for testing the MappedBucket class."""
+
+    def setUp(self):
+        self.ids = [str(uuid.uuid4()) for i in range(20)] + ["plain", "7"]
+        write_store([review(obj_id, str(i))
+                     for i, obj_id in enumerate(self.ids)])
+        self.store = MappedStore("test.bin")
+        self.bucket = self.store.bucket("Review")
+
+    def tearDown(self):
+        self.store.close()
+        for path in ("test.bin", "test.bin.idx"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def test_len_and_keys(self):
+        self.assertEqual(22, len(self.bucket))
+        self.assertEqual({"Review." + obj_id for obj_id in self.ids},
+                         set(self.bucket))
+
+    def test_get(self):
+        for i, obj_id in enumerate(self.ids):
+            self.assertEqual(review(obj_id, str(i)),
+                             self.bucket.get("Review." + obj_id))
+        self.assertIsNone(self.bucket.get("Review.missing"))
+        self.assertIsNone(self.bucket.get("User." + self.ids[0]))
+        self.assertNotIn("Review." + str(uuid.uuid4()), self.bucket)
+
+    def test_pop_hides_key(self):
+        key = "Review." + self.ids[3]
+        self.assertEqual(review(self.ids[3], "3"), self.bucket.pop(key))
+        self.assertNotIn(key, self.bucket)
+        self.assertEqual(21, len(self.bucket))
+        self.assertNotIn(key, list(self.bucket))
+        self.assertIsNone(self.bucket.pop(key))
+
+    def test_set_shows_popped_key(self):
+        key = "Review.plain"
+        value = self.bucket.pop(key)
+        self.bucket[key] = value
+        self.assertIn(key, self.bucket)
+        with self.assertRaises(KeyError):
+            self.bucket["Review.other"] = value
+
+    def test_pop_while_iterating(self):
+        popped = []
+        while self.bucket:
+            key = next(iter(self.bucket))
+            popped.append(key)
+            self.bucket.pop(key)
+        self.assertEqual(22, len(set(popped)))
+
+    def test_values_and_clear(self):
+        self.assertEqual(22, len(self.bucket.values()))
+        self.bucket.clear()
+        self.assertEqual(0, len(self.bucket))
+        self.assertEqual([], self.bucket.items())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/query.py.
+
+Unittest classes:
+    TestQuery_filter
+    TestQuery_order
+    TestQuery_plan
+"""
+import unittest
+from datetime import datetime
+from models import storage
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
+from models.engine.query import Query
+from models.place import Place
+from models.user import User
+
+
+def make_places():
+    FileStorage._FileStorage__objects = {}
+    places = []
+    for i, (city, price, name) in enumerate([("c1", 50, "Cosy loft"),
+                                             ("c2", 120, "Beach house"),
+                                             ("c1", 80, "City studio"),
+                                             ("c3", 80, "Cabin")]):
+        pl = Place()
+        pl.city_id = city
+        pl.price_by_night = price
+        pl.name = name
+        pl.amenity_ids = ["wifi"] if i % 2 else ["wifi", "tv"]
+        pl.created_at = datetime(2023, 10, 10 + i)
+        places.append(pl)
+    return places
+
+
+class TestQuery_filter(unittest.TestCase):
+    """Unittests for testing the predicates of Query."""
+
+    def setUp(self):
+        self.places = make_places()
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def names(self, **predicates):
+        return sorted(pl.name for pl in Query(storage, Place).filter(
+            **predicates))
+
+    def test_no_predicates(self):
+        self.assertEqual(4, Query(storage, "Place").count())
+
+    def test_eq(self):
+        self.assertEqual(["City studio", "Cosy loft"],
+                         self.names(city_id="c1"))
+        self.assertEqual(["Cabin", "City studio"],
+                         self.names(price_by_night__eq=80))
+
+    def test_in(self):
+        self.assertEqual(["Beach house", "Cabin"],
+                         self.names(city_id__in=["c2", "c3"]))
+
+    def test_comparisons(self):
+        self.assertEqual(["Beach house"], self.names(price_by_night__gt=80))
+        self.assertEqual(["Beach house", "Cabin", "City studio"],
+                         self.names(price_by_night__gte=80))
+        self.assertEqual(["Cosy loft"], self.names(price_by_night__lt=80))
+        self.assertEqual(["Cabin", "City studio", "Cosy loft"],
+                         self.names(price_by_night__lte=80))
+
+    def test_range(self):
+        self.assertEqual(["Cabin", "City studio", "Cosy loft"],
+                         self.names(price_by_night__range=(50, 100)))
+        self.assertEqual(["Beach house"],
+                         self.names(price_by_night__range=(100, None)))
+
+    def test_prefix(self):
+        self.assertEqual(["Cabin", "City studio", "Cosy loft"],
+                         self.names(name__prefix="C"))
+        self.assertEqual(["Cosy loft"], self.names(name__prefix="Co"))
+
+    def test_contains(self):
+        self.assertEqual(["City studio", "Cosy loft"],
+                         self.names(amenity_ids__contains="tv"))
+
+    def test_contains_other_values(self):
+        self.places[0].amenity_ids = ["wifi", ["tv"]]
+        self.assertEqual(["Cosy loft"], self.names(
+            amenity_ids__contains=["tv"]))
+
+    def test_conjunction(self):
+        self.assertEqual(["Cosy loft"],
+                         self.names(city_id="c1", price_by_night__lt=60))
+        self.assertEqual([], self.names(city_id="c1", name="Cabin"))
+
+    def test_numeric_strings_and_datetimes(self):
+        self.places[0].price_by_night = "60"
+        self.assertEqual(["Cosy loft"], self.names(price_by_night__lt=70))
+        self.assertEqual(["Cabin"], self.names(
+            created_at__gte="2023-10-13T00:00:00"))
+        self.assertEqual(["Beach house"], self.names(
+            created_at=datetime(2023, 10, 11)))
+
+    def test_missing_attribute(self):
+        self.assertEqual([], self.names(rating__gt=3))
+
+    def test_unknown_operator(self):
+        with self.assertRaises(ValueError):
+            Query(storage, Place).filter(name__like="C%")
+
+    def test_invalid_values(self):
+        for predicate in [{"price_by_night__range": 5},
+                          {"price_by_night__range": (1, 2, 3)},
+                          {"city_id__in": 5}, {"city_id__in": "c1"},
+                          {"name__prefix": 5}]:
+            with self.assertRaises(ValueError):
+                Query(storage, Place).filter(**predicate)
+
+    def test_unknown_class(self):
+        with self.assertRaises(KeyError):
+            Query(storage, "MyModel")
+
+    def test_all(self):
+        self.assertEqual({"Place." + self.places[1].id: self.places[1]},
+                         Query(storage, Place).filter(city_id="c2").all())
+
+
+class TestQuery_order(unittest.TestCase):
+    """Unittests for testing the ordering, offset and limit of Query."""
+
+    def setUp(self):
+        self.places = make_places()
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def names(self, query):
+        return [pl.name for pl in query]
+
+    def test_order_by(self):
+        self.assertEqual(["Beach house", "Cabin", "City studio",
+                          "Cosy loft"],
+                         self.names(Query(storage, Place).order_by("name")))
+        prices = [pl.price_by_night for pl in Query(storage, Place).order_by(
+            "price_by_night")]
+        self.assertEqual([50, 80, 80, 120], prices)
+
+    def test_order_by_descending(self):
+        self.assertEqual(["Cosy loft", "City studio", "Cabin",
+                          "Beach house"],
+                         self.names(Query(storage, Place).order_by("-name")))
+
+    def test_order_by_index(self):
+        self.assertEqual(["Cabin", "City studio", "Beach house",
+                          "Cosy loft"],
+                         self.names(Query(storage, Place).order_by(
+                             "-created_at")))
+
+    def test_offset_and_limit(self):
+        query = Query(storage, Place).order_by("name").offset(1).limit(2)
+        self.assertEqual(["Cabin", "City studio"], self.names(query))
+        self.assertEqual(2, query.count())
+        self.assertEqual(["Cosy loft"], self.names(
+            Query(storage, Place).order_by("created_at").filter(
+                city_id__in=["c1", "c2"]).limit(1)))
+        self.assertEqual(["Beach house", "City studio"], self.names(
+            Query(storage, Place).order_by("created_at").offset(1).limit(2)))
+        self.assertEqual(["City studio"], self.names(
+            Query(storage, Place).order_by("created_at").filter(
+                name__prefix="C").offset(1).limit(1)))
+
+    def test_mixed_types(self):
+        self.places[1].price_by_night = "100"
+        self.places[2].price_by_night = "cheap"
+        self.places[3].price_by_night = datetime(2023, 10, 10)
+        self.assertEqual(["Cosy loft", "Beach house", "Cabin",
+                          "City studio"],
+                         self.names(Query(storage, Place).order_by(
+                             "price_by_night")))
+
+    def test_missing_values_last(self):
+        self.places[0].name = None
+        self.assertIs(self.places[0], list(Query(storage, Place).order_by(
+            "name"))[-1])
+
+
+class TestQuery_plan(unittest.TestCase):
+    """Unittests for testing the plans chosen by Query."""
+
+    def setUp(self):
+        self.places = make_places()
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def plan(self, query):
+        return query.explain().splitlines()[0]
+
+    def test_foreign_key_index(self):
+        query = storage.query(Place).filter(price_by_night=80, city_id="c1")
+        self.assertEqual("Place: foreign key index on city_id",
+                         self.plan(query))
+        self.assertEqual(1, query.count())
+        self.assertEqual("Place: foreign key index on city_id", self.plan(
+            storage.query(Place).filter(city_id__in=["c1", "c2"])))
+
+    def test_list_index(self):
+        self.assertEqual("Place: list index on amenity_ids", self.plan(
+            storage.query(Place).filter(amenity_ids__contains="tv")))
+
+    def test_numeric_column_index(self):
+        self.assertEqual("Place: numeric column index on price_by_night",
+                         self.plan(storage.query(Place).filter(
+                             price_by_night__gt=60)))
+
+    def test_sorted_index(self):
+        query = storage.query(Place).filter(
+            created_at__range=(datetime(2023, 10, 11), datetime(2023, 10, 12)))
+        self.assertEqual("Place: sorted index on created_at",
+                         self.plan(query))
+        self.assertEqual(["Beach house", "City studio"],
+                         sorted(pl.name for pl in query))
+
+    def test_sorted_index_order(self):
+        query = storage.query(Place).order_by("-updated_at").limit(2)
+        self.assertEqual(["Place: sorted index on updated_at",
+                          "order by: updated_at descending (index order)",
+                          "limit: 2"], query.explain().splitlines())
+
+    def test_scan(self):
+        query = storage.query(User).filter(email__prefix="a").order_by(
+            "email").offset(3)
+        self.assertEqual(["User: scan of the class",
+                          "filter: email prefix 'a'",
+                          "order by: email (sort)",
+                          "offset: 3"], query.explain().splitlines())
+
+    def test_scan_of_parent_class(self):
+        query = storage.query(BaseModel).order_by("created_at")
+        self.assertEqual("BaseModel: scan of the class", self.plan(query))
+        self.assertEqual(4, query.count())
+
+
+if __name__ == "__main__":
+    unittest.main()
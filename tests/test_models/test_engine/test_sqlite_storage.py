@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/sqlite_storage.py.
+
+Unittest classes:
+    TestSQLiteStorage_instantiation
+    TestSQLiteStorage_methods
+    TestSQLiteStorage_flusher
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import models
+import unittest
+from models.engine.file_storage import FileStorage
+from models.engine.sqlite_storage import SQLiteStorage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+
+
+class TestSQLiteStorage_instantiation(unittest.TestCase):
+    """Unittests for testing instantiation of the SQLiteStorage class."""
+
+    def test_SQLiteStorage_instantiation_no_args(self):
+        self.assertEqual(type(SQLiteStorage()), SQLiteStorage)
+
+    def test_SQLiteStorage_is_FileStorage(self):
+        self.assertTrue(issubclass(SQLiteStorage, FileStorage))
+
+    def test_path_is_str(self):
+        self.assertEqual(str, type(SQLiteStorage.path))
+
+
+class TestSQLiteStorage_methods(unittest.TestCase):
+    """Unittests for testing methods of the SQLiteStorage class."""
+
+    def setUp(self):
+        SQLiteStorage.path = "test_file.db"
+        self.storage = SQLiteStorage()
+        FileStorage._FileStorage__objects = {}
+        self.storage._take_dirty()
+
+    def tearDown(self):
+        self.storage.close()
+        SQLiteStorage.path = "file.db"
+        try:
+            os.remove("test_file.db")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def rows(self, class_name):
+        with sqlite3.connect("test_file.db") as connection:
+            return connection.execute(
+                'SELECT * FROM "{}"'.format(class_name)).fetchall()
+
+    def test_save_creates_tables(self):
+        self.storage.save()
+        with sqlite3.connect("test_file.db") as connection:
+            tables = {row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertEqual(set(FileStorage.classes), tables)
+
+    def test_save_drops_unused_indexes(self):
+        with sqlite3.connect("test_file.db") as connection:
+            connection.execute('CREATE TABLE "Place" (id TEXT PRIMARY KEY, '
+                               'created_at TEXT, updated_at TEXT, '
+                               'city_id TEXT, user_id TEXT, '
+                               'data TEXT NOT NULL)')
+            connection.execute('CREATE INDEX "Place_city_id" ON "Place" '
+                               '(city_id)')
+        self.storage.save()
+        with sqlite3.connect("test_file.db") as connection:
+            indexes = {row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' "
+                "AND sql IS NOT NULL")}
+        self.assertEqual(set(), indexes)
+
+    def test_save_inserts_rows(self):
+        us = User()
+        State()
+        self.storage.save()
+        self.assertEqual(us.id, self.rows("User")[0][0])
+        self.assertEqual(1, len(self.rows("State")))
+
+    def test_save_upserts_changed_row(self):
+        pl = Place()
+        self.storage.save()
+        pl.city_id = "c1"
+        self.storage.save()
+        rows = self.rows("Place")
+        self.assertEqual(1, len(rows))
+        self.assertEqual("c1", rows[0][3])
+
+    def test_save_deletes_row(self):
+        us = User()
+        self.storage.save()
+        self.storage.delete(us)
+        self.storage.save()
+        self.assertEqual([], self.rows("User"))
+
+    def test_reload(self):
+        us = User()
+        us.first_name = "Betty"
+        cy = City()
+        cy.state_id = "s1"
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual("Betty", self.storage.get(User, us.id).first_name)
+        self.assertIn("City." + cy.id,
+                      self.storage.related(City, "state_id", "s1"))
+        self.assertEqual(2, self.storage.count())
+
+    def test_reload_selected_classes(self):
+        User()
+        State()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload(classes=["State"])
+        self.assertEqual(0, self.storage.count(User))
+        self.assertEqual(1, self.storage.count(State))
+
+    def test_compact(self):
+        User()
+        self.storage.compact()
+        self.assertEqual(1, len(self.rows("User")))
+
+
+class TestSQLiteStorage_flusher(unittest.TestCase):
+    """Unittests for testing the background flusher with SQLiteStorage."""
+
+    def test_flush_at_exit(self):
+        root = os.path.dirname(os.path.abspath(models.__path__[0]))
+        script = ("from models import storage\n"
+                  "from models.engine.file_storage import FileStorage\n"
+                  "from models.user import User\n"
+                  "FileStorage.flush_interval = 60\n"
+                  "User().save()\n")
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PYTHONPATH=root,
+                       HBNB_TYPE_STORAGE="sqlite")
+            subprocess.run([sys.executable, "-c", script], cwd=directory,
+                           env=env, check=True)
+            self.assertFalse(os.path.exists(os.path.join(directory,
+                                                         "file.json")))
+            with sqlite3.connect(os.path.join(directory, "file.db")) as db:
+                rows = db.execute('SELECT * FROM "User"').fetchall()
+            self.assertEqual(1, len(rows))
+
+
+if __name__ == "__main__":
+    unittest.main()